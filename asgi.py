@@ -0,0 +1,185 @@
+"""
+ASGI entry point for production serving of the Flask app in server.py.
+
+    python scripts/serve.py --workers 4        # multi-worker launcher
+    uvicorn asgi:app --workers 4 --port 8000   # same thing, by hand
+
+The Flask views are synchronous, so the event loop never runs them: every request is
+handed to a bounded thread pool and the loop only moves bytes. The pool size caps how
+many requests can be inside a view (and so holding a database connection or waiting on
+the write queue) at once; the rest wait on the loop without tying up a thread.
+Streaming responses (the CSV exports) are pulled chunk by chunk on the same pool,
+except live event streams: each open /api/stream blocks a thread between events, so
+those are pulled on their own pool, and the event broker turns clients away with a 503
+once that pool is full rather than letting them queue behind it.
+"""
+import asyncio
+import io
+import os
+import sys
+from concurrent.futures import ThreadPoolExecutor
+
+import server
+
+# Request threads per worker process; a little above the connection pool so writes,
+# which wait on the write queue rather than a pooled connection, don't starve reads
+ASGI_THREADS = int(os.environ.get('MESS_ASGI_THREADS', server.DB_POOL_SIZE * 2))
+
+# Threads per worker process for open Server-Sent Events streams, which is also the
+# most /api/stream clients a worker accepts
+SSE_THREADS = int(os.environ.get('MESS_SSE_THREADS', 32))
+
+
+class WsgiToAsgi:
+    """Minimal WSGI -> ASGI adapter (HTTP and lifespan) that runs the WSGI app on an executor."""
+
+    def __init__(self, wsgi_app, max_threads=ASGI_THREADS, stream_threads=SSE_THREADS):
+        self.wsgi_app = wsgi_app
+        self.executor = ThreadPoolExecutor(max_workers=max_threads, thread_name_prefix='asgi-request')
+        self.stream_executor = ThreadPoolExecutor(max_workers=stream_threads, thread_name_prefix='asgi-sse')
+        # Never accept more live clients than there are threads to serve them
+        server.EVENT_BROKER.max_clients = min(server.EVENT_BROKER.max_clients, stream_threads)
+
+    async def __call__(self, scope, receive, send):
+        if scope['type'] == 'lifespan':
+            await self.lifespan(receive, send)
+        elif scope['type'] == 'http':
+            await self.http(scope, receive, send)
+        else:
+            raise RuntimeError(f"Unsupported ASGI scope type: {scope['type']}")
+
+    async def lifespan(self, receive, send):
+        """Open the database (running migrations once) on startup; drain and close it on shutdown."""
+        loop = asyncio.get_running_loop()
+        while True:
+            message = await receive()
+            if message['type'] == 'lifespan.startup':
+                try:
+                    await loop.run_in_executor(self.executor, self.startup)
+                except Exception as e:
+                    await send({'type': 'lifespan.startup.failed', 'message': str(e)})
+                    return
+                await send({'type': 'lifespan.startup.complete'})
+            elif message['type'] == 'lifespan.shutdown':
+                # In-flight requests have finished by now; end live streams and let
+                # queued writes commit
+                server.EVENT_BROKER.close()
+                server.EXPORTS.stop()
+                self.stream_executor.shutdown(wait=True)
+                self.executor.shutdown(wait=True)
+                server.DB_WRITER.stop()
+                server.DB_POOL.close_all()
+                await send({'type': 'lifespan.shutdown.complete'})
+                return
+
+    def startup(self):
+        with server.DB_POOL.connection():
+            pass
+        server.STATIC_ASSETS.warm()
+        server.STUDENT_IDS.warm()
+        server.LOG.info("Worker %s ready: %s (%s request threads)", os.getpid(), server.DB_PATH, self.executor._max_workers)
+
+    async def http(self, scope, receive, send):
+        body = bytearray()
+        while True:
+            message = await receive()
+            if message['type'] == 'http.disconnect':
+                return
+            body += message.get('body', b'')
+            if not message.get('more_body'):
+                break
+
+        started = {}
+
+        def start_response(status, headers, exc_info=None):
+            if exc_info and started.get('sent'):
+                raise exc_info[1].with_traceback(exc_info[2])
+            started['status'] = int(status.split(' ', 1)[0])
+            started['headers'] = [(k.lower().encode('latin-1'), v.encode('latin-1')) for k, v in headers]
+            return lambda data: None  # the legacy write() callable is not used by Flask
+
+        def call_app():
+            # Responses with a Content-Length are already in memory: collect them in the
+            # same thread hop so the loop can send them in one message
+            result = self.wsgi_app(environ, start_response)
+            if any(name == b'content-length' for name, _ in started['headers']):
+                try:
+                    return b''.join(result), None
+                finally:
+                    if hasattr(result, 'close'):
+                        result.close()
+            return None, result
+
+        loop = asyncio.get_running_loop()
+        environ = self.environ(scope, bytes(body))
+        buffered, result = await loop.run_in_executor(self.executor, call_app)
+        await send({'type': 'http.response.start', 'status': started['status'],
+                    'headers': started['headers']})
+        started['sent'] = True
+        if result is None:
+            await send({'type': 'http.response.body', 'body': buffered})
+            return
+        # Live event streams wait for events on their own pool, not on the request threads
+        event_stream = any(name == b'content-type' and value.startswith(b'text/event-stream')
+                           for name, value in started['headers'])
+        executor = self.stream_executor if event_stream else self.executor
+        # Long-lived streams (/api/stream) must stop pulling chunks once the client is gone
+        disconnected = asyncio.Event()
+
+        async def watch_disconnect():
+            while (await receive())['type'] != 'http.disconnect':
+                pass
+            disconnected.set()
+
+        watcher = asyncio.ensure_future(watch_disconnect())
+        try:
+            chunks = iter(result)
+            while not disconnected.is_set():
+                chunk = await loop.run_in_executor(executor, next, chunks, None)
+                if chunk is None:
+                    break
+                await send({'type': 'http.response.body', 'body': chunk, 'more_body': True})
+            await send({'type': 'http.response.body', 'body': b''})
+        finally:
+            watcher.cancel()
+            if hasattr(result, 'close'):
+                await loop.run_in_executor(executor, result.close)
+
+    @staticmethod
+    def environ(scope, body):
+        """Build a PEP 3333 environ for an ASGI HTTP scope."""
+        server_name, server_port = scope.get('server') or ('localhost', 80)
+        client = scope.get('client') or ('', 0)
+        environ = {
+            'REQUEST_METHOD': scope['method'],
+            'SCRIPT_NAME': scope.get('root_path', '').encode('utf-8').decode('latin-1'),
+            'PATH_INFO': scope['path'].encode('utf-8').decode('latin-1'),
+            'QUERY_STRING': scope['query_string'].decode('latin-1'),
+            'SERVER_NAME': server_name,
+            'SERVER_PORT': str(server_port),
+            'SERVER_PROTOCOL': f"HTTP/{scope.get('http_version', '1.1')}",
+            'REMOTE_ADDR': client[0],
+            'REMOTE_PORT': str(client[1]),
+            'CONTENT_LENGTH': str(len(body)),
+            'wsgi.version': (1, 0),
+            'wsgi.url_scheme': scope.get('scheme', 'http'),
+            'wsgi.input': io.BytesIO(body),
+            'wsgi.errors': sys.stderr,
+            'wsgi.multithread': True,
+            'wsgi.multiprocess': True,
+            'wsgi.run_once': False,
+        }
+        for name, value in scope['headers']:
+            name = name.decode('latin-1').upper().replace('-', '_')
+            value = value.decode('latin-1')
+            if name == 'CONTENT_TYPE':
+                environ['CONTENT_TYPE'] = value
+                continue
+            if name == 'CONTENT_LENGTH':
+                continue
+            key = f'HTTP_{name}'
+            environ[key] = f"{environ[key]},{value}" if key in environ else value
+        return environ
+
+
+app = WsgiToAsgi(server.APP)
@@ -0,0 +1,8 @@
+"""Latency statistics shared by the benchmark and load-test scripts, so they report alike."""
+
+
+def percentile(sorted_values, p):
+    """Nearest-rank value at fraction `p` (0-1) of an ascending list; 0.0 for an empty one."""
+    if not sorted_values:
+        return 0.0
+    return sorted_values[min(len(sorted_values) - 1, int(len(sorted_values) * p))]
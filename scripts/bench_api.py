@@ -0,0 +1,414 @@
+"""
+Reproducible API benchmark: generates a large synthetic database, replays a weighted
+mix of dashboard requests against every endpoint in server.py and writes a latency and
+throughput report that can be compared between commits.
+
+    python scripts/bench_api.py --students 10000 --years 2 --duration 30
+    python scripts/bench_api.py --url http://127.0.0.1:8000 --concurrency 16 --duration 30
+    python scripts/bench_api.py --compare bench-results/api-abc1234-....json bench-results/api-def5678-....json
+
+Without --url the requests go through Flask's test client in this process, against the
+generated database. With --url they go over HTTP to a server you started yourself
+(point it at the dataset with --db / MESS_DB_PATH; the path is printed).
+
+Datasets are cached in --dataset-dir under a name built from their parameters, so only
+the first run pays for generation. The data and the request sequence are both derived
+from --seed, so two runs with the same arguments issue the same requests.
+"""
+import argparse
+import http.client
+import json
+import platform
+import random
+import sqlite3
+import subprocess
+import sys
+import threading
+import time
+from datetime import date, datetime, timedelta
+from pathlib import Path
+from urllib.parse import urlsplit
+
+ROOT = Path(__file__).resolve().parent.parent
+sys.path.insert(0, str(ROOT))
+sys.path.insert(0, str(Path(__file__).resolve().parent))
+
+import create_feedback_db  # noqa: E402
+from _stats import percentile  # noqa: E402
+
+MEALS = ('breakfast', 'lunch', 'dinner')
+COMMENTS = create_feedback_db.COMMENTS_POOL
+REASONS = create_feedback_db.FINE_REASONS
+DISHES = ('Rice', 'Dal', 'Sambar', 'Chapati', 'Paneer Curry', 'Idli', 'Poha', 'Curd')
+WINDOWS = ((7, 5), (30, 4), (90, 1))  # (days, weight) of the date ranges requested
+
+
+# ============================================================================
+# DATASET GENERATION
+# ============================================================================
+
+def generate_dataset(path, students, days, seed, participation):
+    """
+    Build a database of `students` students and `days` days of activity ending today
+    with create_feedback_db's bulk seeding mode: feedback from a `participation` share
+    of the students each day, a food count per meal and 0-3 fines a day.
+    """
+    first_day = date.today() - timedelta(days=days - 1)
+    partial = path.with_name(path.name + '.partial')
+    partial.unlink(missing_ok=True)
+
+    started = time.perf_counter()
+    conn = sqlite3.connect(partial, isolation_level=None)
+    for pragma in create_feedback_db.BULK_PRAGMAS:
+        conn.execute(pragma)
+    create_feedback_db.create_schema(conn, inline_unique=False)
+    create_feedback_db.bulk_seed(conn, random.Random(seed), students, first_day, days, participation, 3)
+    create_feedback_db.create_indexes(conn)
+    conn.close()
+    print(f"   generated in {time.perf_counter() - started:.1f}s")
+    return partial
+
+
+def prepare_dataset(args):
+    """Return the path of the dataset for these arguments, generating it if needed."""
+    days = args.days or args.years * 365
+    dataset_dir = Path(args.dataset_dir)
+    dataset_dir.mkdir(parents=True, exist_ok=True)
+    path = dataset_dir / f"bench_{args.students}s_{days}d_p{args.participation}_seed{args.seed}.db"
+    if path.exists() and not args.regenerate:
+        print(f"\n📦 Reusing dataset {path}")
+        return path
+
+    print(f"\n📦 Generating dataset {path} ({args.students:,} students x {days:,} days)")
+    partial = generate_dataset(path, args.students, days, args.seed, args.participation)
+
+    # Let the server run its migrations (indexes, rollups) and bill every day up
+    # front, so the benchmark measures steady-state reads rather than first-touch work
+    import server
+    started = time.perf_counter()
+    server.DB_PATH = partial
+    with server.DB_POOL.connection():
+        pass
+    server.DB_WRITER.submit(server.refresh_billing)
+    server.DB_WRITER.stop()
+    server.DB_POOL.close_all()
+    with sqlite3.connect(partial) as conn:
+        conn.execute("PRAGMA wal_checkpoint(TRUNCATE)")
+    for suffix in ('-wal', '-shm'):
+        Path(str(partial) + suffix).unlink(missing_ok=True)
+    partial.rename(path)
+    print(f"   migrated and billed in {time.perf_counter() - started:.1f}s")
+    return path
+
+
+def dataset_summary(path):
+    with sqlite3.connect(path) as conn:
+        counts = {table: conn.execute(f"SELECT COUNT(*) FROM {table}").fetchone()[0]
+                  for table in ('students', 'student_feedback', 'food_counts', 'fines', 'vendor_responses')}
+        first, last = conn.execute("SELECT MIN(count_date), MAX(count_date) FROM food_counts").fetchone()
+    return {'rows': counts, 'first_day': first, 'last_day': last, 'bytes': path.stat().st_size}
+
+
+# ============================================================================
+# REQUEST MIX
+# ============================================================================
+
+class Workload:
+    """Weighted mix of the dashboard's reads and writes over random date windows."""
+
+    READS = (
+        # name, weight, path template
+        ('feedback', 12, '/api/feedback?start={start}&end={end}'),
+        ('feedback page', 8, '/api/feedback?start={start}&end={end}&limit=100'),
+        ('feedback csv', 2, '/api/feedback/csv?start={start}&end={end}'),
+        ('food-counts', 10, '/api/food-counts?start={start}&end={end}'),
+        ('food-quality', 10, '/api/food-quality?start={start}&end={end}'),
+        ('analytics', 6, '/api/analytics/feedback?start={start}&end={end}&granularity=daily,weekly'),
+        ('dish rankings', 3, '/api/analytics/items?start={start}&end={end}'),
+        ('fines', 8, '/api/fines?start={start}&end={end}'),
+        ('fines csv', 1, '/api/fines/csv?start={start}&end={end}'),
+        ('vendor-responses', 4, '/api/vendor-responses'),
+        ('billing', 6, '/api/billing?start={start}&end={end}'),
+        ('billing csv', 1, '/api/billing/csv?start={start}&end={end}'),
+        ('search', 3, '/api/search?q=salty&start={start}&end={end}'),
+        ('health', 2, '/api/health'),
+    )
+    WRITES = (
+        ('POST feedback', 6),
+        ('POST feedback batch', 1),
+        ('POST food-counts', 2),
+        ('POST fines', 1),
+    )
+
+    def __init__(self, first_day, last_day, students, write_ratio, seed):
+        self.first_day = date.fromisoformat(first_day)
+        self.span = (date.fromisoformat(last_day) - self.first_day).days
+        self.students = students
+        self.write_ratio = write_ratio
+        self.rng = random.Random(seed)
+
+    def window(self):
+        length = self.rng.choices([w[0] for w in WINDOWS], [w[1] for w in WINDOWS])[0]
+        end = self.first_day + timedelta(days=self.rng.randint(0, self.span))
+        start = max(self.first_day, end - timedelta(days=length - 1))
+        return start.isoformat(), end.isoformat()
+
+    def day(self):
+        return (self.first_day + timedelta(days=self.rng.randint(0, self.span))).isoformat()
+
+    def submission(self):
+        roll = self.rng.randint(1, self.students)
+        return {
+            'student_name': f"Bench Student {roll}",
+            'student_roll': f"ST{roll:06d}",
+            'feedback_date': self.day(),
+            'meal_type': self.rng.choice(['Breakfast', 'Lunch', 'Dinner']),
+            'overall_comment': self.rng.choice(COMMENTS),
+            'items': [{'item_name': dish, 'taste': self.rng.randint(1, 5), 'cleanliness': self.rng.randint(1, 5)}
+                      for dish in self.rng.sample(DISHES, 3)],
+        }
+
+    def next(self):
+        """Return (name, method, path, json body or None)."""
+        if self.rng.random() < self.write_ratio:
+            name = self.rng.choices([w[0] for w in self.WRITES], [w[1] for w in self.WRITES])[0]
+            if name == 'POST feedback':
+                return name, 'POST', '/api/feedback', self.submission()
+            if name == 'POST feedback batch':
+                return name, 'POST', '/api/feedback/batch', [self.submission() for _ in range(50)]
+            if name == 'POST food-counts':
+                return name, 'POST', '/api/food-counts', {
+                    'date': self.day(), 'meal': self.rng.choice(MEALS),
+                    'student_count': self.rng.randint(100, self.students), 'faculty_count': 20, 'guest_count': 2}
+            return name, 'POST', '/api/fines', {
+                'date': self.day(), 'meal': self.rng.choice(MEALS), 'reason': self.rng.choice(REASONS),
+                'amount': 500, 'imposedBy': 'bench'}
+        name, _, template = self.rng.choices(self.READS, [r[1] for r in self.READS])[0]
+        start, end = self.window()
+        return name, 'GET', template.format(start=start, end=end), None
+
+
+# ============================================================================
+# DRIVERS
+# ============================================================================
+
+class TestClientDriver:
+    """Requests through Flask's test client, in this process."""
+
+    def __init__(self, app):
+        self.client = app.test_client()
+
+    def request(self, method, path, body):
+        response = self.client.open(path, method=method, json=body)
+        size = len(response.get_data())
+        response.close()
+        return response.status_code, size
+
+    def close(self):
+        pass
+
+
+class HttpDriver:
+    """Requests over one keep-alive HTTP connection."""
+
+    def __init__(self, url):
+        self.url = url
+        self.conn = http.client.HTTPConnection(url.hostname, url.port or 80, timeout=60)
+
+    def request(self, method, path, body):
+        data = json.dumps(body) if body is not None else None
+        headers = {'Content-Type': 'application/json'} if body is not None else {}
+        try:
+            self.conn.request(method, path, body=data, headers=headers)
+            response = self.conn.getresponse()
+            return response.status, len(response.read())
+        except (OSError, http.client.HTTPException):
+            self.conn.close()
+            self.conn = http.client.HTTPConnection(self.url.hostname, self.url.port or 80, timeout=60)
+            return 0, 0
+
+    def close(self):
+        self.conn.close()
+
+
+def run_client(make_driver, workload, warmup_until, deadline, samples):
+    """Issue requests back to back until `deadline`; record (name, seconds, status) after warm-up."""
+    driver = make_driver()
+    try:
+        while True:
+            name, method, path, body = workload.next()
+            started = time.perf_counter()
+            if started >= deadline:
+                break
+            status, _ = driver.request(method, path, body)
+            if started >= warmup_until:
+                samples.append((name, time.perf_counter() - started, status))
+    finally:
+        driver.close()
+
+
+# ============================================================================
+# REPORTS
+# ============================================================================
+
+def summarise(samples, elapsed):
+    """Latency percentiles (ms), throughput and errors for a list of (seconds, status)."""
+    latencies = sorted(seconds for seconds, _ in samples)
+    return {
+        'requests': len(latencies),
+        'errors': sum(1 for _, status in samples if status == 0 or status >= 500),
+        'rps': round(len(latencies) / elapsed, 1) if elapsed else 0.0,
+        'p50_ms': round(percentile(latencies, 0.50) * 1000, 2),
+        'p95_ms': round(percentile(latencies, 0.95) * 1000, 2),
+        'p99_ms': round(percentile(latencies, 0.99) * 1000, 2),
+        'mean_ms': round(sum(latencies) / len(latencies) * 1000, 2) if latencies else 0.0,
+        'max_ms': round(latencies[-1] * 1000, 2) if latencies else 0.0,
+    }
+
+
+def git_commit():
+    try:
+        commit = subprocess.run(['git', 'rev-parse', '--short', 'HEAD'], cwd=ROOT, capture_output=True,
+                                text=True, check=True).stdout.strip()
+        dirty = subprocess.run(['git', 'status', '--porcelain', '--untracked-files=no'], cwd=ROOT,
+                               capture_output=True, text=True, check=True).stdout.strip()
+        return commit + ('-dirty' if dirty else '')
+    except (OSError, subprocess.CalledProcessError):
+        return 'unknown'
+
+
+def print_report(report):
+    overall = report['overall']
+    print(f"\n📊 {report['target']}  commit={report['commit']}  concurrency={report['params']['concurrency']}  "
+          f"duration={report['elapsed_s']}s  write_ratio={report['params']['write_ratio']}")
+    print(f"   {'endpoint':22} {'requests':>9} {'req/s':>8} {'p50 ms':>8} {'p95 ms':>8} {'p99 ms':>8} {'errors':>7}")
+    for name, row in list(report['endpoints'].items()) + [('ALL', overall)]:
+        print(f"   {name:22} {row['requests']:>9} {row['rps']:>8} {row['p50_ms']:>8} {row['p95_ms']:>8} "
+              f"{row['p99_ms']:>8} {row['errors']:>7}")
+
+
+def compare_reports(old_path, new_path):
+    """Print per-endpoint throughput and latency changes from one report to another."""
+    old, new = (json.loads(Path(p).read_text(encoding='utf-8')) for p in (old_path, new_path))
+    if old['params'] != new['params']:
+        print("⚠️  The two runs used different parameters; differences are not only the code:")
+        for key in sorted(set(old['params']) | set(new['params'])):
+            if old['params'].get(key) != new['params'].get(key):
+                print(f"   {key}: {old['params'].get(key)} -> {new['params'].get(key)}")
+
+    def change(a, b):
+        return f"{(b - a) / a * 100:+6.1f}%" if a else '    n/a'
+
+    print(f"\n📊 {old['commit']} -> {new['commit']}")
+    print(f"   {'endpoint':22} {'req/s':>19} {'p50 ms':>19} {'p95 ms':>19} {'p99 ms':>19}")
+    rows = [(name, old['endpoints'].get(name), new['endpoints'].get(name))
+            for name in list(new['endpoints']) + [n for n in old['endpoints'] if n not in new['endpoints']]]
+    for name, a, b in rows + [('ALL', old['overall'], new['overall'])]:
+        if a is None or b is None:
+            print(f"   {name:22} (only in one run)")
+            continue
+        cells = [f"{b[key]:>10} {change(a[key], b[key])}" for key in ('rps', 'p50_ms', 'p95_ms', 'p99_ms')]
+        print(f"   {name:22} " + ' '.join(cells))
+    print()
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument('--students', type=int, default=10000)
+    parser.add_argument('--years', type=int, default=2)
+    parser.add_argument('--days', type=int, help='overrides --years')
+    parser.add_argument('--participation', type=float, default=0.6,
+                        help='share of students leaving feedback each day')
+    parser.add_argument('--seed', type=int, default=1)
+    parser.add_argument('--dataset-dir', default=str(ROOT / 'bench-data'))
+    parser.add_argument('--regenerate', action='store_true', help='rebuild the dataset even if cached')
+    parser.add_argument('--url', help='benchmark a running server instead of the in-process test client')
+    parser.add_argument('--concurrency', type=int, default=8)
+    parser.add_argument('--duration', type=float, default=30.0, help='measured seconds')
+    parser.add_argument('--warmup', type=float, default=5.0, help='seconds run before measuring')
+    parser.add_argument('--write-ratio', type=float, default=0.1, help='fraction of requests that write (0-1)')
+    parser.add_argument('--no-response-cache', action='store_true',
+                        help='disable the in-process response cache (test client mode)')
+    parser.add_argument('--out', help='report path (default bench-results/api-<commit>-<time>.json)')
+    parser.add_argument('--compare', nargs=2, metavar=('OLD', 'NEW'), help='compare two reports and exit')
+    args = parser.parse_args()
+
+    if args.compare:
+        compare_reports(*args.compare)
+        return
+
+    dataset = prepare_dataset(args)
+    summary = dataset_summary(dataset)
+    print(f"   {', '.join(f'{table} {n:,}' for table, n in summary['rows'].items())}")
+
+    if args.url:
+        url = urlsplit(args.url)
+        target = args.url
+        make_driver = lambda: HttpDriver(url)  # noqa: E731
+        print(f"\n   Benchmarking {args.url}; start it with --db {dataset}")
+    else:
+        # Writes change the dataset, so the in-process run uses a scratch copy
+        import server
+        scratch = dataset.with_name(dataset.stem + '.run.db')
+        with sqlite3.connect(dataset) as source, sqlite3.connect(scratch) as copy:
+            source.backup(copy)
+        server.DB_PATH = scratch
+        server.STUDENT_IDS.warm()  # as a worker does on startup
+        server.LOG.setLevel('WARNING')  # no access log lines in the measurements
+        if args.no_response_cache:
+            server.RESPONSE_CACHE.max_entries = 0
+        target = 'test-client'
+        make_driver = lambda: TestClientDriver(server.APP)  # noqa: E731
+
+    samples = []
+    started = time.perf_counter()
+    warmup_until = started + args.warmup
+    deadline = warmup_until + args.duration
+    threads = [
+        threading.Thread(target=run_client, args=(
+            make_driver,
+            Workload(summary['first_day'], summary['last_day'], args.students, args.write_ratio, args.seed * 1000 + i),
+            warmup_until, deadline, samples))
+        for i in range(args.concurrency)
+    ]
+    for t in threads:
+        t.start()
+    for t in threads:
+        t.join()
+    elapsed = time.perf_counter() - warmup_until
+
+    if not args.url:
+        server.DB_WRITER.stop()
+        server.DB_POOL.close_all()
+        for suffix in ('', '-wal', '-shm'):
+            Path(str(scratch) + suffix).unlink(missing_ok=True)
+
+    by_name = {}
+    for name, seconds, status in samples:
+        by_name.setdefault(name, []).append((seconds, status))
+    commit = git_commit()
+    report = {
+        'commit': commit,
+        'timestamp': datetime.now().isoformat(timespec='seconds'),
+        'target': target,
+        'platform': {'python': platform.python_version(), 'sqlite': sqlite3.sqlite_version,
+                     'machine': platform.machine(), 'system': platform.system()},
+        'params': {key: getattr(args, key) for key in (
+            'students', 'years', 'days', 'participation', 'seed', 'concurrency', 'duration', 'warmup',
+            'write_ratio', 'no_response_cache')} | {'driver': 'http' if args.url else 'test-client'},
+        'dataset': summary,
+        'elapsed_s': round(elapsed, 2),
+        'overall': summarise([(s, st) for _, s, st in samples], elapsed),
+        'endpoints': {name: summarise(rows, elapsed) for name, rows in sorted(by_name.items())},
+    }
+    print_report(report)
+
+    out = Path(args.out) if args.out else \
+        ROOT / 'bench-results' / f"api-{commit}-{datetime.now().strftime('%Y%m%d-%H%M%S')}.json"
+    out.parent.mkdir(parents=True, exist_ok=True)
+    out.write_text(json.dumps(report, indent=2), encoding='utf-8')
+    print(f"\n   Report written to {out}\n")
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,114 @@
+"""
+Compare feedback ingestion throughput of POST /api/feedback (one submission per
+request) against POST /api/feedback/batch.
+
+Runs against a throw-away copy of the database through Flask's test client:
+
+    python scripts/bench_feedback_batch.py --submissions 2000 --batch-size 100
+"""
+import argparse
+import random
+import shutil
+import sys
+import tempfile
+import time
+from pathlib import Path
+
+ROOT = Path(__file__).resolve().parent.parent
+sys.path.insert(0, str(ROOT))
+
+import server  # noqa: E402
+
+SOURCE_DB = Path(__file__).resolve().parent / "database" / "mess_management.db"
+
+
+def make_submissions(n, n_students=500, seed=1):
+    """Build `n` random submissions spread over `n_students` students and January 2026."""
+    rng = random.Random(seed)
+    submissions = []
+    for _ in range(n):
+        roll = rng.randint(1, n_students)
+        submissions.append({
+            'student_name': f"Bench Student {roll}",
+            'student_roll': f"BN{roll:05d}",
+            'feedback_date': f"2026-01-{rng.randint(1, 31):02d}",
+            'meal_type': rng.choice(['Breakfast', 'Lunch', 'Dinner']),
+            'overall_comment': rng.choice(['Good taste', 'Too salty', 'Undercooked', '']),
+            'items': [
+                {'item_name': 'Rice', 'taste': rng.randint(1, 5), 'cleanliness': rng.randint(1, 5)},
+                {'item_name': 'Dal', 'taste': rng.randint(1, 5), 'cleanliness': rng.randint(1, 5)},
+            ],
+        })
+    return submissions
+
+
+def fresh_database(workdir, name):
+    """Copy the sample database and point the server at the copy."""
+    db_path = Path(workdir) / name
+    shutil.copy(SOURCE_DB, db_path)
+    server.DB_WRITER.stop()
+    server.DB_POOL.close_all()
+    server.DB_PATH = db_path
+    server.STUDENT_IDS.clear()
+    return db_path
+
+
+def saved_rows():
+    """(bench students, their feedback rows) in the current database, to check both runs did the same work."""
+    with server.DB_POOL.connection() as conn:
+        return conn.execute("""
+            SELECT (SELECT COUNT(*) FROM students WHERE roll_no LIKE 'BN%'),
+                   (SELECT COUNT(*) FROM student_feedback sf JOIN students s ON s.id = sf.student_id
+                    WHERE s.roll_no LIKE 'BN%')
+        """).fetchone()[:]
+
+
+def bench_single(client, submissions):
+    started = time.perf_counter()
+    for submission in submissions:
+        response = client.post('/api/feedback', json=submission)
+        assert response.status_code == 200, response.get_json()
+    return time.perf_counter() - started
+
+
+def bench_batch(client, submissions, batch_size):
+    started = time.perf_counter()
+    for i in range(0, len(submissions), batch_size):
+        response = client.post('/api/feedback/batch', json={'submissions': submissions[i:i + batch_size]})
+        body = response.get_json()
+        assert response.status_code == 200 and body['failed'] == 0, body
+    return time.perf_counter() - started
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument('--submissions', type=int, default=2000)
+    parser.add_argument('--batch-size', type=int, default=100)
+    parser.add_argument('--seed', type=int, default=1)
+    args = parser.parse_args()
+
+    submissions = make_submissions(args.submissions, seed=args.seed)
+    client = server.APP.test_client()
+
+    with tempfile.TemporaryDirectory() as workdir:
+        fresh_database(workdir, 'single.db')
+        single = bench_single(client, submissions)
+        single_rows = saved_rows()
+
+        fresh_database(workdir, 'batch.db')
+        batch = bench_batch(client, submissions, args.batch_size)
+        batch_rows = saved_rows()
+        assert single_rows == batch_rows, f"runs saved different data: single {single_rows}, batch {batch_rows}"
+
+        server.DB_WRITER.stop()
+        server.DB_POOL.close_all()
+
+    print(f"\n📊 Feedback ingestion: {args.submissions} submissions")
+    print(f"   Single POST /api/feedback : {single:7.2f}s  ({args.submissions / single:8.0f} submissions/s)")
+    print(f"   Batch  POST /api/feedback/batch (size {args.batch_size}): "
+          f"{batch:7.2f}s  ({args.submissions / batch:8.0f} submissions/s)")
+    print(f"   Speedup: {single / batch:.1f}x\n")
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,123 @@
+"""
+Compare the listing reads (feedback, food counts, fines) served from SQLite with the
+same reads served from the columnar snapshot, and report the snapshot's memory use.
+
+Runs against a throw-away copy of the database, optionally padded with synthetic rows:
+
+    python scripts/bench_snapshot.py --students 500 --days 180 --repeat 20
+"""
+import argparse
+import random
+import shutil
+import sqlite3
+import sys
+import tempfile
+import time
+from datetime import date, timedelta
+from pathlib import Path
+
+ROOT = Path(__file__).resolve().parent.parent
+sys.path.insert(0, str(ROOT))
+
+import server  # noqa: E402
+
+SOURCE_DB = Path(__file__).resolve().parent / "database" / "mess_management.db"
+MEALS = ('breakfast', 'lunch', 'dinner')
+
+
+def pad_database(db_path, n_students, n_days, seed):
+    """Add n_students x n_days feedback rows plus a food count per meal and a few fines per day."""
+    rng = random.Random(seed)
+    first_day = date(2024, 1, 1)
+    conn = sqlite3.connect(db_path)
+    conn.executemany("INSERT OR IGNORE INTO students (name, roll_no) VALUES (?, ?)",
+                     [(f"Bench Student {i}", f"BS{i:05d}") for i in range(n_students)])
+    ids = [row[0] for row in conn.execute("SELECT id FROM students WHERE roll_no LIKE 'BS%'")]
+    comments = ['Good taste', 'Too salty', 'Undercooked', 'Cold food', '']
+    for offset in range(n_days):
+        day = (first_day + timedelta(days=offset)).isoformat()
+        conn.executemany("""
+            INSERT OR IGNORE INTO student_feedback
+                (student_id, feedback_date, breakfast_rating, lunch_rating, dinner_rating, comments)
+            VALUES (?, ?, ?, ?, ?, ?)
+        """, [(sid, day, rng.randint(1, 5), rng.randint(1, 5), rng.randint(1, 5), rng.choice(comments))
+              for sid in ids])
+        conn.executemany("""
+            INSERT OR IGNORE INTO food_counts (count_date, meal, student_count, faculty_count, guest_count, total_count)
+            VALUES (?, ?, ?, ?, 0, ?)
+        """, [(day, meal, n, 20, n + 20) for meal in MEALS for n in [rng.randint(100, n_students)]])
+        conn.executemany("""
+            INSERT INTO fines (fine_date, meal, reason, amount, imposed_by) VALUES (?, ?, ?, ?, 'warden')
+        """, [(day, rng.choice(MEALS), rng.choice(['hygiene', 'late-service', 'quantity-shortage']),
+               rng.choice([500, 1000, 2000])) for _ in range(rng.randint(0, 3))])
+    conn.commit()
+    conn.close()
+    return (first_day + timedelta(days=n_days - 30)).isoformat(), (first_day + timedelta(days=n_days - 1)).isoformat()
+
+
+def timed(fn, repeat):
+    """Best-of-`repeat` seconds for fn()."""
+    best = float('inf')
+    for _ in range(repeat):
+        started = time.perf_counter()
+        fn()
+        best = min(best, time.perf_counter() - started)
+    return best
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument('--students', type=int, default=500)
+    parser.add_argument('--days', type=int, default=180)
+    parser.add_argument('--repeat', type=int, default=20)
+    parser.add_argument('--seed', type=int, default=1)
+    args = parser.parse_args()
+
+    with tempfile.TemporaryDirectory() as workdir:
+        db_path = Path(workdir) / 'bench.db'
+        shutil.copy(SOURCE_DB, db_path)
+        month_start, month_end = pad_database(db_path, args.students, args.days, args.seed)
+        server.DB_WRITER.stop()
+        server.DB_POOL.close_all()
+        server.DB_PATH = db_path
+        server.RESPONSE_CACHE.max_entries = 0  # measure the query path, not the response cache
+
+        ranges = {'last 30 days': (month_start, month_end), 'everything': ('2000-01-01', '2100-12-31')}
+        cases = [
+            ('/api/feedback', lambda s, e: server.query_feedback(s, e)),
+            ('/api/food-counts', lambda s, e: server.query_food_counts(s, e)),
+            ('/api/fines', lambda s, e: server.query_fines(s, e)),
+        ]
+        client = server.APP.test_client()
+        snapshot = server.SnapshotEngine()
+
+        print(f"\n📊 Snapshot vs SQLite ({args.students} students x {args.days} days, best of {args.repeat})")
+        for path, query in cases:
+            for label, (start, end) in ranges.items():
+                server.SNAPSHOT = None
+                rows = query(start, end)
+                sql_query = timed(lambda: query(start, end), args.repeat)
+                url = f"{path}?start={start}&end={end}"
+                sql_http = timed(lambda: client.get(url), args.repeat)
+
+                server.SNAPSHOT = snapshot
+                assert query(start, end) == rows, f"snapshot and SQLite disagree for {path} {label}"
+                snap_query = timed(lambda: query(start, end), args.repeat)
+                snap_http = timed(lambda: client.get(url), args.repeat)
+
+                print(f"   {path:17} {label:13} {len(rows):7} rows | query {sql_query * 1000:8.2f}ms -> "
+                      f"{snap_query * 1000:7.2f}ms ({sql_query / snap_query:4.1f}x) | endpoint "
+                      f"{sql_http * 1000:8.2f}ms -> {snap_http * 1000:7.2f}ms ({sql_http / snap_http:4.1f}x)")
+
+        print("\n   Snapshot memory:")
+        for name, listing in snapshot.stats()['listings'].items():
+            print(f"   {name:12} {listing['rows']:8} rows  {listing['bytes'] / 1024:9.1f} KiB  "
+                  f"({listing['bytes'] / max(listing['rows'], 1):.0f} B/row, {listing['strings']} distinct strings)")
+        print()
+
+        server.DB_WRITER.stop()
+        server.DB_POOL.close_all()
+
+
+if __name__ == '__main__':
+    main()
@@ -1,5 +1,7 @@
+import argparse
 import sqlite3
 import random
+import time
 from pathlib import Path
 from datetime import date, timedelta, datetime
 
@@ -11,23 +13,31 @@ def ensure_db_dir():
     DB_PATH.parent.mkdir(parents=True, exist_ok=True)
 
 
-def create_schema(conn):
-    """Create all required tables for the mess management system."""
+def create_schema(conn, inline_unique=True):
+    """
+    Create all required tables for the mess management system.
+    With inline_unique=False the UNIQUE constraints are left out and added afterwards by
+    create_indexes(), so a bulk load does not maintain them row by row.
+    """
     cur = conn.cursor()
+    unique = "UNIQUE " if inline_unique else ""
+
+    def constraint(clause):
+        return f",\n        {clause}" if inline_unique else ""
 
     # Students Table
-    cur.execute("""
+    cur.execute(f"""
     CREATE TABLE IF NOT EXISTS students (
         id INTEGER PRIMARY KEY AUTOINCREMENT,
         name TEXT NOT NULL,
-        roll_no TEXT UNIQUE NOT NULL,
+        roll_no TEXT {unique}NOT NULL,
         email TEXT,
         created_at TIMESTAMP DEFAULT CURRENT_TIMESTAMP
     )
     """)
 
     # Food Counts Table (Updated by Warden) - Streamlined schema
-    cur.execute("""
+    cur.execute(f"""
     CREATE TABLE IF NOT EXISTS food_counts (
         id INTEGER PRIMARY KEY AUTOINCREMENT,
         count_date TEXT NOT NULL,
@@ -37,14 +47,13 @@ def create_schema(conn):
         guest_count INTEGER DEFAULT 0, -- New column for guests
         total_count INTEGER DEFAULT 0, -- Sum of student + faculty + guest
         updated_by TEXT,
-        created_at TIMESTAMP DEFAULT CURRENT_TIMESTAMP,
-        UNIQUE(count_date, meal)
+        created_at TIMESTAMP DEFAULT CURRENT_TIMESTAMP{constraint("UNIQUE(count_date, meal)")}
     )
     """)
 
     # Student Feedback Table (Meal-wise ratings)
     # The 'comments' column is single, matching frontend & new server expectations
-    cur.execute("""
+    cur.execute(f"""
     CREATE TABLE IF NOT EXISTS student_feedback (
         id INTEGER PRIMARY KEY AUTOINCREMENT,
         student_id INTEGER NOT NULL,
@@ -54,7 +63,8 @@ def create_schema(conn):
         dinner_rating INTEGER,
         comments TEXT, -- Single comments field
         created_at TIMESTAMP DEFAULT CURRENT_TIMESTAMP,
-        FOREIGN KEY(student_id) REFERENCES students(id)
+        FOREIGN KEY(student_id) REFERENCES students(id){constraint("UNIQUE(student_id, feedback_date)")}
+        -- One row per student per day, upserted per meal
     )
     """)
 
@@ -72,19 +82,20 @@ def create_schema(conn):
     """)
 
     # Vendor Responses to Fines
-    cur.execute("""
+    cur.execute(f"""
     CREATE TABLE IF NOT EXISTS vendor_responses (
         id INTEGER PRIMARY KEY AUTOINCREMENT,
         fine_id INTEGER NOT NULL,
         vendor_response TEXT NOT NULL,
         submitted_at TIMESTAMP DEFAULT CURRENT_TIMESTAMP,
         status TEXT DEFAULT 'Submitted',
-        FOREIGN KEY(fine_id) REFERENCES fines(id)
+        FOREIGN KEY(fine_id) REFERENCES fines(id){constraint("UNIQUE(fine_id)")}
+        -- One response per fine, upserted on resubmission
     )
     """)
 
     # Billing Records (Auto-calculated)
-    cur.execute("""
+    cur.execute(f"""
     CREATE TABLE IF NOT EXISTS billing (
         id INTEGER PRIMARY KEY AUTOINCREMENT,
         billing_date TEXT NOT NULL,
@@ -96,8 +107,7 @@ def create_schema(conn):
         gross_amount REAL NOT NULL,
         fine_amount REAL DEFAULT 0,
         net_amount REAL NOT NULL,
-        created_at TIMESTAMP DEFAULT CURRENT_TIMESTAMP,
-        UNIQUE(billing_date)
+        created_at TIMESTAMP DEFAULT CURRENT_TIMESTAMP{constraint("UNIQUE(billing_date)")}
     )
     """)
 
@@ -176,7 +186,7 @@ def populate_feedback(conn, n_feedback=150):
     cur = conn.cursor()
     
     # Get student IDs
-    cur.execute("SELECT id FROM students LIMIT 60")
+    cur.execute("SELECT id FROM students")
     student_ids = [row[0] for row in cur.fetchall()]
     
     comments_pool = [
@@ -205,14 +215,15 @@ def populate_feedback(conn, n_feedback=150):
             student_id, feedback_date, breakfast_rating, lunch_rating, dinner_rating, comments
         ))
     
+    # Random draws can repeat a (student, date) pair; only the first one is kept
     cur.executemany(
-        """INSERT INTO student_feedback
+        """INSERT OR IGNORE INTO student_feedback
            (student_id, feedback_date, breakfast_rating, lunch_rating, dinner_rating, comments)
            VALUES(?,?,?,?,?,?)""",
         feedback_rows
     )
     conn.commit()
-    print(f"✓ Inserted {n_feedback} feedback records (meal-wise ratings)")
+    print(f"✓ Inserted {cur.rowcount} feedback records (meal-wise ratings)")
 
 
 def populate_fines(conn):
@@ -279,59 +290,161 @@ def populate_vendor_responses(conn):
 
 
 def populate_billing(conn):
-    """Populate billing records (calculated from food counts and fines)."""
+    """Populate billing records (calculated from food counts and fines) in one set-based statement."""
     cur = conn.cursor()
-    
-    billing_records = []
-    
-    # Get all dates in January with food counts
+    before = conn.total_changes
+    # Billing is based on the busiest meal of the day at 150 per person, minus that day's fines
     cur.execute("""
-        SELECT DISTINCT count_date FROM food_counts ORDER BY count_date
+        WITH counts AS (
+            SELECT count_date,
+                   SUM(CASE WHEN meal = 'breakfast' THEN total_count ELSE 0 END) AS breakfast_count,
+                   SUM(CASE WHEN meal = 'lunch' THEN total_count ELSE 0 END) AS lunch_count,
+                   SUM(CASE WHEN meal = 'dinner' THEN total_count ELSE 0 END) AS dinner_count
+            FROM food_counts
+            GROUP BY count_date
+        ),
+        fine_totals AS (
+            SELECT fine_date, SUM(amount) AS fine_amount FROM fines GROUP BY fine_date
+        )
+        INSERT OR IGNORE INTO billing
+            (billing_date, breakfast_count, lunch_count, dinner_count, max_people_fed,
+             amount_per_person, gross_amount, fine_amount, net_amount)
+        SELECT c.count_date, c.breakfast_count, c.lunch_count, c.dinner_count,
+               MAX(c.breakfast_count, c.lunch_count, c.dinner_count), 150.0,
+               MAX(c.breakfast_count, c.lunch_count, c.dinner_count) * 150.0,
+               COALESCE(ft.fine_amount, 0),
+               MAX(c.breakfast_count, c.lunch_count, c.dinner_count) * 150.0 - COALESCE(ft.fine_amount, 0)
+        FROM counts c
+        LEFT JOIN fine_totals ft ON ft.fine_date = c.count_date
+        ORDER BY c.count_date
     """)
-    dates = [row[0] for row in cur.fetchall()]
-    
-    for billing_date in dates:
-        # Get food counts for this date, for all meals
-        cur.execute("""
-            SELECT meal, total_count
-            FROM food_counts WHERE count_date = ?
-        """, (billing_date,))
-        
-        meal_totals = {row['meal']: row['total_count'] for row in cur.fetchall()}
-        
-        breakfast_total = meal_totals.get('breakfast', 0)
-        lunch_total = meal_totals.get('lunch', 0)
-        dinner_total = meal_totals.get('dinner', 0)
-        
-        # Calculate max people (billing is based on max among three meals)
-        max_people = max(breakfast_total, lunch_total, dinner_total)
-        
-        # Rate per person
-        rate_per_person = 150.0
-        gross_amount = max_people * rate_per_person
-        
-        # Get fines for this date
-        cur.execute("""
-            SELECT COALESCE(SUM(amount), 0) FROM fines WHERE fine_date = ?
-        """, (billing_date,))
-        
-        fine_amount = cur.fetchone()[0]
-        net_amount = gross_amount - fine_amount
-        
-        billing_records.append((
-            billing_date, breakfast_total, lunch_total, dinner_total,
-            max_people, rate_per_person, gross_amount, fine_amount, net_amount
-        ))
-    
+    conn.commit()
+    print(f"✓ Inserted {conn.total_changes - before} billing records")
+
+
+# ============================================================================
+# FAST BULK SEEDING (--fast)
+# ============================================================================
+
+FIRST_NAMES = ["Raj", "Priya", "Amit", "Anjali", "Rohan", "Sneha", "Vikram", "Deepika",
+               "Arjun", "Kavya", "Nikhil", "Isha", "Rahul", "Pooja", "Sanjay"]
+LAST_NAMES = ["Kumar", "Sharma", "Patel", "Singh", "Gupta", "Verma", "Rao", "Nair",
+              "Iyer", "Desai", "Chopra", "Bhat", "Reddy", "Pandey", "Tiwari"]
+COMMENTS_POOL = ["Too salty", "Good taste", "More variety please", "Undercooked", "Well cooked",
+                 "Portions are small", "Loved the dessert", "Vegetarian options needed",
+                 "Temperature was low", "Clean and fresh", "Excellent service", "Needs improvement",
+                 "Perfect seasoning", "More spicy please", "Quantity is good"]
+FINE_REASONS = ["poor-quality", "hygiene-issue", "late-service", "wrong-item",
+                "expired-food", "quantity-shortage", "temperature-issue", "cleanliness"]
+RATINGS = (1, 2, 3, 4, 5)
+
+# Load-time settings: no rollback journal and no fsync. A crash mid-load leaves a
+# broken file, which is fine for a database that is rebuilt from scratch anyway.
+BULK_PRAGMAS = (
+    "PRAGMA journal_mode=OFF",
+    "PRAGMA synchronous=OFF",
+    "PRAGMA locking_mode=EXCLUSIVE",
+    "PRAGMA temp_store=MEMORY",
+    "PRAGMA cache_size=-262144",
+    "PRAGMA threads=4",         # lets the index builds sort on helper threads
+)
+
+
+def create_indexes(conn):
+    """
+    Build the UNIQUE and date indexes after a bulk load, under the names server.py's
+    migrations use, so the server finds them in place instead of building its own.
+    """
+    cur = conn.cursor()
+    cur.execute("CREATE UNIQUE INDEX IF NOT EXISTS ux_students_roll_no ON students(roll_no)")
+    cur.execute("CREATE UNIQUE INDEX IF NOT EXISTS ux_food_counts_date_meal ON food_counts(count_date, meal)")
+    cur.execute("""
+        CREATE UNIQUE INDEX IF NOT EXISTS ux_student_feedback_student_date
+        ON student_feedback(student_id, feedback_date)
+    """)
+    cur.execute("CREATE UNIQUE INDEX IF NOT EXISTS ux_vendor_responses_fine ON vendor_responses(fine_id)")
+    cur.execute("CREATE UNIQUE INDEX IF NOT EXISTS ux_billing_date ON billing(billing_date)")
+    cur.execute("""
+        CREATE INDEX IF NOT EXISTS idx_student_feedback_date_student
+        ON student_feedback(feedback_date, student_id)
+    """)
+    cur.execute("CREATE INDEX IF NOT EXISTS idx_fines_date ON fines(fine_date)")
+    conn.commit()
+
+
+def bulk_seed(conn, rng, n_students, start, days, participation, max_fines_per_day):
+    """
+    Fill an empty database in one transaction: n_students students, and for each of
+    `days` days from `start` feedback from a `participation` share of them, three food
+    counts and up to max_fines_per_day fines (80% of which get a vendor response).
+    Random values are drawn a day at a time with rng.choices/rng.sample and fed to
+    executemany by generators, so no per-row Python work beyond building the tuple.
+    """
+    cur = conn.cursor()
+    day_list = [(start + timedelta(days=offset)).isoformat() for offset in range(days)]
+    cur.execute("BEGIN")
+
+    names = zip(rng.choices(FIRST_NAMES, k=n_students), rng.choices(LAST_NAMES, k=n_students))
+    cur.executemany(
+        "INSERT INTO students(id, name, roll_no, email) VALUES(?,?,?,?)",
+        ((i, f"{first} {last}", f"ST{i:06d}", f"student{i}@college.edu")
+         for i, (first, last) in enumerate(names, 1))
+    )
+    print(f"✓ Inserted {n_students} students")
+
+    per_day = round(n_students * participation)
+    student_ids = range(1, n_students + 1)
+
+    def feedback_rows():
+        for day in day_list:
+            ids = sorted(rng.sample(student_ids, per_day))
+            ratings = rng.choices(RATINGS, k=per_day * 3)
+            comments = rng.choices(COMMENTS_POOL, k=per_day)
+            yield from zip(ids, [day] * per_day, ratings[0::3], ratings[1::3], ratings[2::3], comments)
+
     cur.executemany(
-        """INSERT OR IGNORE INTO billing
-           (billing_date, breakfast_count, lunch_count, dinner_count, max_people_fed,
-            amount_per_person, gross_amount, fine_amount, net_amount)
-           VALUES(?,?,?,?,?,?,?,?,?)""",
-        billing_records
+        """INSERT INTO student_feedback
+           (student_id, feedback_date, breakfast_rating, lunch_rating, dinner_rating, comments)
+           VALUES(?,?,?,?,?,?)""",
+        feedback_rows()
     )
+    print(f"✓ Inserted {per_day * days} feedback records (meal-wise ratings)")
+
+    def food_count_rows():
+        low, high = max(1, n_students // 3), max(1, n_students)
+        for day in day_list:
+            for meal in ('breakfast', 'lunch', 'dinner'):
+                student, faculty, guest = rng.randint(low, high), rng.randint(10, 35), rng.randint(0, 8)
+                yield day, meal, student, faculty, guest, student + faculty + guest, 'warden_user'
+
+    cur.executemany(
+        """INSERT INTO food_counts
+           (count_date, meal, student_count, faculty_count, guest_count, total_count, updated_by)
+           VALUES(?,?,?,?,?,?,?)""",
+        food_count_rows()
+    )
+    print(f"✓ Inserted {days * 3} food count records")
+
+    fines_per_day = rng.choices(range(max_fines_per_day + 1), k=days)
+    n_fines = sum(fines_per_day)
+    fine_days = [day for day, n in zip(day_list, fines_per_day) for _ in range(n)]
+    cur.executemany(
+        "INSERT INTO fines(id, fine_date, meal, reason, amount, imposed_by) VALUES(?,?,?,?,?,?)",
+        zip(range(1, n_fines + 1), fine_days, rng.choices(['breakfast', 'lunch', 'dinner'], k=n_fines),
+            rng.choices(FINE_REASONS, k=n_fines), rng.choices([300, 500, 1000, 1500, 2000], k=n_fines),
+            ['warden_user'] * n_fines)
+    )
+    print(f"✓ Inserted {n_fines} fine records")
+
+    responded = sorted(rng.sample(range(1, n_fines + 1), round(n_fines * 0.8)))
+    cur.executemany(
+        "INSERT INTO vendor_responses(fine_id, vendor_response, status) VALUES(?,?,'Submitted')",
+        zip(responded, rng.choices(["Acknowledged. Will maintain standards.",
+                                    "Sorry for inconvenience. Better monitoring in place.",
+                                    "Honest mistake. Quality checks strengthened."], k=len(responded)))
+    )
+    print(f"✓ Inserted {len(responded)} vendor response records")
     conn.commit()
-    print(f"✓ Inserted {len(billing_records)} billing records")
 
 
 def print_summary(conn):
@@ -390,34 +503,66 @@ def print_summary(conn):
 
 def main():
     """Main function to create and populate the database."""
+    parser = argparse.ArgumentParser(description="Create and seed the CMC mess management database.")
+    parser.add_argument('--db', default=str(DB_PATH), help=f"database path (default {DB_PATH})")
+    parser.add_argument('--seed', type=int, help="random seed, for reproducible data")
+    parser.add_argument('--fast', action='store_true',
+                        help="bulk seeding mode for large fixtures (uses the scale options below)")
+    parser.add_argument('--students', type=int, default=60)
+    parser.add_argument('--feedback', type=int, default=150, help="feedback rows (default mode)")
+    parser.add_argument('--start', default='2026-01-01', help="first day of data, YYYY-MM-DD (--fast)")
+    parser.add_argument('--days', type=int, default=31, help="days of data (--fast)")
+    parser.add_argument('--participation', type=float, default=0.6,
+                        help="share of students giving feedback each day (--fast)")
+    parser.add_argument('--max-fines-per-day', type=int, default=2, help="(--fast)")
+    args = parser.parse_args()
+    db_path = Path(args.db)
+
     print("\n🚀 Creating CMC Mess Management SQLite Database...\n")
     
-    ensure_db_dir()
+    db_path.parent.mkdir(parents=True, exist_ok=True)
     
     # Remove old database if exists
-    if DB_PATH.exists():
-        DB_PATH.unlink()
-        print(f"🗑️  Removed old database: {DB_PATH}\n")
-    
-    conn = sqlite3.connect(str(DB_PATH))
-    # Enable row_factory for dict-like access in populate_billing
+    if db_path.exists():
+        db_path.unlink()
+        print(f"🗑️  Removed old database: {db_path}\n")
+    
+    rng = random.Random(args.seed)
+    random.seed(args.seed)
+    started = time.perf_counter()
+    conn = sqlite3.connect(str(db_path), isolation_level=None if args.fast else "")
+    # Enable row_factory for dict-like access
     conn.row_factory = sqlite3.Row 
     try:
-        print("🔧 Creating database schema...")
-        create_schema(conn)
-        print("✓ Schema created\n")
-        
-        print("📥 Populating database with sample data...\n")
-        populate_students(conn, n_students=60)
-        populate_food_counts(conn)
-        populate_feedback(conn, n_feedback=150)
-        populate_fines(conn)
-        populate_vendor_responses(conn)
-        populate_billing(conn)
+        if args.fast:
+            for pragma in BULK_PRAGMAS:
+                conn.execute(pragma)
+            print("🔧 Creating database schema (indexes deferred)...")
+            create_schema(conn, inline_unique=False)
+            print("✓ Schema created\n")
+
+            print("📥 Bulk loading data...\n")
+            bulk_seed(conn, rng, args.students, date.fromisoformat(args.start), args.days,
+                      args.participation, args.max_fines_per_day)
+            print("\n🗂️  Building indexes...")
+            create_indexes(conn)
+            populate_billing(conn)
+        else:
+            print("🔧 Creating database schema...")
+            create_schema(conn)
+            print("✓ Schema created\n")
+            
+            print("📥 Populating database with sample data...\n")
+            populate_students(conn, n_students=args.students)
+            populate_food_counts(conn)
+            populate_feedback(conn, n_feedback=args.feedback)
+            populate_fines(conn)
+            populate_vendor_responses(conn)
+            populate_billing(conn)
         
         print_summary(conn)
         
-        print(f"✅ Database successfully created at: {DB_PATH}\n")
+        print(f"✅ Database successfully created at: {db_path} in {time.perf_counter() - started:.1f}s\n")
         
     except Exception as e:
         print(f"\n❌ Error creating database: {e}")
@@ -427,4 +572,4 @@ def main():
 
 
 if __name__ == "__main__":
-    main()
\ No newline at end of file
+    main()
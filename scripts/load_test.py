@@ -0,0 +1,109 @@
+"""
+Closed-loop HTTP load generator for comparing serving modes on localhost.
+
+Start the server in one terminal, then run:
+
+    python scripts/load_test.py --url http://127.0.0.1:8000 --concurrency 32 --duration 20
+
+Each client thread keeps one connection open and issues requests back to back,
+cycling through a mix of the dashboard's read endpoints (plus a share of feedback
+writes with --write-ratio). Reports sustained requests/sec and latency percentiles.
+"""
+import argparse
+import http.client
+import json
+import random
+import threading
+import time
+from urllib.parse import urlsplit
+
+from _stats import percentile
+
+READ_PATHS = [
+    '/api/feedback?start=2026-01-01&end=2026-01-31',
+    '/api/feedback?start=2026-01-01&end=2026-01-31&limit=50',
+    '/api/food-counts?start=2026-01-01&end=2026-01-31',
+    '/api/food-quality?start=2026-01-01&end=2026-01-31',
+    '/api/fines?start=2026-01-01&end=2026-01-31',
+    '/api/billing?start=2026-01-01&end=2026-01-31',
+    '/api/health',
+]
+
+
+def client_loop(url, deadline, write_ratio, seed, results):
+    rng = random.Random(seed)
+    latencies, errors, statuses = [], 0, {}
+    conn = http.client.HTTPConnection(url.hostname, url.port or 80, timeout=30)
+    while time.perf_counter() < deadline:
+        if rng.random() < write_ratio:
+            roll = rng.randint(1, 2000)
+            method, path = 'POST', '/api/feedback'
+            body = json.dumps({
+                'student_name': f'Load Student {roll}',
+                'student_roll': f'LD{roll:05d}',
+                'feedback_date': f'2026-01-{rng.randint(1, 31):02d}',
+                'meal_type': rng.choice(['Breakfast', 'Lunch', 'Dinner']),
+                'items': [{'item_name': 'Rice', 'taste': rng.randint(1, 5)}],
+            })
+            headers = {'Content-Type': 'application/json'}
+        else:
+            method, path, body, headers = 'GET', rng.choice(READ_PATHS), None, {}
+
+        started = time.perf_counter()
+        try:
+            conn.request(method, path, body=body, headers=headers)
+            response = conn.getresponse()
+            response.read()
+            statuses[response.status] = statuses.get(response.status, 0) + 1
+            if response.status >= 500:
+                errors += 1
+        except (OSError, http.client.HTTPException):
+            errors += 1
+            conn.close()
+            conn = http.client.HTTPConnection(url.hostname, url.port or 80, timeout=30)
+            continue
+        latencies.append(time.perf_counter() - started)
+    conn.close()
+    results.append((latencies, errors, statuses))
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument('--url', default='http://127.0.0.1:8000')
+    parser.add_argument('--concurrency', type=int, default=32)
+    parser.add_argument('--duration', type=float, default=20.0, help='seconds')
+    parser.add_argument('--write-ratio', type=float, default=0.0,
+                        help='fraction of requests that POST feedback (0-1)')
+    args = parser.parse_args()
+
+    url = urlsplit(args.url)
+    results = []
+    deadline = time.perf_counter() + args.duration
+    threads = [
+        threading.Thread(target=client_loop, args=(url, deadline, args.write_ratio, i, results))
+        for i in range(args.concurrency)
+    ]
+    started = time.perf_counter()
+    for t in threads:
+        t.start()
+    for t in threads:
+        t.join()
+    elapsed = time.perf_counter() - started
+
+    latencies = sorted(l for r in results for l in r[0])
+    errors = sum(r[1] for r in results)
+    statuses = {}
+    for r in results:
+        for status, n in r[2].items():
+            statuses[status] = statuses.get(status, 0) + n
+
+    print(f"\n📊 {args.url}  concurrency={args.concurrency}  duration={elapsed:.1f}s  write_ratio={args.write_ratio}")
+    print(f"   Requests : {len(latencies)}  ({len(latencies) / elapsed:.0f} req/s)")
+    print(f"   Errors   : {errors}")
+    print(f"   Statuses : {dict(sorted(statuses.items()))}")
+    print(f"   Latency  : p50 {percentile(latencies, 0.50) * 1000:.1f}ms  "
+          f"p95 {percentile(latencies, 0.95) * 1000:.1f}ms  p99 {percentile(latencies, 0.99) * 1000:.1f}ms\n")
+
+
+if __name__ == '__main__':
+    main()
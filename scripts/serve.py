@@ -0,0 +1,71 @@
+"""
+Production launcher: serves asgi:app with several uvicorn worker processes.
+
+    python scripts/serve.py --workers 4 --port 8000 --db scripts/database/mess_management.db
+
+Each worker has its own connection pool and write queue; SQLite's locking (WAL,
+BEGIN IMMEDIATE, busy_timeout) serialises writers across processes and table_versions
+keeps the per-worker response caches honest. Ctrl+C / SIGTERM stops accepting
+connections, lets in-flight requests finish (up to --graceful-timeout seconds), then
+flushes each worker's write queue and closes its connections.
+"""
+import argparse
+import os
+import sys
+from pathlib import Path
+
+ROOT = Path(__file__).resolve().parent.parent
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument('--host', default='0.0.0.0')
+    parser.add_argument('--port', type=int, default=8000)
+    parser.add_argument('--workers', type=int, default=min(4, os.cpu_count() or 1))
+    parser.add_argument('--threads', type=int, help='request threads per worker (MESS_ASGI_THREADS)')
+    parser.add_argument('--sse-threads', type=int,
+                        help='live event stream threads, and so /api/stream clients, per worker (MESS_SSE_THREADS)')
+    parser.add_argument('--db', help='database path (MESS_DB_PATH)')
+    parser.add_argument('--snapshot', action='store_true',
+                        help='serve listing reads from the columnar in-memory snapshot (MESS_SNAPSHOT)')
+    parser.add_argument('--log-level', help='DEBUG, INFO, WARNING or ERROR (MESS_LOG_LEVEL)')
+    parser.add_argument('--log-file', help='append JSON log lines here instead of stderr (MESS_LOG_FILE)')
+    parser.add_argument('--graceful-timeout', type=int, default=30,
+                        help='seconds to wait for in-flight requests on shutdown')
+    args = parser.parse_args()
+
+    try:
+        import uvicorn
+    except ImportError:
+        print("uvicorn is required for production serving: pip install -r requirements.txt")
+        raise SystemExit(1)
+
+    # Workers are separate processes, so settings travel through the environment
+    if args.db:
+        os.environ['MESS_DB_PATH'] = str(Path(args.db).resolve())
+    if args.threads:
+        os.environ['MESS_ASGI_THREADS'] = str(args.threads)
+    if args.sse_threads:
+        os.environ['MESS_SSE_THREADS'] = str(args.sse_threads)
+    if args.snapshot:
+        os.environ['MESS_SNAPSHOT'] = '1'
+    if args.log_level:
+        os.environ['MESS_LOG_LEVEL'] = args.log_level.upper()
+    if args.log_file:
+        os.environ['MESS_LOG_FILE'] = str(Path(args.log_file).resolve())
+
+    print(f"\n🚀 Serving asgi:app on http://{args.host}:{args.port} with {args.workers} worker(s)\n")
+    uvicorn.run(
+        'asgi:app',
+        app_dir=str(ROOT),
+        host=args.host,
+        port=args.port,
+        workers=args.workers,
+        lifespan='on',
+        access_log=False,
+        timeout_graceful_shutdown=args.graceful_timeout,
+    )
+
+
+if __name__ == '__main__':
+    sys.exit(main())
@@ -1,117 +1,2234 @@
-from flask import Flask, request, jsonify, send_from_directory, make_response
+from flask import Flask, g, has_request_context, request, jsonify, send_file, send_from_directory
+from flask import request_finished, request_started
+from flask.json.provider import DefaultJSONProvider
 from flask_cors import CORS
 import sqlite3
+import atexit
+import base64
 import csv
+import functools
+import gzip
+import hashlib
+import html
 import io
+import json
+import logging
+import logging.handlers
+import mimetypes
+import os
+import queue
+import random
+import re
+import stat
+import sys
+import tempfile
+import threading
+import time
+import uuid
+import zlib
+from array import array
+from bisect import bisect_left, bisect_right
+from collections import OrderedDict, deque
+from concurrent.futures import Future, InvalidStateError, ThreadPoolExecutor, TimeoutError as FutureTimeout
+from contextlib import contextmanager
+from itertools import compress
 from pathlib import Path
-from datetime import datetime
+from datetime import date, datetime, timezone
+from werkzeug.security import safe_join
+
+try:
+    import orjson  # optional, much faster JSON encoding for the large list responses
+except ImportError:
+    orjson = None
+
+try:
+    import brotli  # optional, smaller precompressed dashboard pages
+except ImportError:
+    brotli = None
 
 APP = Flask(__name__, static_folder='.')
 CORS(APP)
 
-DB_PATH = Path("C:/Users/hp/Desktop/Final_CMC/cmc-mess-feedback-portal/scripts/database/mess_management.db")
-def get_db_connection():
-    """Create a database connection to mess_management.db."""
-    if not DB_PATH.exists():
-        raise FileNotFoundError(f"Database not found at {DB_PATH}. Please ensure it exists.")
-    conn = sqlite3.connect(str(DB_PATH))
-    conn.row_factory = sqlite3.Row
-    return conn
+# MESS_DB_PATH overrides the default location (used by scripts/serve.py workers)
+DB_PATH = Path(os.environ.get(
+    'MESS_DB_PATH',
+    "C:/Users/hp/Desktop/Final_CMC/cmc-mess-feedback-portal/scripts/database/mess_management.db"))
+
+# Connection pool sizing. Connections are opened lazily up to DB_POOL_SIZE and
+# handed back to the pool after each request instead of being closed.
+DB_POOL_SIZE = 8
+DB_POOL_TIMEOUT = 10.0      # seconds to wait for a free connection
+DB_POOL_PING_AFTER = 30.0   # re-validate connections idle longer than this
+
+# In-process cache of serialised JSON for the GET range endpoints
+RESPONSE_CACHE_SIZE = 256   # entries
+RESPONSE_CACHE_TTL = 60.0   # seconds; an upper bound on staleness, writes invalidate sooner
+
+# In-process roll_no -> students.id map used by the feedback writes
+STUDENT_ID_CACHE_SIZE = 50000  # entries
+STUDENT_IMPORT_CHUNK = 1000    # roster rows per write-queue operation
+
+# Server-Sent Events live feed
+SSE_CLIENT_BUFFER = 100     # events buffered per client before the oldest is dropped
+SSE_REPLAY = 256            # recent events kept for clients reconnecting with Last-Event-ID
+SSE_MAX_CLIENTS = 200
+SSE_HEARTBEAT = 15.0        # seconds between keep-alive comments on an idle stream
+SSE_RETRY_MS = 3000         # client reconnect delay
+
+# Columnar in-memory snapshot for the listing endpoints (off by default; MESS_SNAPSHOT=1
+# or --snapshot turns it on)
+SNAPSHOT_ENABLED = os.environ.get('MESS_SNAPSHOT') == '1'
+
+# Compression of JSON and other buffered responses, negotiated from Accept-Encoding
+COMPRESS_MIN_SIZE = 1024    # bytes; smaller bodies are sent as they are
+COMPRESS_LEVEL = 6
+
+# Logging: JSON lines written by a background thread (see configure_logging)
+LOG_LEVEL = os.environ.get('MESS_LOG_LEVEL', 'INFO').upper()
+LOG_DEBUG_SAMPLE = float(os.environ.get('MESS_LOG_DEBUG_SAMPLE', '0.01'))  # share of DEBUG records kept
+LOG_FILE = os.environ.get('MESS_LOG_FILE')  # stderr when unset
+LOG_QUEUE_SIZE = 10000      # records waiting for the writer thread before new ones are dropped
+
+# Static files (the dashboard pages) held in memory, precompressed
+STATIC_CACHE_MAX_FILE = 2 * 1024 * 1024  # bytes; larger files are streamed from disk
+STATIC_RECHECK = 1.0        # seconds between mtime checks of a cached file
+STATIC_MAX_AGE = 3600       # seconds browsers may reuse non-HTML assets; pages always revalidate
+STATIC_PRELOAD = ('*.html', 'assets/*')
+STATIC_COMPRESSIBLE = {'application/javascript', 'application/json', 'image/svg+xml'}
+
+# Background CSV exports (POST /api/exports), spooled as gzip files shared by all workers
+EXPORT_DIR = Path(os.environ.get('MESS_EXPORT_DIR', Path(tempfile.gettempdir()) / 'mess-exports'))
+EXPORT_WORKERS = 2          # exports generated at once per process
+EXPORT_TTL = float(os.environ.get('MESS_EXPORT_TTL', '3600'))  # seconds a finished export is kept
+EXPORT_PROGRESS_INTERVAL = 0.5  # seconds between progress updates of a running export
+EXPORT_HEARTBEAT = 5.0          # seconds between liveness updates of queued and running exports
+EXPORT_STALE_AFTER = 4 * EXPORT_HEARTBEAT  # an unfinished export not updated for this long was abandoned
+EXPORT_SWEEP_INTERVAL = 60.0    # seconds between scans for expired exports
+
+# Single-writer queue. Writes from all request threads are applied by one
+# background thread, up to DB_WRITE_BATCH operations per transaction.
+DB_WRITE_BATCH = 64
+DB_WRITE_TIMEOUT = 15.0     # seconds a request waits for its write to commit
+
+# Applied once when a connection is opened, not on every checkout.
+SQLITE_PRAGMAS = (
+    "PRAGMA journal_mode=WAL",
+    "PRAGMA synchronous=NORMAL",
+    "PRAGMA mmap_size=268435456",
+    "PRAGMA cache_size=-16000",
+    "PRAGMA temp_store=MEMORY",
+    "PRAGMA busy_timeout=5000",
+)
+
+
+def get_db_connection():
+    """Open a new connection to mess_management.db with the pool PRAGMAs applied."""
+    if not DB_PATH.exists():
+        raise FileNotFoundError(f"Database not found at {DB_PATH}. Please ensure it exists.")
+    conn = sqlite3.connect(str(DB_PATH), check_same_thread=False, factory=TimedConnection)
+    conn.row_factory = sqlite3.Row
+    for pragma in SQLITE_PRAGMAS:
+        conn.execute(pragma)
+    ensure_schema(conn)
+    return conn
+
+
+class ConnectionPool:
+    """
+    Bounded pool of reusable SQLite connections shared by the request threads.
+    Use `with DB_POOL.connection() as conn:` instead of opening a connection per query.
+    """
+
+    def __init__(self, max_size=DB_POOL_SIZE, timeout=DB_POOL_TIMEOUT, ping_after=DB_POOL_PING_AFTER):
+        self.max_size = max_size
+        self.timeout = timeout
+        self.ping_after = ping_after
+        self._idle = []  # (conn, last_used) pairs, most recently used last
+        self._size = 0
+        self._available = threading.Condition(threading.Lock())
+        self._stats = {
+            'opened': 0, 'reused': 0, 'discarded': 0,
+            'waits': 0, 'wait_time_ms': 0.0, 'timeouts': 0,
+        }
+
+    def acquire(self):
+        """Check out a connection, opening a new one if the pool is not full yet."""
+        started = time.perf_counter()
+        waited = False
+        with self._available:
+            while True:
+                if self._idle:
+                    conn, last_used = self._idle.pop()
+                    break
+                if self._size < self.max_size:
+                    self._size += 1
+                    conn, last_used = None, None
+                    break
+                waited = True
+                remaining = self.timeout - (time.perf_counter() - started)
+                if remaining <= 0:
+                    self._stats['timeouts'] += 1
+                    raise TimeoutError(f"No database connection available after {self.timeout}s")
+                self._available.wait(remaining)
+            if waited:
+                self._stats['waits'] += 1
+                self._stats['wait_time_ms'] += (time.perf_counter() - started) * 1000
+
+        if conn is None:
+            try:
+                conn = get_db_connection()
+            except Exception:
+                with self._available:
+                    self._size -= 1
+                    self._available.notify()
+                raise
+            with self._available:
+                self._stats['opened'] += 1
+            return conn
+
+        # Connections that sat idle for a while are checked before reuse
+        if time.monotonic() - last_used > self.ping_after:
+            try:
+                conn.execute("SELECT 1")
+            except sqlite3.Error:
+                self._discard(conn)
+                return self.acquire()
+        with self._available:
+            self._stats['reused'] += 1
+        return conn
+
+    def release(self, conn, broken=False):
+        """Return a connection to the pool, or drop it if it is no longer usable."""
+        if not broken and conn.in_transaction:
+            try:
+                conn.rollback()
+            except sqlite3.Error:
+                broken = True
+        if broken:
+            self._discard(conn)
+            return
+        with self._available:
+            self._idle.append((conn, time.monotonic()))
+            self._available.notify()
+
+    def _discard(self, conn):
+        try:
+            conn.close()
+        except sqlite3.Error:
+            pass
+        with self._available:
+            self._size -= 1
+            self._stats['discarded'] += 1
+            self._available.notify()
+
+    @contextmanager
+    def connection(self):
+        """Borrow a connection for the duration of a `with` block."""
+        conn = self.acquire()
+        broken = False
+        try:
+            yield conn
+        except sqlite3.Error as e:
+            # Closed or corrupted handles are dropped; lock and constraint errors are not
+            broken = isinstance(e, (sqlite3.ProgrammingError, sqlite3.InterfaceError)) \
+                or type(e) is sqlite3.DatabaseError
+            raise
+        finally:
+            self.release(conn, broken)
+
+    def close_all(self):
+        """Close every idle connection (used on shutdown)."""
+        with self._available:
+            idle, self._idle = self._idle, []
+            self._size -= len(idle)
+        for conn, _ in idle:
+            try:
+                conn.close()
+            except sqlite3.Error:
+                pass
+
+    def stats(self):
+        """Return a snapshot of pool counters."""
+        with self._available:
+            stats = dict(self._stats)
+            stats['wait_time_ms'] = round(stats['wait_time_ms'], 2)
+            stats['size'] = self._size
+            stats['idle'] = len(self._idle)
+            stats['in_use'] = self._size - len(self._idle)
+            stats['max_size'] = self.max_size
+        return stats
+
+
+class WriteTimeout(TimeoutError):
+    """
+    A write did not commit within the writer's timeout. If `pending` is False it was
+    withdrawn before it ran and nothing was written; if True it had already started and
+    will still commit (or fail) on its own, so it must not be resubmitted.
+    """
+
+    def __init__(self, message, pending):
+        super().__init__(message)
+        self.pending = pending
+
+
+class DatabaseWriter:
+    """
+    Serialises all writes through one background thread and one connection.
+    Queued operations are grouped into a single transaction per batch, each in its
+    own SAVEPOINT so that one failing operation does not roll back its neighbours.
+    Readers keep using DB_POOL concurrently under WAL.
+    """
+
+    def __init__(self, batch_size=DB_WRITE_BATCH, timeout=DB_WRITE_TIMEOUT):
+        self.batch_size = batch_size
+        self.timeout = timeout
+        self._queue = queue.Queue()
+        self._thread = None
+        self._lock = threading.Lock()
+        self._stats = {'batches': 0, 'operations': 0, 'failed': 0, 'largest_batch': 0, 'cancelled': 0}
+
+    def start(self):
+        """Start the writer thread if it is not running yet."""
+        with self._lock:
+            if self._thread is None or not self._thread.is_alive():
+                self._thread = threading.Thread(target=self._run, name='db-writer', daemon=True)
+                self._thread.start()
+
+    def stop(self):
+        """Drain the queue and stop the writer thread."""
+        with self._lock:
+            thread, self._thread = self._thread, None
+        if thread is not None and thread.is_alive():
+            self._queue.put(None)
+            thread.join(self.timeout)
+
+    def submit(self, operation, *args, on_commit=None):
+        """
+        Queue `operation(cur, *args)` and block until its batch has committed.
+        Returns the operation's return value or re-raises its exception.
+        After `timeout` seconds an operation that has not started is withdrawn; one that
+        has keeps going, and `on_commit(result)` then runs on the writer thread once it
+        commits (otherwise it runs here before returning). Either case raises WriteTimeout.
+        """
+        self.start()
+        future = Future()
+        self._queue.put((operation, args, future))
+        try:
+            result = future.result(timeout=self.timeout)
+        except FutureTimeout:
+            if future.cancel():
+                raise WriteTimeout(f"Write not started within {self.timeout}s; nothing was saved", False)
+            if not future.done():
+                if on_commit is not None:
+                    future.add_done_callback(lambda done: self._commit_late(done, on_commit))
+                raise WriteTimeout(f"Write still in progress after {self.timeout}s; it will be saved", True)
+            result = future.result()
+        if on_commit is not None:
+            on_commit(result)
+        return result
+
+    @staticmethod
+    def _commit_late(future, on_commit):
+        if future.exception() is not None:
+            LOG.error("Write failed after its caller timed out: %s", future.exception())
+            return
+        try:
+            on_commit(future.result())
+        except Exception as e:
+            LOG.exception("Error finishing a late write: %s", e)
+
+    def stats(self):
+        """Return a snapshot of writer counters."""
+        with self._lock:
+            stats = dict(self._stats)
+        stats['queued'] = self._queue.qsize()
+        return stats
+
+    def _run(self):
+        conn = None
+        stopping = False
+        while not stopping:
+            item = self._queue.get()
+            if item is None:
+                break
+            batch = [item]
+            while len(batch) < self.batch_size:
+                try:
+                    item = self._queue.get_nowait()
+                except queue.Empty:
+                    break
+                if item is None:
+                    stopping = True
+                    break
+                batch.append(item)
+
+            try:
+                if conn is None:
+                    conn = get_db_connection()
+                    conn.isolation_level = None  # transactions are managed explicitly
+                self._apply(conn, batch)
+            except Exception as e:
+                # The whole batch is lost (e.g. COMMIT failed); reopen on the next batch
+                for _, _, future in batch:
+                    try:
+                        future.set_exception(e)
+                    except InvalidStateError:
+                        pass  # already resolved, or withdrawn by its timed-out caller meanwhile
+                with self._lock:
+                    self._stats['failed'] += len(batch)
+                if conn is not None:
+                    try:
+                        conn.close()
+                    except sqlite3.Error:
+                        pass
+                    conn = None
+        if conn is not None:
+            conn.close()
+
+    def _apply(self, conn, batch):
+        cur = conn.cursor()
+        cur.execute("BEGIN IMMEDIATE")
+        outcomes = []
+        try:
+            for operation, args, future in batch:
+                if not future.set_running_or_notify_cancel():
+                    # Its caller timed out and withdrew it before it started
+                    with self._lock:
+                        self._stats['cancelled'] += 1
+                    continue
+                cur.execute("SAVEPOINT write_op")
+                try:
+                    result = operation(cur, *args)
+                except Exception as e:
+                    cur.execute("ROLLBACK TO write_op")
+                    cur.execute("RELEASE write_op")
+                    outcomes.append((future, e, False))
+                else:
+                    cur.execute("RELEASE write_op")
+                    outcomes.append((future, result, True))
+            cur.execute("COMMIT")
+        except Exception:
+            if conn.in_transaction:
+                conn.rollback()
+            raise
+
+        # Results are only handed back once the batch is durable
+        failed = 0
+        for future, value, ok in outcomes:
+            if ok:
+                future.set_result(value)
+            else:
+                failed += 1
+                future.set_exception(value)
+        with self._lock:
+            self._stats['batches'] += 1
+            self._stats['operations'] += len(outcomes)
+            self._stats['failed'] += failed
+            self._stats['largest_batch'] = max(self._stats['largest_batch'], len(batch))
+
+
+DB_POOL = ConnectionPool()
+DB_WRITER = DatabaseWriter()
+
+# ============================================================================
+# LOGGING
+# ============================================================================
+
+class JsonLineFormatter(logging.Formatter):
+    """One JSON object per record: time, level, message, request context and `fields`."""
+
+    def format(self, record):
+        entry = {
+            'ts': datetime.fromtimestamp(record.created, timezone.utc).isoformat(timespec='milliseconds'),
+            'level': record.levelname,
+            'logger': record.name,
+            'msg': record.getMessage(),
+        }
+        for key in ('request_id', 'method', 'route'):
+            value = getattr(record, key, None)
+            if value is not None:
+                entry[key] = value
+        entry.update(getattr(record, 'fields', None) or {})
+        return json.dumps(entry, default=str, ensure_ascii=False)
+
+
+class RequestContextFilter(logging.Filter):
+    """
+    Runs on the thread that logs: stamps records with the current request and drops a
+    share of sampled records. DEBUG records are kept with probability
+    LOG_DEBUG_SAMPLE unless they pass their own `extra={'sample': rate}`.
+    """
+
+    def __init__(self, debug_sample):
+        super().__init__()
+        self.debug_sample = debug_sample
+        self._random = random.Random()
+
+    def filter(self, record):
+        rate = getattr(record, 'sample', self.debug_sample if record.levelno <= logging.DEBUG else 1.0)
+        if rate < 1.0 and self._random.random() >= rate:
+            return False
+        if has_request_context():
+            record.request_id = g.get('request_id')
+            record.method = request.method
+            record.route = request.url_rule.rule if request.url_rule is not None else request.path
+        return True
+
+
+class DroppingQueueHandler(logging.handlers.QueueHandler):
+    """QueueHandler that drops records (and counts them) instead of blocking when the queue is full."""
+
+    dropped = 0
+
+    def enqueue(self, record):
+        try:
+            self.queue.put_nowait(record)
+        except queue.Full:
+            self.dropped += 1
+
+
+def configure_logging(level=LOG_LEVEL, debug_sample=LOG_DEBUG_SAMPLE, path=LOG_FILE):
+    """
+    Route the 'mess' logger through a bounded queue to a background QueueListener that
+    writes JSON lines to LOG_FILE (stderr when unset), so request threads never wait on
+    the terminal or a log collector. Returns the started listener.
+    """
+    target = logging.FileHandler(path, encoding='utf-8') if path else logging.StreamHandler(sys.stderr)
+    target.setFormatter(JsonLineFormatter())
+    handler = DroppingQueueHandler(queue.Queue(LOG_QUEUE_SIZE))
+    handler.addFilter(RequestContextFilter(debug_sample))
+    LOG.handlers[:] = [handler]
+    LOG.setLevel(level)
+    LOG.propagate = False
+    listener = logging.handlers.QueueListener(handler.queue, target)
+    listener.start()
+    atexit.register(listener.stop)  # flushes what is still queued
+    return listener
+
+
+LOG = logging.getLogger('mess')
+LOG_LISTENER = configure_logging()
+
+# ============================================================================
+# INSTRUMENTATION
+# ============================================================================
+
+# Request latency histogram buckets, in seconds
+LATENCY_BUCKETS = (0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1.0, 2.5, 5.0, 10.0)
+SQL_STATEMENTS_MAX = 500    # distinct statements tracked; the rest are counted as 'other'
+SQL_STATEMENT_WIDTH = 200   # characters of normalised SQL kept as the label
+SLOW_QUERY_LOG_SIZE = 100   # most recent slow statements kept for /api/debug/slow-queries
+
+_placeholder_run = re.compile(r'\?(?:\s*,\s*\?)+')
+_whitespace = re.compile(r'\s+')
+
+
+def normalise_sql(sql):
+    """Collapse whitespace and IN-list placeholder runs so one statement maps to one label."""
+    sql = _whitespace.sub(' ', sql).strip()
+    return _placeholder_run.sub('?, ...', sql)[:SQL_STATEMENT_WIDTH]
+
+
+class Metrics:
+    """
+    Per-process counters for /api/metrics: request latency per route, responses per
+    status, and execution count and time per SQL statement. Each worker process of
+    scripts/serve.py keeps its own; scrape them per worker or sum them.
+    """
+
+    def __init__(self, buckets=LATENCY_BUCKETS, max_statements=SQL_STATEMENTS_MAX):
+        self.buckets = buckets
+        self.max_statements = max_statements
+        self._lock = threading.Lock()
+        self._routes = {}       # (method, route) -> [bucket counts..., +Inf count, sum]
+        self._responses = {}    # (method, route, status) -> count
+        self._statements = {}   # normalised sql -> [count, total seconds, max seconds]
+        self.slow_queries = deque(maxlen=SLOW_QUERY_LOG_SIZE)
+
+    def observe_request(self, method, route, status, seconds):
+        with self._lock:
+            series = self._routes.get((method, route))
+            if series is None:
+                series = self._routes[(method, route)] = [0] * (len(self.buckets) + 1) + [0.0]
+            series[bisect_left(self.buckets, seconds)] += 1
+            series[-1] += seconds
+            key = (method, route, status)
+            self._responses[key] = self._responses.get(key, 0) + 1
+
+    def observe_statement(self, sql, seconds):
+        label = normalise_sql(sql)
+        with self._lock:
+            entry = self._statements.get(label)
+            if entry is None:
+                if len(self._statements) >= self.max_statements:
+                    label = 'other'
+                    entry = self._statements.get(label)
+                if entry is None:
+                    entry = self._statements[label] = [0, 0.0, 0.0]
+            entry[0] += 1
+            entry[1] += seconds
+            entry[2] = max(entry[2], seconds)
+
+    def snapshot(self):
+        """Copies of the counters, taken under the lock."""
+        with self._lock:
+            routes = {key: list(series) for key, series in self._routes.items()}
+            responses = dict(self._responses)
+            statements = {label: list(entry) for label, entry in self._statements.items()}
+        return routes, responses, statements
+
+
+METRICS = Metrics()
+# Statements slower than this many milliseconds are logged with their query plan (off when unset)
+SLOW_QUERY_MS = float(os.environ['MESS_SLOW_QUERY_MS']) if os.environ.get('MESS_SLOW_QUERY_MS') else None
+
+
+class TimedCursor(sqlite3.Cursor):
+    """
+    Cursor that times each statement from execute() until its rows are exhausted and
+    reports it to METRICS. The sqlite3 module exposes a trace callback but no profile
+    hook, so timing is taken around the cursor calls instead.
+    """
+    _sql = None
+
+    def execute(self, sql, parameters=()):
+        self._finish()
+        started = time.perf_counter()
+        try:
+            super().execute(sql, parameters)
+        finally:
+            self._sql, self._params, self._elapsed = sql, parameters, time.perf_counter() - started
+        if self.description is None:
+            self._finish()
+        return self
+
+    def executemany(self, sql, seq_of_parameters):
+        self._finish()
+        started = time.perf_counter()
+        try:
+            super().executemany(sql, seq_of_parameters)
+        finally:
+            self._sql, self._params, self._elapsed = sql, None, time.perf_counter() - started
+        self._finish()
+        return self
+
+    def fetchone(self):
+        started = time.perf_counter()
+        row = super().fetchone()
+        self._elapsed += time.perf_counter() - started
+        if row is None:
+            self._finish()
+        return row
+
+    def fetchmany(self, size=None):
+        started = time.perf_counter()
+        rows = super().fetchmany(self.arraysize if size is None else size)
+        self._elapsed += time.perf_counter() - started
+        if not rows:
+            self._finish()
+        return rows
+
+    def fetchall(self):
+        started = time.perf_counter()
+        rows = super().fetchall()
+        self._elapsed += time.perf_counter() - started
+        self._finish()
+        return rows
+
+    def __next__(self):
+        started = time.perf_counter()
+        try:
+            row = super().__next__()
+        except StopIteration:
+            self._elapsed += time.perf_counter() - started
+            self._finish()
+            raise
+        self._elapsed += time.perf_counter() - started
+        return row
+
+    def close(self):
+        self._finish()
+        super().close()
+
+    def __del__(self):
+        try:
+            self._finish(explain=False)
+        except Exception:
+            pass  # interpreter shutdown
+
+    def _finish(self, explain=True):
+        sql = self._sql
+        if sql is None:
+            return
+        self._sql = None
+        METRICS.observe_statement(sql, self._elapsed)
+        if has_request_context():
+            g.db_time = g.get('db_time', 0.0) + self._elapsed
+        if SLOW_QUERY_MS is not None and self._elapsed * 1000 >= SLOW_QUERY_MS:
+            log_slow_query(self.connection if explain else None, sql, self._params, self._elapsed)
+
+
+class TimedConnection(sqlite3.Connection):
+    """Connection whose cursors, including those behind conn.execute(), are TimedCursors."""
+
+    def cursor(self, factory=TimedCursor):
+        return super().cursor(factory)
+
+    def execute(self, sql, parameters=()):
+        return self.cursor().execute(sql, parameters)
+
+    def executemany(self, sql, seq_of_parameters):
+        return self.cursor().executemany(sql, seq_of_parameters)
+
+
+def log_slow_query(conn, sql, params, seconds):
+    """Record a slow statement in METRICS.slow_queries with its EXPLAIN QUERY PLAN."""
+    plan = []
+    if conn is not None and params is not None and sql.lstrip()[:6].upper() in ('SELECT', 'WITH', 'INSERT', 'UPDATE', 'DELETE'):
+        try:
+            # A plain cursor, so explaining does not time (or explain) itself
+            plan = [row[3] for row in sqlite3.Cursor(conn).execute(f"EXPLAIN QUERY PLAN {sql}", params)]
+        except sqlite3.Error as e:
+            plan = [f"(no plan: {e})"]
+    entry = {
+        'sql': normalise_sql(sql),
+        'ms': round(seconds * 1000, 2),
+        'plan': plan,
+        'at': datetime.now(timezone.utc).isoformat(timespec='seconds'),
+        'route': request.path if has_request_context() else None,
+    }
+    METRICS.slow_queries.append(entry)
+    LOG.warning("Slow query (%sms): %s", entry['ms'], entry['sql'], extra={'fields': {'plan': plan}})
+
+
+def request_started_timer(sender, **extra):
+    g.request_started = time.perf_counter()
+    g.request_id = request.headers.get('X-Request-ID') or uuid.uuid4().hex[:16]
+
+
+def request_finished_timer(sender, response, **extra):
+    started = g.get('request_started')
+    if started is None:
+        return
+    duration = time.perf_counter() - started
+    route = request.url_rule.rule if request.url_rule is not None else 'unmatched'
+    METRICS.observe_request(request.method, route, response.status_code, duration)
+    response.headers['X-Request-ID'] = g.request_id
+    LOG.info("%s %s %s", request.method, request.full_path.rstrip('?'), response.status_code, extra={'fields': {
+        'status': response.status_code,
+        'duration_ms': round(duration * 1000, 2),
+        'db_ms': round(g.get('db_time', 0.0) * 1000, 2),
+    }})
+
+
+# Signals rather than before/after_request hooks, so the timing (and the access log
+# line) includes every after_request handler (compression, ETags)
+request_started.connect(request_started_timer, APP)
+request_finished.connect(request_finished_timer, APP)
+
+
+def prometheus_label(value):
+    return str(value).replace('\\', '\\\\').replace('\n', '\\n').replace('"', '\\"')
+
+
+def render_metrics():
+    """All counters in the Prometheus text exposition format (0.0.4)."""
+    lines = []
+
+    def metric(name, kind, help_text, samples):
+        lines.append(f"# HELP {name} {help_text}")
+        lines.append(f"# TYPE {name} {kind}")
+        for suffix, labels, value in samples:
+            label_text = ','.join(f'{k}="{prometheus_label(v)}"' for k, v in labels.items())
+            lines.append(f"{name}{suffix}{{{label_text}}} {value}" if label_text else f"{name}{suffix} {value}")
+
+    routes, responses, statements = METRICS.snapshot()
+    histogram = []
+    for (method, route), series in sorted(routes.items()):
+        labels = {'method': method, 'route': route}
+        cumulative = 0
+        for bound, count in zip(METRICS.buckets, series):
+            cumulative += count
+            histogram.append(('_bucket', {**labels, 'le': repr(bound)}, cumulative))
+        cumulative += series[len(METRICS.buckets)]
+        histogram.append(('_bucket', {**labels, 'le': '+Inf'}, cumulative))
+        histogram.append(('_sum', labels, round(series[-1], 6)))
+        histogram.append(('_count', labels, cumulative))
+    metric('mess_http_request_duration_seconds', 'histogram', 'Request latency by route.', histogram)
+    metric('mess_http_requests_total', 'counter', 'Responses by route and status.', [
+        ('', {'method': m, 'route': r, 'status': s}, n) for (m, r, s), n in sorted(responses.items())])
+
+    ordered = sorted(statements.items(), key=lambda item: -item[1][1])
+    metric('mess_sql_statements_total', 'counter', 'Executions per SQL statement.',
+           [('', {'statement': sql}, entry[0]) for sql, entry in ordered])
+    metric('mess_sql_statement_seconds_total', 'counter', 'Execution and fetch time per SQL statement.',
+           [('', {'statement': sql}, round(entry[1], 6)) for sql, entry in ordered])
+    metric('mess_sql_statement_max_seconds', 'gauge', 'Slowest single execution per SQL statement.',
+           [('', {'statement': sql}, round(entry[2], 6)) for sql, entry in ordered])
+
+    pool = DB_POOL.stats()
+    metric('mess_db_pool_waits_total', 'counter', 'Checkouts that had to wait for a connection.',
+           [('', {}, pool['waits'])])
+    metric('mess_db_pool_wait_seconds_total', 'counter', 'Time spent waiting for a pooled connection.',
+           [('', {}, round(pool['wait_time_ms'] / 1000, 6))])
+    metric('mess_db_pool_timeouts_total', 'counter', 'Checkouts that gave up waiting.',
+           [('', {}, pool['timeouts'])])
+    metric('mess_db_pool_connections', 'gauge', 'Open pooled connections by state.',
+           [('', {'state': 'in_use'}, pool['in_use']), ('', {'state': 'idle'}, pool['idle'])])
+
+    writer = DB_WRITER.stats()
+    metric('mess_db_writes_total', 'counter', 'Write operations applied by the writer thread.',
+           [('', {}, writer['operations'])])
+    metric('mess_db_write_failures_total', 'counter', 'Write operations that failed.', [('', {}, writer['failed'])])
+    metric('mess_db_write_queue', 'gauge', 'Writes waiting for the writer thread.', [('', {}, writer['queued'])])
+
+    cache = RESPONSE_CACHE.stats()
+    for name in ('hits', 'misses', 'evictions', 'invalidations'):
+        metric(f'mess_response_cache_{name}_total', 'counter', f'Response cache {name}.', [('', {}, cache[name])])
+    metric('mess_response_cache_hit_ratio', 'gauge', 'Response cache hits / lookups.', [('', {}, cache['hit_ratio'])])
+    metric('mess_response_cache_entries', 'gauge', 'Cached responses.', [('', {}, cache['entries'])])
+    student_ids = STUDENT_IDS.stats()
+    metric('mess_student_id_cache_lookups_total', 'counter', 'Roll number -> student id cache lookups.',
+           [('', {'result': 'hit'}, student_ids['hits']), ('', {'result': 'miss'}, student_ids['misses'])])
+
+    metric('mess_sse_clients', 'gauge', 'Open /api/stream connections.', [('', {}, EVENT_BROKER.stats()['clients'])])
+    if SNAPSHOT is not None:
+        snapshot = SNAPSHOT.stats()
+        metric('mess_snapshot_reads_total', 'counter', 'Listing reads served from the snapshot.',
+               [('', {}, snapshot['reads'])])
+        metric('mess_snapshot_fallbacks_total', 'counter', 'Listing reads that fell back to SQLite.',
+               [('', {}, snapshot['fallbacks'])])
+    return '\n'.join(lines) + '\n'
+
+# ============================================================================
+# SCHEMA MAINTENANCE
+# ============================================================================
+
+_schema_lock = threading.Lock()
+_schema_ready_for = None  # DB_PATH the schema checks last ran against
+
+
+def has_unique_index(conn, table, columns):
+    """True if `table` has a UNIQUE index (or constraint) on exactly `columns`."""
+    for index in conn.execute(f"PRAGMA index_list({table})").fetchall():
+        if not index['unique']:
+            continue
+        indexed = [col['name'] for col in conn.execute(f"PRAGMA index_info('{index['name']}')").fetchall()]
+        if indexed == list(columns):
+            return True
+    return False
+
+
+def migrate_unique_constraints(conn):
+    """
+    Add the UNIQUE constraints the UPSERT write paths rely on to databases created
+    before they existed, collapsing duplicate rows first:
+      - student_feedback(student_id, feedback_date): keep the newest row, filling each
+        meal rating from the newest duplicate that has one
+      - vendor_responses(fine_id): keep the newest response
+    """
+    needs_feedback = not has_unique_index(conn, 'student_feedback', ('student_id', 'feedback_date'))
+    needs_responses = not has_unique_index(conn, 'vendor_responses', ('fine_id',))
+    if needs_feedback:
+        conn.execute("""
+            UPDATE student_feedback AS sf SET
+                breakfast_rating = COALESCE((SELECT d.breakfast_rating FROM student_feedback d
+                    WHERE d.student_id = sf.student_id AND d.feedback_date = sf.feedback_date
+                      AND d.breakfast_rating > 0 ORDER BY d.id DESC LIMIT 1), sf.breakfast_rating),
+                lunch_rating = COALESCE((SELECT d.lunch_rating FROM student_feedback d
+                    WHERE d.student_id = sf.student_id AND d.feedback_date = sf.feedback_date
+                      AND d.lunch_rating > 0 ORDER BY d.id DESC LIMIT 1), sf.lunch_rating),
+                dinner_rating = COALESCE((SELECT d.dinner_rating FROM student_feedback d
+                    WHERE d.student_id = sf.student_id AND d.feedback_date = sf.feedback_date
+                      AND d.dinner_rating > 0 ORDER BY d.id DESC LIMIT 1), sf.dinner_rating)
+            WHERE sf.id IN (
+                SELECT MAX(id) FROM student_feedback
+                GROUP BY student_id, feedback_date HAVING COUNT(*) > 1
+            )
+        """)
+        removed = conn.execute("""
+            DELETE FROM student_feedback WHERE id NOT IN (
+                SELECT MAX(id) FROM student_feedback GROUP BY student_id, feedback_date
+            )
+        """).rowcount
+        conn.execute("""
+            CREATE UNIQUE INDEX IF NOT EXISTS ux_student_feedback_student_date
+            ON student_feedback(student_id, feedback_date)
+        """)
+        LOG.info("Schema: merged %d duplicate student_feedback rows, added UNIQUE(student_id, feedback_date)", removed)
+    if needs_responses:
+        removed = conn.execute("""
+            DELETE FROM vendor_responses WHERE id NOT IN (
+                SELECT MAX(id) FROM vendor_responses GROUP BY fine_id
+            )
+        """).rowcount
+        conn.execute("""
+            CREATE UNIQUE INDEX IF NOT EXISTS ux_vendor_responses_fine
+            ON vendor_responses(fine_id)
+        """)
+        LOG.info("Schema: removed %d duplicate vendor_responses rows, added UNIQUE(fine_id)", removed)
+
+
+def migrate_date_indexes(conn):
+    """
+    Secondary indexes for the `*_date BETWEEN ? AND ?` filters used by the dashboards.
+    food_counts(count_date, meal), billing(billing_date) and vendor_responses(fine_id)
+    are already covered by their UNIQUE indexes.
+    """
+    conn.execute("""
+        CREATE INDEX IF NOT EXISTS idx_student_feedback_date_student
+        ON student_feedback(feedback_date, student_id)
+    """)
+    conn.execute("CREATE INDEX IF NOT EXISTS idx_fines_date ON fines(fine_date)")
+    conn.execute("ANALYZE")
+
+
+def _feedback_agg_upsert(ref, meal, sign='', condition=''):
+    """Trigger statement adding (sign='') or removing (sign='-') one row's `meal` rating in feedback_daily_agg."""
+    col = f"{ref}.{meal}_rating"
+    buckets = ', '.join(f"{sign}({col} = {n})" for n in range(1, 6))
+    return f"""
+        INSERT INTO feedback_daily_agg (feedback_date, meal, rating_sum, rating_count, r1, r2, r3, r4, r5)
+        SELECT {ref}.feedback_date, '{meal}', {sign}{col}, {sign}1, {buckets}
+        WHERE {col} IS NOT NULL{condition}
+        ON CONFLICT(feedback_date, meal) DO UPDATE SET
+            rating_sum = rating_sum + excluded.rating_sum,
+            rating_count = rating_count + excluded.rating_count,
+            r1 = r1 + excluded.r1, r2 = r2 + excluded.r2, r3 = r3 + excluded.r3,
+            r4 = r4 + excluded.r4, r5 = r5 + excluded.r5;"""
+
+
+# Daily rollup of student_feedback straight from the raw rows; used to rebuild and verify
+# feedback_daily_agg. Counts follow AVG/COUNT semantics (every non-NULL rating, 0 included),
+# the r1..r5 histogram only counts real 1-5 ratings.
+FEEDBACK_AGG_FROM_RAW = ' UNION ALL '.join(f"""
+    SELECT feedback_date, '{meal}' AS meal, SUM({meal}_rating) AS rating_sum, COUNT({meal}_rating) AS rating_count,
+           {', '.join(f"SUM({meal}_rating = {n}) AS r{n}" for n in range(1, 6))}
+    FROM student_feedback
+    WHERE {meal}_rating IS NOT NULL
+    GROUP BY feedback_date""" for meal in ('breakfast', 'lunch', 'dinner'))
+
+
+def rebuild_feedback_daily_agg(conn):
+    """Regenerate feedback_daily_agg from student_feedback. Runs in the caller's transaction."""
+    conn.execute("DELETE FROM feedback_daily_agg")
+    conn.execute(f"""
+        INSERT INTO feedback_daily_agg (feedback_date, meal, rating_sum, rating_count, r1, r2, r3, r4, r5)
+        {FEEDBACK_AGG_FROM_RAW}
+    """)
+
+
+def verify_feedback_daily_agg(conn):
+    """Return the number of (date, meal) rollup rows that disagree with the raw feedback."""
+    columns = "feedback_date, meal, rating_sum, rating_count, r1, r2, r3, r4, r5"
+    return conn.execute(f"""
+        WITH raw AS ({FEEDBACK_AGG_FROM_RAW}),
+             agg AS (SELECT {columns} FROM feedback_daily_agg WHERE rating_count != 0)
+        SELECT (SELECT COUNT(*) FROM (SELECT {columns} FROM raw EXCEPT SELECT {columns} FROM agg))
+             + (SELECT COUNT(*) FROM (SELECT {columns} FROM agg EXCEPT SELECT {columns} FROM raw))
+    """).fetchone()[0]
+
+
+def migrate_feedback_daily_agg(conn):
+    """
+    feedback_daily_agg: per date and meal, the sum and count of ratings plus a 1-5 histogram.
+    Triggers on student_feedback keep it current inside the writing transaction, including
+    the old value being subtracted when a rating is overwritten.
+    """
+    conn.execute("""
+        CREATE TABLE IF NOT EXISTS feedback_daily_agg (
+            feedback_date TEXT NOT NULL,
+            meal TEXT NOT NULL,
+            rating_sum INTEGER NOT NULL DEFAULT 0,
+            rating_count INTEGER NOT NULL DEFAULT 0,
+            r1 INTEGER NOT NULL DEFAULT 0,
+            r2 INTEGER NOT NULL DEFAULT 0,
+            r3 INTEGER NOT NULL DEFAULT 0,
+            r4 INTEGER NOT NULL DEFAULT 0,
+            r5 INTEGER NOT NULL DEFAULT 0,
+            PRIMARY KEY (feedback_date, meal)
+        ) WITHOUT ROWID
+    """)
+    add_new = ''.join(_feedback_agg_upsert('NEW', meal) for meal in MEALS)
+    remove_old = ''.join(_feedback_agg_upsert('OLD', meal, '-') for meal in MEALS)
+    conn.execute(f"""
+        CREATE TRIGGER IF NOT EXISTS trg_feedback_agg_insert AFTER INSERT ON student_feedback
+        BEGIN {add_new}
+        END
+    """)
+    conn.execute(f"""
+        CREATE TRIGGER IF NOT EXISTS trg_feedback_agg_delete AFTER DELETE ON student_feedback
+        BEGIN {remove_old}
+        END
+    """)
+    # Only meals whose rating (or the row's date) actually changed are touched
+    changed = ''
+    for meal in MEALS:
+        condition = f" AND (OLD.{meal}_rating IS NOT NEW.{meal}_rating OR OLD.feedback_date IS NOT NEW.feedback_date)"
+        changed += _feedback_agg_upsert('OLD', meal, '-', condition) + _feedback_agg_upsert('NEW', meal, '', condition)
+    conn.execute(f"""
+        CREATE TRIGGER IF NOT EXISTS trg_feedback_agg_update
+        AFTER UPDATE OF feedback_date, breakfast_rating, lunch_rating, dinner_rating ON student_feedback
+        BEGIN {changed}
+        END
+    """)
+    rebuild_feedback_daily_agg(conn)
+
+
+def migrate_billing_dirty(conn):
+    """
+    billing_dirty: dates whose billing row is out of date. Triggers on food_counts and
+    fines mark a date whenever its inputs change; refresh_billing recomputes and clears it.
+    Every date that has inputs is marked once so existing billing rows get refreshed.
+    """
+    conn.execute("""
+        CREATE TABLE IF NOT EXISTS billing_dirty (
+            billing_date TEXT PRIMARY KEY
+        ) WITHOUT ROWID
+    """)
+    for table, date_column, watched in (('food_counts', 'count_date', 'count_date, meal, total_count'),
+                                        ('fines', 'fine_date', 'fine_date, amount')):
+        # An OR IGNORE inside a trigger would be overridden by the outer statement's
+        # conflict policy, so the upsert form is used instead
+        mark = f"INSERT INTO billing_dirty (billing_date) VALUES ({{ref}}.{date_column}) ON CONFLICT DO NOTHING;"
+        conn.execute(f"""
+            CREATE TRIGGER IF NOT EXISTS trg_billing_dirty_{table}_insert AFTER INSERT ON {table}
+            BEGIN {mark.format(ref='NEW')} END
+        """)
+        conn.execute(f"""
+            CREATE TRIGGER IF NOT EXISTS trg_billing_dirty_{table}_update AFTER UPDATE OF {watched} ON {table}
+            BEGIN
+                {mark.format(ref='OLD')}
+                {mark.format(ref='NEW')}
+            END
+        """)
+        conn.execute(f"""
+            CREATE TRIGGER IF NOT EXISTS trg_billing_dirty_{table}_delete AFTER DELETE ON {table}
+            BEGIN {mark.format(ref='OLD')} END
+        """)
+    conn.execute("""
+        INSERT OR IGNORE INTO billing_dirty (billing_date)
+        SELECT count_date FROM food_counts UNION SELECT fine_date FROM fines
+    """)
+
+
+# Tables whose changes are tracked in table_versions for conditional GETs
+VERSIONED_TABLES = ('students', 'student_feedback', 'food_counts', 'fines', 'vendor_responses')
+
+
+def migrate_table_versions(conn):
+    """
+    table_versions: a change counter per source table, bumped by triggers on every
+    insert, update and delete. Because the triggers live in the database, writes from
+    other processes (seeding scripts, other server workers) are seen too.
+    """
+    conn.execute("""
+        CREATE TABLE IF NOT EXISTS table_versions (
+            table_name TEXT PRIMARY KEY,
+            version INTEGER NOT NULL DEFAULT 0,
+            updated_at INTEGER NOT NULL DEFAULT (CAST(strftime('%s', 'now') AS INTEGER))
+        ) WITHOUT ROWID
+    """)
+    for table in VERSIONED_TABLES:
+        conn.execute("INSERT OR IGNORE INTO table_versions (table_name) VALUES (?)", [table])
+        bump = f"""
+            UPDATE table_versions
+            SET version = version + 1, updated_at = CAST(strftime('%s', 'now') AS INTEGER)
+            WHERE table_name = '{table}';
+        """
+        for event in ('INSERT', 'UPDATE', 'DELETE'):
+            conn.execute(f"""
+                CREATE TRIGGER IF NOT EXISTS trg_version_{table}_{event.lower()} AFTER {event} ON {table}
+                BEGIN {bump} END
+            """)
+
+
+# External-content FTS5 indexes: (index, content table, text column)
+FTS_INDEXES = (
+    ('feedback_fts', 'student_feedback', 'comments'),
+    ('vendor_responses_fts', 'vendor_responses', 'vendor_response'),
+)
+
+
+def fts5_available(conn):
+    return conn.execute("SELECT sqlite_compileoption_used('ENABLE_FTS5')").fetchone()[0] == 1
+
+
+def migrate_full_text_search(conn):
+    """
+    FTS5 indexes over feedback comments and vendor responses. They are external-content
+    tables (the text stays in the source table only) kept in step by triggers; updates
+    that leave the text unchanged, such as a feedback upsert that only sets a rating,
+    do not touch the index. Skipped when the SQLite build has no FTS5.
+    """
+    if not fts5_available(conn):
+        LOG.warning("Schema: SQLite was built without FTS5; /api/search is unavailable")
+        return
+    for index, table, column in FTS_INDEXES:
+        conn.execute(f"""
+            CREATE VIRTUAL TABLE IF NOT EXISTS {index} USING fts5(
+                {column}, content='{table}', content_rowid='id', tokenize='porter unicode61'
+            )
+        """)
+        add = f"INSERT INTO {index} (rowid, {column}) VALUES (NEW.id, NEW.{column});"
+        remove = f"INSERT INTO {index} ({index}, rowid, {column}) VALUES ('delete', OLD.id, OLD.{column});"
+        conn.execute(f"""
+            CREATE TRIGGER IF NOT EXISTS trg_fts_{table}_insert AFTER INSERT ON {table}
+            BEGIN {add} END
+        """)
+        conn.execute(f"""
+            CREATE TRIGGER IF NOT EXISTS trg_fts_{table}_update AFTER UPDATE OF {column} ON {table}
+            WHEN OLD.{column} IS NOT NEW.{column}
+            BEGIN {remove} {add} END
+        """)
+        conn.execute(f"""
+            CREATE TRIGGER IF NOT EXISTS trg_fts_{table}_delete AFTER DELETE ON {table}
+            BEGIN {remove} END
+        """)
+        conn.execute(f"INSERT INTO {index} ({index}) VALUES ('rebuild')")
+
+
+def _dish_agg_upsert(ref, sign=''):
+    """Trigger statement adding (sign='') or removing (sign='-') one feedback_items row in dish_daily_agg."""
+    return f"""
+        INSERT INTO dish_daily_agg (feedback_date, meal, dish_id, item_count,
+                                    taste_sum, taste_count, cleanliness_sum, cleanliness_count)
+        SELECT sf.feedback_date, {ref}.meal, {ref}.dish_id, {sign}1,
+               {sign}COALESCE({ref}.taste, 0), {sign}({ref}.taste IS NOT NULL),
+               {sign}COALESCE({ref}.cleanliness, 0), {sign}({ref}.cleanliness IS NOT NULL)
+        FROM student_feedback sf WHERE sf.id = {ref}.feedback_id
+        ON CONFLICT(feedback_date, meal, dish_id) DO UPDATE SET
+            item_count = item_count + excluded.item_count,
+            taste_sum = taste_sum + excluded.taste_sum,
+            taste_count = taste_count + excluded.taste_count,
+            cleanliness_sum = cleanliness_sum + excluded.cleanliness_sum,
+            cleanliness_count = cleanliness_count + excluded.cleanliness_count;"""
+
+
+def _dish_agg_move(feedback_id, feedback_date, sign=''):
+    """Trigger statement adding or removing all items of one feedback row under `feedback_date`."""
+    return f"""
+        INSERT INTO dish_daily_agg (feedback_date, meal, dish_id, item_count,
+                                    taste_sum, taste_count, cleanliness_sum, cleanliness_count)
+        SELECT {feedback_date}, meal, dish_id, {sign}COUNT(*),
+               {sign}IFNULL(SUM(taste), 0), {sign}COUNT(taste), {sign}IFNULL(SUM(cleanliness), 0), {sign}COUNT(cleanliness)
+        FROM feedback_items WHERE feedback_id = {feedback_id}
+        GROUP BY meal, dish_id
+        ON CONFLICT(feedback_date, meal, dish_id) DO UPDATE SET
+            item_count = item_count + excluded.item_count,
+            taste_sum = taste_sum + excluded.taste_sum,
+            taste_count = taste_count + excluded.taste_count,
+            cleanliness_sum = cleanliness_sum + excluded.cleanliness_sum,
+            cleanliness_count = cleanliness_count + excluded.cleanliness_count;"""
+
+
+# Per-dish daily rollup straight from feedback_items; used to rebuild and verify dish_daily_agg
+DISH_AGG_FROM_RAW = """
+    SELECT sf.feedback_date, fi.meal, fi.dish_id, COUNT(*) AS item_count,
+           IFNULL(SUM(fi.taste), 0) AS taste_sum, COUNT(fi.taste) AS taste_count,
+           IFNULL(SUM(fi.cleanliness), 0) AS cleanliness_sum, COUNT(fi.cleanliness) AS cleanliness_count
+    FROM feedback_items fi
+    JOIN student_feedback sf ON sf.id = fi.feedback_id
+    GROUP BY sf.feedback_date, fi.meal, fi.dish_id"""
+
+
+def rebuild_dish_daily_agg(conn):
+    """Regenerate dish_daily_agg from feedback_items. Runs in the caller's transaction."""
+    conn.execute("DELETE FROM dish_daily_agg")
+    conn.execute(f"""
+        INSERT INTO dish_daily_agg (feedback_date, meal, dish_id, item_count,
+                                    taste_sum, taste_count, cleanliness_sum, cleanliness_count)
+        {DISH_AGG_FROM_RAW}
+    """)
+
+
+def verify_dish_daily_agg(conn):
+    """Return the number of (date, meal, dish) rollup rows that disagree with feedback_items."""
+    columns = "feedback_date, meal, dish_id, item_count, taste_sum, taste_count, cleanliness_sum, cleanliness_count"
+    return conn.execute(f"""
+        WITH raw AS ({DISH_AGG_FROM_RAW}),
+             agg AS (SELECT {columns} FROM dish_daily_agg WHERE item_count != 0)
+        SELECT (SELECT COUNT(*) FROM (SELECT {columns} FROM raw EXCEPT SELECT {columns} FROM agg))
+             + (SELECT COUNT(*) FROM (SELECT {columns} FROM agg EXCEPT SELECT {columns} FROM raw))
+    """).fetchone()[0]
+
+
+def migrate_feedback_items(conn):
+    """
+    Per-dish scores behind each meal rating:
+      - dishes: one row per dish name (case-insensitive), so items store a small id
+      - feedback_items: taste and cleanliness (1-5, NULL if not rated) per dish, keyed
+        by the student_feedback row and meal
+      - dish_daily_agg: per date, meal and dish, score sums and counts kept current by
+        triggers, so rankings over any range read the rollup instead of the items
+    Deleting a feedback row deletes its items first so the rollup can still find its date.
+    """
+    conn.execute("""
+        CREATE TABLE IF NOT EXISTS dishes (
+            id INTEGER PRIMARY KEY,
+            name TEXT NOT NULL UNIQUE COLLATE NOCASE
+        )
+    """)
+    conn.execute("""
+        CREATE TABLE IF NOT EXISTS feedback_items (
+            feedback_id INTEGER NOT NULL,
+            meal TEXT NOT NULL,
+            dish_id INTEGER NOT NULL,
+            taste INTEGER,
+            cleanliness INTEGER,
+            PRIMARY KEY (feedback_id, meal, dish_id)
+        ) WITHOUT ROWID
+    """)
+    conn.execute("""
+        CREATE TABLE IF NOT EXISTS dish_daily_agg (
+            feedback_date TEXT NOT NULL,
+            meal TEXT NOT NULL,
+            dish_id INTEGER NOT NULL,
+            item_count INTEGER NOT NULL DEFAULT 0,
+            taste_sum INTEGER NOT NULL DEFAULT 0,
+            taste_count INTEGER NOT NULL DEFAULT 0,
+            cleanliness_sum INTEGER NOT NULL DEFAULT 0,
+            cleanliness_count INTEGER NOT NULL DEFAULT 0,
+            PRIMARY KEY (feedback_date, meal, dish_id)
+        ) WITHOUT ROWID
+    """)
+    conn.execute(f"""
+        CREATE TRIGGER IF NOT EXISTS trg_dish_agg_insert AFTER INSERT ON feedback_items
+        BEGIN {_dish_agg_upsert('NEW')}
+        END
+    """)
+    conn.execute(f"""
+        CREATE TRIGGER IF NOT EXISTS trg_dish_agg_delete AFTER DELETE ON feedback_items
+        BEGIN {_dish_agg_upsert('OLD', '-')}
+        END
+    """)
+    conn.execute(f"""
+        CREATE TRIGGER IF NOT EXISTS trg_dish_agg_update AFTER UPDATE ON feedback_items
+        BEGIN {_dish_agg_upsert('OLD', '-')} {_dish_agg_upsert('NEW')}
+        END
+    """)
+    conn.execute(f"""
+        CREATE TRIGGER IF NOT EXISTS trg_dish_agg_feedback_date AFTER UPDATE OF feedback_date ON student_feedback
+        WHEN OLD.feedback_date IS NOT NEW.feedback_date
+        BEGIN {_dish_agg_move('OLD.id', 'OLD.feedback_date', '-')} {_dish_agg_move('NEW.id', 'NEW.feedback_date')}
+        END
+    """)
+    conn.execute("""
+        CREATE TRIGGER IF NOT EXISTS trg_feedback_items_delete BEFORE DELETE ON student_feedback
+        BEGIN DELETE FROM feedback_items WHERE feedback_id = OLD.id; END
+    """)
+    rebuild_dish_daily_agg(conn)
+
+
+# Ordered schema migrations: (version, description, function). Each function runs inside
+# the migration transaction and must be safe on databases built by create_feedback_db.py,
+# which may already contain what it adds. Append new migrations; never renumber.
+MIGRATIONS = [
+    (1, 'unique constraints for upserts', migrate_unique_constraints),
+    (2, 'date range indexes', migrate_date_indexes),
+    (3, 'daily feedback rating rollup', migrate_feedback_daily_agg),
+    (4, 'billing dirty-day tracking', migrate_billing_dirty),
+    (5, 'per-table change versions', migrate_table_versions),
+    (6, 'full-text search indexes', migrate_full_text_search),
+    (7, 'per-dish feedback items and daily rollup', migrate_feedback_items),
+]
+
+
+def schema_version(conn):
+    """Highest migration version applied to this database (0 if none)."""
+    conn.execute("""
+        CREATE TABLE IF NOT EXISTS schema_version (
+            version INTEGER PRIMARY KEY,
+            description TEXT NOT NULL,
+            applied_at TIMESTAMP DEFAULT CURRENT_TIMESTAMP
+        )
+    """)
+    return conn.execute("SELECT COALESCE(MAX(version), 0) FROM schema_version").fetchone()[0]
+
+
+def run_migrations(conn):
+    """Apply pending MIGRATIONS in order, each in its own transaction."""
+    if conn.in_transaction:
+        conn.commit()
+    current = schema_version(conn)
+    for version, description, migrate in MIGRATIONS:
+        if version <= current:
+            continue
+        conn.execute("BEGIN IMMEDIATE")
+        try:
+            # Another process may have applied it while we waited for the lock
+            if schema_version(conn) >= version:
+                conn.rollback()
+                continue
+            migrate(conn)
+            conn.execute("INSERT INTO schema_version (version, description) VALUES (?, ?)",
+                         (version, description))
+            conn.commit()
+        except Exception:
+            conn.rollback()
+            raise
+        LOG.info("Schema: applied migration %s (%s)", version, description)
+
+
+# Representative statements for the date-range read paths, checked with
+# EXPLAIN QUERY PLAN at startup so a missing index shows up as a warning.
+HOT_QUERIES = {
+    'query_feedback': """
+        SELECT sf.id, s.roll_no FROM student_feedback sf
+        LEFT JOIN students s ON s.id = sf.student_id
+        WHERE sf.feedback_date BETWEEN ? AND ?
+    """,
+    'query_food_counts': "SELECT id FROM food_counts WHERE count_date BETWEEN ? AND ?",
+    'get_avg_food_quality': "SELECT AVG(lunch_rating) FROM student_feedback WHERE feedback_date BETWEEN ? AND ?",
+    'query_fines': """
+        SELECT f.id, vr.status FROM fines f
+        LEFT JOIN vendor_responses vr ON f.id = vr.fine_id
+        WHERE f.fine_date BETWEEN ? AND ?
+    """,
+    'query_billing': "SELECT id FROM billing WHERE billing_date BETWEEN ? AND ?",
+    'query_fines_page': """
+        SELECT f.id FROM fines f
+        WHERE f.fine_date BETWEEN ?1 AND ?2 AND (f.fine_date, f.id) < (?2, 0)
+        ORDER BY f.fine_date DESC, f.id DESC LIMIT 10
+    """,
+}
+
+
+def check_query_plans(conn):
+    """Return a warning for every HOT_QUERIES statement whose plan contains a full table scan."""
+    warnings = []
+    for name, sql in HOT_QUERIES.items():
+        params = ['2000-01-01', '2000-01-31']
+        for row in conn.execute(f"EXPLAIN QUERY PLAN {sql}", params).fetchall():
+            detail = row['detail']
+            if detail.startswith('SCAN') and 'INDEX' not in detail:
+                warnings.append(f"{name}: {detail}")
+    return warnings
+
+
+def ensure_schema(conn):
+    """Bring the database schema up to date once per database file."""
+    global _schema_ready_for
+    if _schema_ready_for == str(DB_PATH):
+        return
+    with _schema_lock:
+        if _schema_ready_for == str(DB_PATH):
+            return
+        run_migrations(conn)
+        for warning in check_query_plans(conn):
+            LOG.warning("Hot query falls back to a table scan - %s", warning)
+        _schema_ready_for = str(DB_PATH)
+
+# ============================================================================
+# STREAMING CSV EXPORTS
+# ============================================================================
+
+CSV_FETCH_SIZE = 500        # rows pulled from the cursor per chunk
+CSV_GZIP_LEVEL = 6
+
+
+def csv_chunks(sql, params, columns):
+    """
+    Yield (utf-8 bytes, row count) pieces of the CSV for the result of `sql`, pulling
+    CSV_FETCH_SIZE rows at a time so memory stays flat regardless of the date range.
+    `columns` are result column names, written in that order and used as the header.
+    """
+    buffer = io.StringIO()
+    writer = csv.writer(buffer)
+
+    def drain():
+        data = buffer.getvalue().encode('utf-8')
+        buffer.seek(0)
+        buffer.truncate()
+        return data
+
+    writer.writerow(columns)
+    with DB_POOL.connection() as conn:
+        cur = conn.execute(sql, params)
+        names = [d[0] for d in cur.description]
+        positions = [names.index(column) for column in columns]
+        while True:
+            rows = cur.fetchmany(CSV_FETCH_SIZE)
+            if not rows:
+                break
+            writer.writerows([row[i] for i in positions] for row in rows)
+            yield drain(), len(rows)
+    yield drain(), 0
+
+
+def csv_response(sql, params, columns, filename):
+    """
+    Stream the result of `sql` as a CSV download without materialising it,
+    gzip-compressed when the client accepts it.
+    """
+    use_gzip = request.accept_encodings['gzip'] > 0
+
+    def generate():
+        compressor = zlib.compressobj(CSV_GZIP_LEVEL, zlib.DEFLATED, 31) if use_gzip else None
+        try:
+            for data, _ in csv_chunks(sql, params, columns):
+                chunk = compressor.compress(data) if compressor else data
+                if chunk:
+                    yield chunk
+        except Exception as e:
+            # Headers are already sent: re-raise so the server aborts the connection and the
+            # client sees a failed download, not a complete-looking truncated file
+            LOG.exception("Error streaming %s: %s", filename, e)
+            raise
+        if compressor:
+            yield compressor.flush()
+
+    output = APP.response_class(generate(), mimetype='text/csv')
+    output.headers['Content-Type'] = 'text/csv; charset=utf-8'
+    output.headers['Content-Disposition'] = f'attachment; filename={filename}'
+    output.headers['Vary'] = 'Accept-Encoding'
+    if use_gzip:
+        output.headers['Content-Encoding'] = 'gzip'
+    return output
+
+# ============================================================================
+# CONDITIONAL GETS
+# ============================================================================
+
+def current_versions(tables):
+    """
+    (version, updated_at) per table from table_versions, read at most once per request.
+    Returns {table: (version, updated_at)}.
+    """
+    known = g.setdefault('table_versions', {})
+    missing = [table for table in tables if table not in known]
+    if missing:
+        placeholders = ','.join('?' * len(missing))
+        with DB_POOL.connection() as conn:
+            rows = conn.execute(f"""
+                SELECT table_name, version, updated_at FROM table_versions
+                WHERE table_name IN ({placeholders})
+            """, missing).fetchall()
+        for table in missing:
+            known[table] = (0, 0)
+        for row in rows:
+            known[row['table_name']] = (row['version'], row['updated_at'])
+    return {table: known[table] for table in tables}
+
+
+def conditional_get(*tables):
+    """
+    Give a GET view a strong ETag and Last-Modified derived from the change versions of
+    `tables`, and answer If-None-Match / If-Modified-Since with 304 before the view runs.
+    The tag also covers the path, query params and Accept-Encoding, since the same data
+    is served in different representations.
+    """
+    def decorator(view):
+        @functools.wraps(view)
+        def wrapper(*args, **kwargs):
+            versions = current_versions(tables)
+            fingerprint = repr((
+                request.path,
+                sorted(request.args.items(multi=True)),
+                request.headers.get('Accept-Encoding', ''),
+                sorted(versions.items()),
+            ))
+            etag = hashlib.sha1(fingerprint.encode('utf-8')).hexdigest()
+            last_modified = datetime.fromtimestamp(max(v[1] for v in versions.values()), tz=timezone.utc)
+
+            if request.if_none_match:
+                not_modified = request.if_none_match.contains_weak(etag)
+            elif request.if_modified_since:
+                not_modified = last_modified <= request.if_modified_since
+            else:
+                not_modified = False
+
+            if not_modified:
+                response = APP.response_class(status=304)
+            else:
+                response = APP.make_response(view(*args, **kwargs))
+                if response.status_code != 200:
+                    return response
+            response.set_etag(etag)
+            response.last_modified = last_modified
+            response.headers['Cache-Control'] = 'no-cache'
+            response.vary.add('Accept-Encoding')
+            return response
+        return wrapper
+    return decorator
+
+# ============================================================================
+# JSON ENCODING AND RESPONSE COMPRESSION
+# ============================================================================
+
+class FastJSONProvider(DefaultJSONProvider):
+    """
+    JSON provider that encodes with orjson when it is installed and falls back to
+    the stdlib encoder otherwise, or for values orjson does not support.
+    """
+
+    def dumps(self, obj, **kwargs):
+        if orjson is not None and not kwargs:
+            try:
+                return orjson.dumps(obj, option=orjson.OPT_SORT_KEYS | orjson.OPT_NON_STR_KEYS).decode('utf-8')
+            except TypeError:
+                pass
+        return super().dumps(obj, **kwargs)
+
+    def response(self, *args, **kwargs):
+        if orjson is None:
+            return super().response(*args, **kwargs)
+        obj = self._prepare_response_obj(args, kwargs)
+        option = orjson.OPT_SORT_KEYS | orjson.OPT_NON_STR_KEYS | orjson.OPT_APPEND_NEWLINE
+        if (self.compact is None and self._app.debug) or self.compact is False:
+            option |= orjson.OPT_INDENT_2
+        try:
+            body = orjson.dumps(obj, option=option)
+        except TypeError:
+            return super().response(*args, **kwargs)
+        return self._app.response_class(body, mimetype=self.mimetype)
+
+
+APP.json = FastJSONProvider(APP)
+
+
+def listing_json(rows, **envelope):
+    """
+    JSON response for a list of row dicts. `?format=compact` sends
+    {"columns": [...], "rows": [[...], ...]} instead of repeating every key per row.
+    `envelope` entries (e.g. nextCursor) wrap the rows as {"items": rows, ...}.
+    """
+    response_format = request.args.get('format', 'json')
+    if response_format == 'compact':
+        columns = list(rows[0]) if rows else []
+        return jsonify({'columns': columns, 'rows': [list(row.values()) for row in rows], **envelope})
+    if response_format != 'json':
+        return jsonify({'error': "format must be 'json' or 'compact'"}), 400
+    if envelope:
+        return jsonify({'items': rows, **envelope})
+    return jsonify(rows)
+
+
+@APP.after_request
+def compress_response(response):
+    """
+    gzip or deflate buffered responses when the client accepts it. Responses marked
+    direct_passthrough (files, cached static assets) are sent as they are.
+    """
+    if (response.status_code != 200 or response.direct_passthrough or response.is_streamed
+            or 'Content-Encoding' in response.headers):
+        return response
+    encoding = request.accept_encodings.best_match(['gzip', 'deflate'])
+    if encoding is None or request.accept_encodings[encoding] <= 0:
+        return response
+    body = response.get_data()
+    if len(body) < COMPRESS_MIN_SIZE:
+        return response
+
+    if encoding == 'gzip':
+        compressor = zlib.compressobj(COMPRESS_LEVEL, zlib.DEFLATED, 31)
+        body = compressor.compress(body) + compressor.flush()
+    else:
+        body = zlib.compress(body, COMPRESS_LEVEL)
+    response.set_data(body)
+    response.headers['Content-Encoding'] = encoding
+    response.vary.add('Accept-Encoding')
+    return response
+
+# ============================================================================
+# RESPONSE CACHE
+# ============================================================================
+
+class ResponseCache:
+    """
+    Bounded LRU + TTL cache of pre-serialised JSON bodies for GET endpoints.
+    Each entry remembers which tables it was built from and its start/end range,
+    so a write only drops the entries that could include the changed date.
+    """
+
+    def __init__(self, max_entries=RESPONSE_CACHE_SIZE, ttl=RESPONSE_CACHE_TTL):
+        self.max_entries = max_entries
+        self.ttl = ttl
+        self._entries = OrderedDict()  # key -> (body, expires_at, tables, start, end)
+        self._lock = threading.Lock()
+        self._stats = {'hits': 0, 'misses': 0, 'evictions': 0, 'expirations': 0, 'invalidations': 0}
+
+    def get(self, key):
+        """Return the cached body for `key`, or None."""
+        with self._lock:
+            entry = self._entries.get(key)
+            if entry is None:
+                self._stats['misses'] += 1
+                return None
+            if entry[1] < time.monotonic():
+                del self._entries[key]
+                self._stats['expirations'] += 1
+                self._stats['misses'] += 1
+                return None
+            self._entries.move_to_end(key)
+            self._stats['hits'] += 1
+            return entry[0]
+
+    def put(self, key, body, tables, start=None, end=None):
+        """Store `body`, evicting the least recently used entries beyond max_entries."""
+        with self._lock:
+            self._entries[key] = (body, time.monotonic() + self.ttl, frozenset(tables), start, end)
+            self._entries.move_to_end(key)
+            while len(self._entries) > self.max_entries:
+                self._entries.popitem(last=False)
+                self._stats['evictions'] += 1
+
+    def invalidate(self, table, date=None):
+        """Drop entries built from `table` whose range includes `date` (all of them if date is None)."""
+        with self._lock:
+            stale = [
+                key for key, (_, _, tables, start, end) in self._entries.items()
+                if table in tables and (date is None or start is None or end is None or start <= date <= end)
+            ]
+            for key in stale:
+                del self._entries[key]
+            self._stats['invalidations'] += len(stale)
+
+    def clear(self):
+        with self._lock:
+            self._entries.clear()
+
+    def stats(self):
+        """Return a snapshot of cache counters."""
+        with self._lock:
+            stats = dict(self._stats)
+            stats['entries'] = len(self._entries)
+            stats['max_entries'] = self.max_entries
+        lookups = stats['hits'] + stats['misses']
+        stats['hit_ratio'] = round(stats['hits'] / lookups, 4) if lookups else 0.0
+        return stats
+
+
+RESPONSE_CACHE = ResponseCache()
+
+
+def cached_json(*tables):
+    """
+    Cache successful JSON responses of a GET view, keyed by path and normalised query
+    params. `tables` are the tables the response is built from; writes to them
+    invalidate the entry through RESPONSE_CACHE.invalidate().
+    """
+    def decorator(view):
+        @functools.wraps(view)
+        def wrapper(*args, **kwargs):
+            # Keyed on the table versions as well, so writes from other processes
+            # (which cannot call invalidate()) still make old entries unreachable
+            key = (request.path, tuple(sorted(request.args.items(multi=True))),
+                   tuple(sorted(current_versions(tables).items())))
+            body = RESPONSE_CACHE.get(key)
+            if body is not None:
+                response = APP.response_class(body, mimetype='application/json')
+                response.headers['X-Cache'] = 'HIT'
+                return response
+
+            response = APP.make_response(view(*args, **kwargs))
+            if response.status_code == 200 and response.mimetype == 'application/json':
+                RESPONSE_CACHE.put(key, response.get_data(), tables,
+                                   request.args.get('start'), request.args.get('end'))
+                response.headers['X-Cache'] = 'MISS'
+            return response
+        return wrapper
+    return decorator
+
+# ============================================================================
+# STUDENT ID CACHE
+# ============================================================================
+
+class StudentIdCache:
+    """
+    Bounded LRU map of roll_no -> students.id so feedback writes can skip the
+    get-or-create lookup. Entries are only added from committed rows and belong to the
+    database they were read from: the cache empties itself when DB_PATH changes. Writers
+    still confirm a cached id with a primary-key read (see _confirm_student_ids), so an
+    entry made stale by another process or a restored database is never trusted.
+    """
+
+    def __init__(self, max_entries=STUDENT_ID_CACHE_SIZE):
+        self.max_entries = max_entries
+        self._ids = OrderedDict()
+        self._db_path = None
+        self._lock = threading.Lock()
+        self._stats = {'hits': 0, 'misses': 0, 'evictions': 0, 'resets': 0}
+
+    def _check_database(self):
+        # Called with the lock held
+        if self._db_path != str(DB_PATH):
+            if self._ids:
+                self._stats['resets'] += 1
+            self._ids.clear()
+            self._db_path = str(DB_PATH)
+
+    def get_many(self, rolls):
+        """Return {roll_no: id} for the cached rolls among `rolls`."""
+        found = {}
+        with self._lock:
+            self._check_database()
+            for roll in rolls:
+                student_id = self._ids.get(roll)
+                if student_id is None:
+                    self._stats['misses'] += 1
+                    continue
+                self._ids.move_to_end(roll)
+                self._stats['hits'] += 1
+                found[roll] = student_id
+        return found
+
+    def get(self, roll):
+        return self.get_many([roll]).get(roll)
+
+    def update(self, ids):
+        """Add committed {roll_no: id} pairs, evicting the least recently used beyond max_entries."""
+        with self._lock:
+            self._check_database()
+            for roll, student_id in ids.items():
+                self._ids[roll] = student_id
+                self._ids.move_to_end(roll)
+            while len(self._ids) > self.max_entries:
+                self._ids.popitem(last=False)
+                self._stats['evictions'] += 1
+
+    def warm(self):
+        """Reload from the students table in one pass, keeping the newest students if it does not all fit."""
+        with DB_POOL.connection() as conn:
+            rows = conn.execute(
+                "SELECT roll_no, id FROM students ORDER BY id DESC LIMIT ?",
+                [self.max_entries]
+            ).fetchall()
+        with self._lock:
+            self._ids = OrderedDict((row['roll_no'], row['id']) for row in reversed(rows))
+            self._db_path = str(DB_PATH)
+        return len(rows)
+
+    def clear(self):
+        with self._lock:
+            self._ids.clear()
+
+    def stats(self):
+        """Return a snapshot of cache counters."""
+        with self._lock:
+            stats = dict(self._stats)
+            stats['entries'] = len(self._ids)
+            stats['max_entries'] = self.max_entries
+        lookups = stats['hits'] + stats['misses']
+        stats['hit_ratio'] = round(stats['hits'] / lookups, 4) if lookups else 0.0
+        return stats
+
+
+STUDENT_IDS = StudentIdCache()
+
+# ============================================================================
+# LIVE EVENTS (SERVER-SENT EVENTS)
+# ============================================================================
+
+# Change events published by the write handlers
+EVENT_TYPES = ('food_count', 'fine_imposed', 'fine_deleted', 'vendor_response')
+
+
+class EventSubscription:
+    """One /api/stream client: a bounded buffer of (id, event, data) messages."""
+
+    CLOSED = object()
+
+    def __init__(self, topics, buffer_size):
+        self.topics = topics
+        self.queue = queue.Queue(maxsize=buffer_size)
+        self.lagged = False  # set when events were dropped; the client must refetch
+
+    def push(self, message):
+        """Buffer `message` if it matches the topics. Returns False if an older event was dropped."""
+        if message is not self.CLOSED and self.topics and message[1] not in self.topics:
+            return True
+        try:
+            self.queue.put_nowait(message)
+            return True
+        except queue.Full:
+            pass
+        # A slow reader loses its oldest event rather than holding up the writer
+        self.lagged = True
+        try:
+            self.queue.get_nowait()
+        except queue.Empty:
+            pass
+        try:
+            self.queue.put_nowait(message)
+        except queue.Full:
+            pass
+        return False
+
+    def next(self, timeout):
+        """Next message, None on timeout, or CLOSED when the broker shuts down."""
+        try:
+            return self.queue.get(timeout=timeout)
+        except queue.Empty:
+            return None
+
+
+class EventBroker:
+    """
+    In-process pub/sub for change events. publish() never blocks: each subscriber has
+    its own bounded buffer, and the last SSE_REPLAY events are kept so reconnecting
+    clients can resume from Last-Event-ID. Events only reach clients of the same process.
+    """
+
+    def __init__(self, buffer_size=SSE_CLIENT_BUFFER, replay_size=SSE_REPLAY, max_clients=SSE_MAX_CLIENTS):
+        self.buffer_size = buffer_size
+        self.max_clients = max_clients
+        self._history = deque(maxlen=replay_size)
+        self._subscribers = set()
+        self._next_id = 1
+        self._closed = False
+        self._lock = threading.Lock()
+        self._stats = {'published': 0, 'dropped': 0, 'subscribed': 0, 'rejected': 0}
+
+    def publish(self, event, data):
+        """Send an event to every subscriber of its topic."""
+        with self._lock:
+            message = (self._next_id, event, json.dumps(data))
+            self._next_id += 1
+            self._history.append(message)
+            self._stats['published'] += 1
+            subscribers = list(self._subscribers)
+        dropped = sum(1 for subscription in subscribers if not subscription.push(message))
+        if dropped:
+            with self._lock:
+                self._stats['dropped'] += dropped
+
+    def subscribe(self, topics=None, last_event_id=None):
+        """Register a client, replaying events after `last_event_id`. Returns None when full."""
+        with self._lock:
+            if self._closed or len(self._subscribers) >= self.max_clients:
+                self._stats['rejected'] += 1
+                return None
+            subscription = EventSubscription(topics, self.buffer_size)
+            if last_event_id is not None:
+                if self._history and last_event_id < self._history[0][0] - 1:
+                    subscription.lagged = True
+                for message in self._history:
+                    if message[0] > last_event_id:
+                        subscription.push(message)
+            self._subscribers.add(subscription)
+            self._stats['subscribed'] += 1
+        return subscription
+
+    def unsubscribe(self, subscription):
+        with self._lock:
+            self._subscribers.discard(subscription)
+
+    def close(self):
+        """End every open stream (server shutdown)."""
+        with self._lock:
+            self._closed = True
+            subscribers = list(self._subscribers)
+        for subscription in subscribers:
+            subscription.push(EventSubscription.CLOSED)
+
+    def stats(self):
+        with self._lock:
+            stats = dict(self._stats)
+            stats['clients'] = len(self._subscribers)
+            stats['last_event_id'] = self._next_id - 1
+        return stats
+
+
+EVENT_BROKER = EventBroker()
+
+
+def sse_message(event_id, event, data):
+    return f"id: {event_id}\nevent: {event}\ndata: {data}\n\n"
+
+
+@APP.route('/api/stream')
+def api_stream():
+    """
+    Live change feed as Server-Sent Events. Optional `topics` (comma separated, from
+    EVENT_TYPES) filters the events. A `resync` event means some events were missed
+    and the client should refetch its data.
+    """
+    topics = None
+    if request.args.get('topics'):
+        topics = {t.strip() for t in request.args['topics'].split(',') if t.strip()}
+        unknown = topics - set(EVENT_TYPES)
+        if unknown:
+            return jsonify({'error': f"unknown topic(s): {', '.join(sorted(unknown))}"}), 400
+
+    last_event_id = request.headers.get('Last-Event-ID')
+    last_event_id = int(last_event_id) if last_event_id and last_event_id.isdigit() else None
+
+    subscription = EVENT_BROKER.subscribe(topics, last_event_id)
+    if subscription is None:
+        return jsonify({'error': 'Too many live clients, retry later'}), 503
+
+    def generate():
+        try:
+            yield f"retry: {SSE_RETRY_MS}\n\n"
+            while True:
+                if subscription.lagged:
+                    subscription.lagged = False
+                    yield "event: resync\ndata: {}\n\n"
+                message = subscription.next(SSE_HEARTBEAT)
+                if message is EventSubscription.CLOSED:
+                    return
+                if message is None:
+                    yield ": keep-alive\n\n"
+                else:
+                    yield sse_message(*message)
+        finally:
+            EVENT_BROKER.unsubscribe(subscription)
+
+    response = APP.response_class(generate(), mimetype='text/event-stream')
+    response.headers['Cache-Control'] = 'no-cache'
+    response.headers['X-Accel-Buffering'] = 'no'  # don't let a reverse proxy buffer the stream
+    return response
+
+# ============================================================================
+# PAGINATION
+# ============================================================================
+
+PAGE_LIMIT_DEFAULT = 100    # used when only `after` is given
+PAGE_LIMIT_MAX = 1000
+
+
+def encode_cursor(values):
+    """Opaque next-page token for the sort key of the last row on a page."""
+    raw = json.dumps(values, separators=(',', ':')).encode('utf-8')
+    return base64.urlsafe_b64encode(raw).decode('ascii').rstrip('=')
+
+
+def decode_cursor(token, types):
+    """
+    Sort key list from an `after` token, one value of each of `types`.
+    Raises ValueError if it is malformed.
+    """
+    try:
+        values = json.loads(base64.urlsafe_b64decode(token + '=' * (-len(token) % 4)))
+    except (ValueError, TypeError):
+        raise ValueError('invalid cursor')
+    if not isinstance(values, list) or len(values) != len(types):
+        raise ValueError('invalid cursor')
+    for value, expected in zip(values, types):
+        # bool is an int subclass, but never a valid key
+        if not isinstance(value, expected) or isinstance(value, bool):
+            raise ValueError('invalid cursor')
+    return values
+
+
+def parse_page_args(columns, cursor_types):
+    """
+    Read limit/after/fields from the query string.
+    Returns (limit, after, fields); limit and after are None for an unpaginated request
+    and fields is None when every column is wanted. Raises ValueError on bad input.
+    """
+    limit = request.args.get('limit')
+    token = request.args.get('after')
+    fields = request.args.get('fields')
+
+    if limit is not None:
+        try:
+            limit = int(limit)
+        except ValueError:
+            raise ValueError('limit must be an integer')
+        if not 1 <= limit <= PAGE_LIMIT_MAX:
+            raise ValueError(f'limit must be between 1 and {PAGE_LIMIT_MAX}')
+    elif token:
+        limit = PAGE_LIMIT_DEFAULT
+
+    after = decode_cursor(token, cursor_types) if token else None
+
+    if fields:
+        fields = [f.strip() for f in fields.split(',') if f.strip()]
+        unknown = [f for f in fields if f not in columns]
+        if unknown:
+            raise ValueError(f"unknown field(s): {', '.join(unknown)}")
+    return limit, after, fields or None
+
+
+def select_list(columns, fields, keys=()):
+    """SELECT list for the requested `fields` plus the hidden `_key*` sort key columns."""
+    selected = [f"{columns[f]} AS {f}" for f in (fields or columns)]
+    selected += [f"{expr} AS _key{i}" for i, expr in enumerate(keys)]
+    return ', '.join(selected)
+
+
+def paginate(rows, limit):
+    """Trim a limit+1 result to a page. Returns (items, next cursor or None)."""
+    page = rows[:limit]
+    next_cursor = None
+    if len(rows) > limit:
+        last = page[-1]
+        next_cursor = encode_cursor([last[k] for k in sorted(last) if k.startswith('_key')])
+    items = [{k: v for k, v in row.items() if not k.startswith('_key')} for row in page]
+    return items, next_cursor
 
 # ============================================================================
 # STUDENT FEEDBACK ENDPOINTS
 # ============================================================================
 
-def query_feedback(start: str, end: str):
+# Output name -> SQL expression for the feedback listing (also the `fields=` whitelist)
+FEEDBACK_COLUMNS = {
+    'id': 'sf.id',
+    'studentName': 's.name',
+    'rollNumber': 's.roll_no',
+    'date': 'sf.feedback_date',
+    'breakfastRating': 'sf.breakfast_rating',
+    'lunchRating': 'sf.lunch_rating',
+    'dinnerRating': 'sf.dinner_rating',
+    'comments': 'sf.comments',
+}
+# Page sort key, all descending: idx_student_feedback_date_student (+ rowid) holds rows in this order
+FEEDBACK_KEYS = ('sf.feedback_date', 'sf.student_id', 'sf.id')
+FEEDBACK_KEY_TYPES = (str, int, int)
+
+
+def feedback_sql(start: str, end: str, fields=None, after=None, limit=None):
+    """
+    SQL and parameters for feedback rows within a date range (shared by JSON and CSV).
+    Full listings are ordered by date and roll number. With `limit`, returns one page of
+    limit+1 rows after the `after` sort key, ordered by (date, student_id, id) descending
+    so that idx_student_feedback_date_student serves both the seek and the order.
+    """
+    params = [start, end]
+    where = "sf.feedback_date BETWEEN ? AND ?"
+    if after:
+        where += " AND (sf.feedback_date, sf.student_id, sf.id) < (?, ?, ?)"
+        params += after
+
+    if limit:
+        order = "sf.feedback_date DESC, sf.student_id DESC, sf.id DESC"
+    else:
+        order = "sf.feedback_date DESC, COALESCE(s.roll_no, '') ASC, sf.id ASC"
+    sql = f"""
+    SELECT {select_list(FEEDBACK_COLUMNS, fields, FEEDBACK_KEYS if limit else ())}
+    FROM student_feedback sf
+    LEFT JOIN students s ON s.id = sf.student_id
+    WHERE {where}
+    ORDER BY {order}
+    """
+    if limit:
+        sql += " LIMIT ?"
+        params.append(limit + 1)
+    return sql, params
+
+
+def query_feedback(start: str, end: str, fields=None, after=None, limit=None):
     """
     Query student feedback from mess_management.db within a date range.
     Uses the single 'comments' field.
     """
     try:
-        conn = get_db_connection()
-        cur = conn.cursor()
-        sql = """
-        SELECT sf.id, s.name AS studentName, s.roll_no AS rollNumber,
-               sf.feedback_date AS date,
-               sf.breakfast_rating AS breakfastRating,
-               sf.lunch_rating AS lunchRating,
-               sf.dinner_rating AS dinnerRating,
-               sf.comments AS comments -- Corrected to single comments field
-        FROM student_feedback sf
-        LEFT JOIN students s ON s.id = sf.student_id
-        WHERE sf.feedback_date BETWEEN ? AND ?
-        ORDER BY sf.feedback_date DESC, s.roll_no ASC
-        """
-        cur.execute(sql, [start, end])
-        rows = [dict(r) for r in cur.fetchall()]
-        conn.close()
+        if SNAPSHOT is not None and not limit:
+            rows = SNAPSHOT.query('feedback', start, end, fields)
+            if rows is not None:
+                return rows
+        with DB_POOL.connection() as conn:
+            cur = conn.cursor()
+            cur.execute(*feedback_sql(start, end, fields, after, limit))
+            rows = [dict(r) for r in cur.fetchall()]
         return rows
     except Exception as e:
-        print(f"Error querying feedback: {e}")
+        LOG.exception("Error querying feedback: %s", e)
         return []
 
 
 @APP.route('/api/feedback')
+@conditional_get('student_feedback', 'students')
+@cached_json('student_feedback', 'students')
 def api_feedback():
-    """Get student feedback."""
+    """
+    Get student feedback. Returns a plain array, or with `limit`/`after` a page
+    envelope {items, nextCursor}. `fields` limits the columns returned.
+    """
     start = request.args.get('start')
     end = request.args.get('end')
     if not start or not end:
         return jsonify({'error': 'start and end query params required (YYYY-MM-DD)'}), 400
-    rows = query_feedback(start, end)
-    return jsonify(rows)
+    try:
+        limit, after, fields = parse_page_args(FEEDBACK_COLUMNS, FEEDBACK_KEY_TYPES)
+    except ValueError as e:
+        return jsonify({'error': str(e)}), 400
+    rows = query_feedback(start, end, fields, after, limit)
+    if limit:
+        items, next_cursor = paginate(rows, limit)
+        return listing_json(items, nextCursor=next_cursor)
+    return listing_json(rows)
+
+
+FEEDBACK_CSV_COLUMNS = ['studentName', 'rollNumber', 'date', 'breakfastRating', 'lunchRating', 'dinnerRating', 'comments']
 
 
 @APP.route('/api/feedback/csv')
+@conditional_get('student_feedback', 'students')
 def api_feedback_csv():
     """Download student feedback as CSV."""
     start = request.args.get('start')
     end = request.args.get('end')
     if not start or not end:
         return jsonify({'error': 'start and end query params required (YYYY-MM-DD)'}), 400
-    rows = query_feedback(start, end)
-
-    si = io.StringIO()
-    writer = csv.writer(si)
-    writer.writerow([
-        'studentName', 'rollNumber', 'date',
-        'breakfastRating',
-        'lunchRating',
-        'dinnerRating', 'comments' # Corrected header
-    ])
-    for r in rows:
-        writer.writerow([
-            r.get('studentName', ''), r.get('rollNumber', ''), r.get('date', ''),
-            r.get('breakfastRating', ''),
-            r.get('lunchRating', ''),
-            r.get('dinnerRating', ''), r.get('comments', '') # Corrected data field
-        ])
-
-    output = make_response(si.getvalue())
-    output.headers['Content-Type'] = 'text/csv; charset=utf-8'
-    output.headers['Content-Disposition'] = f'attachment; filename=feedback_{start}_to_{end}.csv'
-    return output
+    sql, params = feedback_sql(start, end)
+    return csv_response(sql, params, FEEDBACK_CSV_COLUMNS, f'feedback_{start}_to_{end}.csv')
 
-@APP.route('/api/feedback', methods=['POST'])
-def save_feedback():
-    """Save student feedback to the database."""
-    try:
-        data = request.get_json()
-        
-        # Get or create student
-        student_name = data.get('student_name', 'Unknown')
-        student_roll = data.get('student_roll', 'Unknown')
-        feedback_date = data.get('feedback_date', datetime.now().strftime('%Y-%m-%d')) # Corrected key to 'feedback_date'
-        meal_type = data.get('meal_type', 'Lunch')
-        
-        conn = get_db_connection()
-        cur = conn.cursor()
-        
+MEALS = ('breakfast', 'lunch', 'dinner')
+
+# Upper bound on submissions accepted by one POST /api/feedback/batch call
+FEEDBACK_BATCH_MAX = 1000
+
+# Rows per IN (...) / VALUES lookup, kept well under SQLite's bound-parameter limit
+SQL_CHUNK_SIZE = 400
+
+
+def chunked(seq, size=SQL_CHUNK_SIZE):
+    """Yield successive slices of `seq` with at most `size` elements."""
+    for i in range(0, len(seq), size):
+        yield seq[i:i + size]
+
+
+def feedback_rating(items):
+    """Average the taste and cleanliness scores of the rated items into one meal rating."""
+    all_ratings = []
+    for item in items or []:
+        taste = item.get('taste', 0)
+        cleanliness = item.get('cleanliness', 0)
+        if taste > 0:
+            all_ratings.append(taste)
+        if cleanliness > 0:
+            all_ratings.append(cleanliness)
+    return sum(all_ratings) / len(all_ratings) if all_ratings else 0
+
+
+def item_score(value):
+    """A 1-5 taste or cleanliness score, or None when the item was not rated on it."""
+    if isinstance(value, bool) or not isinstance(value, (int, float)) or not 1 <= value <= 5:
+        return None
+    return int(value)
+
+
+def feedback_dish_scores(items):
+    """
+    (dish name, taste, cleanliness) for every item that names a dish and has a score.
+    Names are whitespace-normalised; a dish listed twice keeps its last scores.
+    """
+    scores = {}
+    for item in items or []:
+        if not isinstance(item, dict) or not isinstance(item.get('item_name'), str):
+            continue
+        name = ' '.join(item['item_name'].split())
+        taste, cleanliness = item_score(item.get('taste')), item_score(item.get('cleanliness'))
+        if name and (taste is not None or cleanliness is not None):
+            scores[name.lower()] = (name, taste, cleanliness)
+    return list(scores.values())
+
+
+def parse_feedback_submission(data):
+    """
+    Normalise one feedback submission from the student form.
+    Returns (student_name, student_roll, feedback_date, meal_type, rating, comments, dish_scores);
+    raises ValueError if the payload cannot be saved.
+    """
+    if not isinstance(data, dict):
+        raise ValueError('submission must be a JSON object')
+
+    # Get or create student
+    student_name = data.get('student_name', 'Unknown')
+    student_roll = data.get('student_roll', 'Unknown')
+    feedback_date = data.get('feedback_date', datetime.now().strftime('%Y-%m-%d')) # Corrected key to 'feedback_date'
+    meal_type = data.get('meal_type', 'Lunch')
+    if not isinstance(student_roll, str) or not isinstance(feedback_date, str):
+        raise ValueError('student_roll and feedback_date must be strings')
+    if not isinstance(meal_type, str) or meal_type.lower() not in MEALS:
+        raise ValueError(f"meal_type must be one of {', '.join(MEALS)}")
+
+    items = data.get('items', [])
+    if not isinstance(items, list):
+        raise ValueError('items must be a list')
+    for index, item in enumerate(items):
+        if not isinstance(item, dict):
+            raise ValueError(f'items[{index}] must be an object')
+        for key in ('taste', 'cleanliness'):
+            # 0 or missing means not rated; anything else must be a 1-5 score
+            if item.get(key) not in (None, 0) and item_score(item[key]) is None:
+                raise ValueError(f'items[{index}].{key} must be a number from 1 to 5')
+    items = [dict(item, taste=item.get('taste') or 0, cleanliness=item.get('cleanliness') or 0) for item in items]
+
+    # Calculate meal ratings from items (average of taste and cleanliness ratings for the meal type)
+    avg_quality = feedback_rating(items)
+
+    # Build the overall comment
+    comments = data.get('overall_comment', '')
+
+    return student_name, student_roll, feedback_date, meal_type, int(avg_quality), comments, feedback_dish_scores(items)
+
+
+def feedback_upsert_sql(meal):
+    """INSERT ... ON CONFLICT statement that saves one meal's rating for a student and date."""
+    meal_column = f"{meal}_rating"
+    return f"""
+        INSERT INTO student_feedback (student_id, feedback_date, breakfast_rating, lunch_rating, dinner_rating, comments)
+        VALUES (?, ?, ?, ?, ?, ?)
+        ON CONFLICT(student_id, feedback_date) DO UPDATE
+        SET {meal_column} = excluded.{meal_column}, comments = excluded.comments
+    """
+
+
+def feedback_upsert_params(student_id, feedback_date, meal, rating, comments):
+    """Parameters for feedback_upsert_sql; meals other than `meal` start at 0 on insert."""
+    return (student_id, feedback_date,
+            rating if meal == 'breakfast' else 0,
+            rating if meal == 'lunch' else 0,
+            rating if meal == 'dinner' else 0,
+            comments)
+
+
+def _resolve_dish_ids(cur, names):
+    """Map dish names (case-insensitively, by lower-cased name) to dish ids, creating missing dishes."""
+    names = list({name.lower(): name for name in names}.values())
+    dish_ids = {}
+    for chunk in chunked(names):
+        cur.execute(f"SELECT id, name FROM dishes WHERE name IN ({','.join('?' * len(chunk))})", chunk)
+        dish_ids.update((row['name'].lower(), row['id']) for row in cur.fetchall())
+    missing = [name for name in names if name.lower() not in dish_ids]
+    if missing:
+        cur.executemany("INSERT OR IGNORE INTO dishes (name) VALUES (?)", [(name,) for name in missing])
+        for chunk in chunked(missing):
+            cur.execute(f"SELECT id, name FROM dishes WHERE name IN ({','.join('?' * len(chunk))})", chunk)
+            dish_ids.update((row['name'].lower(), row['id']) for row in cur.fetchall())
+    return dish_ids
+
+
+def _write_feedback_items(cur, entries):
+    """
+    Replace the dish scores of each (student_id, feedback_date, meal, dish_scores) entry,
+    just as a resubmission replaces that meal's rating. Runs after the student_feedback
+    upserts; the last entry for a student, date and meal wins.
+    """
+    latest = {}
+    for student_id, feedback_date, meal, dish_scores in entries:
+        latest[(student_id, feedback_date, meal)] = dish_scores
+    dish_ids = _resolve_dish_ids(cur, [name for scores in latest.values() for name, _, _ in scores])
+
+    feedback_id = "(SELECT id FROM student_feedback WHERE student_id = ? AND feedback_date = ?)"
+    cur.executemany(f"DELETE FROM feedback_items WHERE feedback_id = {feedback_id} AND meal = ?", list(latest))
+    rows = [(student_id, feedback_date, meal, dish_ids[name.lower()], taste, cleanliness)
+            for (student_id, feedback_date, meal), scores in latest.items()
+            for name, taste, cleanliness in scores]
+    if rows:
+        cur.executemany(f"""
+            INSERT INTO feedback_items (feedback_id, meal, dish_id, taste, cleanliness)
+            VALUES ({feedback_id}, ?, ?, ?, ?)
+        """, rows)
+
+
+def _write_feedback(cur, student_name, student_roll, feedback_date, meal_type, rating, comments, dish_scores,
+                    student_id=None):
+    """
+    Writer operation: get or create the student (unless `student_id` came from STUDENT_IDS),
+    then upsert the day's feedback row and its dish scores. Returns the student's id.
+    """
+    if student_id is not None:
+        student_id = _confirm_student_ids(cur, {student_roll: student_id}).get(student_roll)
+    if student_id is None:
         # Check if student exists by roll number
         cur.execute("SELECT id FROM students WHERE roll_no = ?", [student_roll])
         student = cur.fetchone()
-        student_id = None
-        
+
         if student:
             student_id = student['id']
         else:
@@ -121,96 +2238,297 @@ def save_feedback():
                 VALUES (?, ?)
             """, [student_name, student_roll])
             student_id = cur.lastrowid
-        
-        # Calculate meal ratings from items (average of taste and cleanliness ratings for the meal type)
-        items = data.get('items', [])
-        avg_quality = 0
-        if items:
-            # Average both taste and cleanliness ratings
-            all_ratings = []
-            for item in items:
-                taste = item.get('taste', 0)
-                cleanliness = item.get('cleanliness', 0)
-                if taste > 0:
-                    all_ratings.append(taste)
-                if cleanliness > 0:
-                    all_ratings.append(cleanliness)
-            avg_quality = sum(all_ratings) / len(all_ratings) if all_ratings else 0
-        
-        # Determine which meal column to update based on meal_type
-        meal_column = f"{meal_type.lower()}_rating"
-        
-        # Check if record exists for this date
-        cur.execute("""
-            SELECT id FROM student_feedback 
-            WHERE student_id = ? AND feedback_date = ?
-        """, [student_id, feedback_date])
-        
-        existing = cur.fetchone()
-        
-        # Build the overall comment
-        comments = data.get('overall_comment', '')
-        
-        if existing:
-            # Update existing record
-            cur.execute(f"""
-                UPDATE student_feedback 
-                SET {meal_column} = ?, comments = ?
-                WHERE id = ?
-            """, [int(avg_quality), comments, existing['id']])
-        else:
-            # Insert new feedback record
-            cur.execute("""
-                INSERT INTO student_feedback (student_id, feedback_date, breakfast_rating, lunch_rating, dinner_rating, comments)
-                VALUES (?, ?, ?, ?, ?, ?)
-            """, [student_id, feedback_date, 
-                  int(avg_quality) if meal_type.lower() == 'breakfast' else 0,
-                  int(avg_quality) if meal_type.lower() == 'lunch' else 0,
-                  int(avg_quality) if meal_type.lower() == 'dinner' else 0,
-                  comments])
-        
-        conn.commit()
-        conn.close()
+
+    # Insert the day's row, or only overwrite this meal's rating and the comment
+    meal = meal_type.lower()
+    cur.execute(feedback_upsert_sql(meal), feedback_upsert_params(student_id, feedback_date, meal, rating, comments))
+    _write_feedback_items(cur, [(student_id, feedback_date, meal, dish_scores)])
+    return student_id
+
+
+@APP.route('/api/feedback', methods=['POST'])
+def save_feedback():
+    """Save student feedback to the database."""
+    try:
+        data = request.get_json()
+        try:
+            submission = parse_feedback_submission(data)
+        except ValueError as e:
+            return jsonify({'error': str(e)}), 400
+
+        # Queued behind other writers instead of competing for the database lock
+        student_roll = submission[1]
+
+        def committed(student_id):
+            STUDENT_IDS.update({student_roll: student_id})
+            RESPONSE_CACHE.invalidate('student_feedback', submission[2])
+
+        write_through(('feedback',), [submission[2]], _write_feedback, *submission,
+                      STUDENT_IDS.get(student_roll), on_commit=committed)
         
         return jsonify({'status': 'success', 'message': 'Feedback saved successfully'}), 200
+    except WriteTimeout as e:
+        return write_timeout_response(e)
+    except Exception as e:
+        LOG.exception("Error saving feedback: %s", e)
+        return jsonify({'error': str(e)}), 500
+
+
+def _confirm_student_ids(cur, known):
+    """Keep the {roll_no: id} pairs from STUDENT_IDS that still name that student in this database."""
+    confirmed = {}
+    by_id = {student_id: roll for roll, student_id in known.items()}
+    ids = list(by_id)
+    for chunk in chunked(ids):
+        cur.execute(f"SELECT id, roll_no FROM students WHERE id IN ({','.join('?' * len(chunk))})", chunk)
+        confirmed.update((row['roll_no'], row['id']) for row in cur.fetchall() if by_id[row['id']] == row['roll_no'])
+    return confirmed
+
+
+def _resolve_student_ids(cur, students, known=None):
+    """
+    Map roll numbers to student ids with set-based lookups, creating missing students.
+    `students` maps roll_no -> name to use if the student has to be created; rolls in
+    `known` (from STUDENT_IDS) only get a primary-key check instead of the lookup.
+    """
+    student_ids = _confirm_student_ids(cur, known) if known else {}
+    rolls = [roll for roll in students if roll not in student_ids]
+    for chunk in chunked(rolls):
+        cur.execute(f"SELECT id, roll_no FROM students WHERE roll_no IN ({','.join('?' * len(chunk))})", chunk)
+        student_ids.update((row['roll_no'], row['id']) for row in cur.fetchall())
+
+    missing = [roll for roll in rolls if roll not in student_ids]
+    if missing:
+        cur.executemany(
+            "INSERT OR IGNORE INTO students (name, roll_no) VALUES (?, ?)",
+            [(students[roll], roll) for roll in missing]
+        )
+        for chunk in chunked(missing):
+            cur.execute(f"SELECT id, roll_no FROM students WHERE roll_no IN ({','.join('?' * len(chunk))})", chunk)
+            student_ids.update((row['roll_no'], row['id']) for row in cur.fetchall())
+    return student_ids
+
+
+def _write_feedback_batch(cur, submissions, known=None):
+    """
+    Writer operation: upsert many parsed submissions in one transaction.
+    Later submissions for the same student and date win, as with repeated single POSTs.
+    Returns the {roll_no: id} map used.
+    """
+    students = {}
+    for student_name, student_roll, *_ in submissions:
+        students.setdefault(student_roll, student_name)
+    student_ids = _resolve_student_ids(cur, students, known)
+
+    # Upserts keep submission order; consecutive submissions for the same meal share one executemany
+    rows = [(meal_type.lower(), feedback_upsert_params(student_ids[roll], feedback_date, meal_type.lower(), rating, comments))
+            for _, roll, feedback_date, meal_type, rating, comments, _ in submissions]
+    start = 0
+    while start < len(rows):
+        meal = rows[start][0]
+        stop = start
+        while stop < len(rows) and rows[stop][0] == meal:
+            stop += 1
+        cur.executemany(feedback_upsert_sql(meal), [params for _, params in rows[start:stop]])
+        start = stop
+    _write_feedback_items(cur, [(student_ids[roll], feedback_date, meal_type.lower(), dish_scores)
+                                for _, roll, feedback_date, meal_type, _, _, dish_scores in submissions])
+    return student_ids
+
+
+@APP.route('/api/feedback/batch', methods=['POST'])
+def save_feedback_batch():
+    """
+    Save many feedback submissions at once (offline kiosks, queued tablets).
+    Accepts a JSON list or {"submissions": [...]}; all valid submissions are committed together
+    and the response reports the outcome of each item by index.
+    """
+    try:
+        data = request.get_json()
+        if isinstance(data, dict):
+            data = data.get('submissions')
+        if not isinstance(data, list):
+            return jsonify({'error': 'expected a list of submissions'}), 400
+        if len(data) > FEEDBACK_BATCH_MAX:
+            return jsonify({'error': f'at most {FEEDBACK_BATCH_MAX} submissions per batch'}), 413
+
+        results = []
+        submissions = []
+        for index, item in enumerate(data):
+            try:
+                submissions.append(parse_feedback_submission(item))
+                results.append({'index': index, 'status': 'success'})
+            except ValueError as e:
+                results.append({'index': index, 'status': 'error', 'error': str(e)})
+
+        if submissions:
+            known = STUDENT_IDS.get_many({submission[1] for submission in submissions})
+
+            def committed(student_ids):
+                STUDENT_IDS.update(student_ids)
+                for feedback_date in {submission[2] for submission in submissions}:
+                    RESPONSE_CACHE.invalidate('student_feedback', feedback_date)
+
+            write_through(('feedback',), [submission[2] for submission in submissions],
+                          _write_feedback_batch, submissions, known, on_commit=committed)
+
+        return jsonify({
+            'status': 'success',
+            'saved': len(submissions),
+            'failed': len(data) - len(submissions),
+            'results': results
+        }), 200
+    except WriteTimeout as e:
+        return write_timeout_response(e)
+    except Exception as e:
+        LOG.exception("Error saving feedback batch: %s", e)
+        return jsonify({'error': str(e)}), 500
+
+# ============================================================================
+# STUDENT ROSTER IMPORT
+# ============================================================================
+
+# Accepted roster CSV headers (compared lower-cased, spaces as underscores)
+ROSTER_COLUMNS = {
+    'roll_no': ('roll_no', 'roll', 'roll_number', 'student_roll'),
+    'name': ('name', 'student_name'),
+    'email': ('email',),
+}
+ROSTER_ERRORS_MAX = 50      # per-line problems echoed back in the response
+
+
+def roster_columns(header):
+    """Map the roster fields to their positions in `header`; raise ValueError if roll_no or name is missing."""
+    names = [column.strip().lower().replace(' ', '_') for column in header]
+    positions = {}
+    for field, aliases in ROSTER_COLUMNS.items():
+        for alias in aliases:
+            if alias in names:
+                positions[field] = names.index(alias)
+                break
+    missing = [field for field in ('roll_no', 'name') if field not in positions]
+    if missing:
+        raise ValueError(f"roster CSV needs a header row with {' and '.join(missing)} column(s)")
+    return positions
+
+
+def _import_students(cur, rows):
+    """Writer operation: insert (name, roll_no, email) rows, leaving existing roll numbers untouched."""
+    cur.executemany("INSERT OR IGNORE INTO students (name, roll_no, email) VALUES (?, ?, ?)", rows)
+    return cur.rowcount
+
+
+@APP.route('/api/students/import', methods=['POST'])
+def import_students():
+    """
+    Load a roster CSV (name, roll_no and optionally email columns) into students.
+    Send it as the request body (text/csv) or as the `file` field of a form upload.
+    The file is read as a stream and written in chunks, each committed on its own, so a
+    failed import can simply be re-sent. Existing roll numbers are left as they are.
+    """
+    try:
+        upload = request.files.get('file')
+        stream = upload.stream if upload is not None else request.stream
+        reader = csv.reader(io.TextIOWrapper(stream, encoding='utf-8-sig', newline=''))
+        try:
+            positions = roster_columns(next(reader, None) or [])
+        except ValueError as e:
+            return jsonify({'error': str(e)}), 400
+
+        def students_changed(count):
+            if count:
+                RESPONSE_CACHE.invalidate('students')
+
+        width = max(positions.values()) + 1
+        rows_read = inserted = skipped = 0
+        errors = []
+        chunk = []
+        try:
+            for row in reader:
+                if not any(value.strip() for value in row):
+                    continue
+                rows_read += 1
+                row = [value.strip() for value in row] + [''] * (width - len(row))
+                roll, name = row[positions['roll_no']], row[positions['name']]
+                if not roll or not name:
+                    skipped += 1
+                    if len(errors) < ROSTER_ERRORS_MAX:
+                        errors.append({'line': reader.line_num, 'error': 'roll_no and name are required'})
+                    continue
+                email = (row[positions['email']] or None) if 'email' in positions else None
+                chunk.append((name, roll, email))
+                if len(chunk) >= STUDENT_IMPORT_CHUNK:
+                    inserted += DB_WRITER.submit(_import_students, chunk, on_commit=students_changed)
+                    chunk = []
+        except (csv.Error, UnicodeDecodeError) as e:
+            if inserted:
+                STUDENT_IDS.warm()
+            return jsonify({'error': f'unreadable roster CSV near line {reader.line_num}: {e}',
+                            'inserted': inserted}), 400
+        if chunk:
+            inserted += DB_WRITER.submit(_import_students, chunk, on_commit=students_changed)
+        cached = STUDENT_IDS.warm()
+
+        return jsonify({
+            'status': 'success',
+            'rows': rows_read,
+            'inserted': inserted,
+            'existing': rows_read - skipped - inserted,
+            'skipped': skipped,
+            'errors': errors,
+            'cached_ids': cached
+        }), 200
+    except WriteTimeout as e:
+        return write_timeout_response(e)
     except Exception as e:
-        print(f"Error saving feedback: {e}")
+        LOG.exception("Error importing students: %s", e)
         return jsonify({'error': str(e)}), 500
 
 # ============================================================================
 # FOOD COUNTS ENDPOINTS
 # ============================================================================
 
+def food_counts_sql(start: str, end: str, meal: str | None = None):
+    """SQL and parameters for food counts by date range and optional meal filter."""
+    sql = """
+    SELECT id, count_date AS date, meal AS mealType,
+           student_count AS studentCount, faculty_count AS facultyCount,
+           guest_count AS guestCount, total_count AS totalCount
+    FROM food_counts
+    WHERE count_date BETWEEN ? AND ?
+    """
+    params = [start, end]
+    if meal:
+        sql += " AND meal = ?"
+        params.append(meal)
+    sql += " ORDER BY count_date ASC, meal ASC"
+    return sql, params
+
+
 def query_food_counts(start: str, end: str, meal: str | None = None):
     """
     Query food counts from mess_management.db by date range and optional meal filter.
     Uses the new 'student_count', 'faculty_count', 'guest_count', 'total_count' schema.
     """
     try:
-        conn = get_db_connection()
-        cur = conn.cursor()
-        sql = """
-        SELECT id, count_date AS date, meal AS mealType,
-               student_count AS studentCount, faculty_count AS facultyCount,
-               guest_count AS guestCount, total_count AS totalCount
-        FROM food_counts
-        WHERE count_date BETWEEN ? AND ?
-        """
-        params = [start, end]
-        if meal:
-            sql += " AND meal = ?"
-            params.append(meal)
-        sql += " ORDER BY count_date ASC, meal ASC"
-        cur.execute(sql, params)
-        rows = [dict(r) for r in cur.fetchall()]
-        conn.close()
+        if SNAPSHOT is not None:
+            rows = SNAPSHOT.query('food_counts', start, end,
+                                  keep=('mealType', lambda v: v == meal) if meal else None)
+            if rows is not None:
+                return rows
+        with DB_POOL.connection() as conn:
+            cur = conn.cursor()
+            cur.execute(*food_counts_sql(start, end, meal))
+            rows = [dict(r) for r in cur.fetchall()]
         return rows
     except Exception as e:
-        print(f"Error querying food counts: {e}")
+        LOG.exception("Error querying food counts: %s", e)
         return []
 
 
 @APP.route('/api/food-counts')
+@conditional_get('food_counts')
+@cached_json('food_counts')
 def api_food_counts():
     """Get food counts by date range, with optional meal filter."""
     start = request.args.get('start')
@@ -219,10 +2537,14 @@ def api_food_counts():
     if not start or not end:
         return jsonify({'error': 'start and end query params required (YYYY-MM-DD)'}), 400
     rows = query_food_counts(start, end, meal)
-    return jsonify(rows)
+    return listing_json(rows)
+
+
+FOOD_COUNTS_CSV_COLUMNS = ['date', 'mealType', 'studentCount', 'facultyCount', 'guestCount', 'totalCount']
 
 
 @APP.route('/api/food-counts/csv')
+@conditional_get('food_counts')
 def api_food_counts_csv():
     """Download food counts as CSV."""
     start = request.args.get('start')
@@ -231,26 +2553,20 @@ def api_food_counts_csv():
     if not start or not end:
         return jsonify({'error': 'start and end query params required (YYYY-MM-DD)'}), 400
     
-    print(f"CSV Export: Fetching food counts from {start} to {end}")
-    rows = query_food_counts(start, end, meal)
-    print(f"CSV Export: Found {len(rows)} records")
-
-    si = io.StringIO()
-    writer = csv.writer(si)
-    writer.writerow(['date', 'mealType', 'studentCount', 'facultyCount', 'guestCount', 'totalCount'])
-    for r in rows:
-        writer.writerow([
-            r.get('date', ''), r.get('mealType', ''), r.get('studentCount', ''),
-            r.get('facultyCount', ''), r.get('guestCount', ''), r.get('totalCount', '')
-        ])
-
-    csv_content = si.getvalue()
-    print(f"CSV Content length: {len(csv_content)} bytes")
-    
-    output = make_response(csv_content)
-    output.headers['Content-Type'] = 'text/csv; charset=utf-8'
-    output.headers['Content-Disposition'] = f'attachment; filename=food_counts_{start}_to_{end}.csv'
-    return output
+    LOG.debug("CSV Export: Streaming food counts from %s to %s", start, end)
+    sql, params = food_counts_sql(start, end, meal)
+    return csv_response(sql, params, FOOD_COUNTS_CSV_COLUMNS, f'food_counts_{start}_to_{end}.csv')
+
+def _write_food_count(cur, count_date, meal, student_count, faculty_count, guest_count, total_count):
+    """Writer operation: insert or overwrite the count for one date and meal."""
+    cur.execute("""
+        INSERT INTO food_counts (count_date, meal, student_count, faculty_count, guest_count, total_count)
+        VALUES (?, ?, ?, ?, ?, ?)
+        ON CONFLICT(count_date, meal) DO UPDATE
+        SET student_count = excluded.student_count, faculty_count = excluded.faculty_count,
+            guest_count = excluded.guest_count, total_count = excluded.total_count
+    """, (count_date, meal, student_count, faculty_count, guest_count, total_count))
+
 
 @APP.route('/api/food-counts', methods=['POST'])
 def save_food_count():
@@ -262,47 +2578,28 @@ def save_food_count():
         student_count = data.get('student_count', 0)
         faculty_count = data.get('faculty_count', 0)
         guest_count = data.get('guest_count', 0)
-        
-        print(f"Saving food count: date={count_date}, meal={meal}, students={student_count}, faculty={faculty_count}")
-        
+
         if not count_date or not meal:
             return jsonify({'error': 'date and meal are required'}), 400
         
         total_count = student_count + faculty_count + guest_count
         
-        conn = get_db_connection()
-        cur = conn.cursor()
-        
-        # Check if record exists for this date and meal
-        cur.execute(
-            "SELECT id FROM food_counts WHERE count_date = ? AND meal = ?",
-            (count_date, meal)
-        )
-        existing = cur.fetchone()
-        
-        if existing:
-            print(f"Updating existing record for {count_date} - {meal}")
-            # Update existing record
-            cur.execute("""
-                UPDATE food_counts 
-                SET student_count = ?, faculty_count = ?, guest_count = ?, total_count = ?
-                WHERE count_date = ? AND meal = ?
-            """, (student_count, faculty_count, guest_count, total_count, count_date, meal))
-        else:
-            print(f"Inserting new record for {count_date} - {meal}")
-            # Insert new record
-            cur.execute("""
-                INSERT INTO food_counts (count_date, meal, student_count, faculty_count, guest_count, total_count)
-                VALUES (?, ?, ?, ?, ?, ?)
-            """, (count_date, meal, student_count, faculty_count, guest_count, total_count))
-        
-        conn.commit()
-        conn.close()
-        
-        print(f"Successfully saved food count")
+        def committed(_):
+            RESPONSE_CACHE.invalidate('food_counts', count_date)
+            EVENT_BROKER.publish('food_count', {
+                'date': count_date, 'mealType': meal, 'studentCount': student_count,
+                'facultyCount': faculty_count, 'guestCount': guest_count, 'totalCount': total_count,
+            })
+
+        write_through(('food_counts',), [count_date], _write_food_count, count_date, meal,
+                      student_count, faculty_count, guest_count, total_count, on_commit=committed)
+        LOG.info("Saved food count for %s - %s", count_date, meal, extra={'fields': {
+            'students': student_count, 'faculty': faculty_count, 'guests': guest_count}})
         return jsonify({'status': 'success', 'message': 'Food count saved successfully'}), 200
+    except WriteTimeout as e:
+        return write_timeout_response(e)
     except Exception as e:
-        print(f"Error saving food count: {e}")
+        LOG.exception("Error saving food count: %s", e)
         return jsonify({'error': str(e)}), 500
 
 # ============================================================================
@@ -311,63 +2608,48 @@ def save_food_count():
 
 def get_avg_food_quality(start: str, end: str, meal: str | None = None):
     """
-    Get average food quality ratings from student_feedback for a date range.
+    Get average food quality ratings for a date range from the feedback_daily_agg rollup.
     Returns averages for specific meal if 'meal' is provided, otherwise all three.
     """
     try:
-        conn = get_db_connection()
-        cur = conn.cursor()
+        with DB_POOL.connection() as conn:
+            cur = conn.cursor()
+            sql = """
+                SELECT meal,
+                       ROUND(CAST(SUM(rating_sum) AS REAL) / SUM(rating_count), 2) AS avg_rating,
+                       SUM(rating_count) AS feedback_count
+                FROM feedback_daily_agg
+                WHERE feedback_date BETWEEN ? AND ?
+            """
+            params = [start, end]
+            if meal in MEALS:
+                sql += " AND meal = ?"
+                params.append(meal)
+            sql += " GROUP BY meal"
+            cur.execute(sql, params)
+            totals = {row['meal']: row for row in cur.fetchall()}
 
         ratings = {}
-
-        if meal == 'breakfast':
-            query = "SELECT ROUND(AVG(breakfast_rating), 2) AS avg_rating, COUNT(breakfast_rating) AS feedback_count FROM student_feedback WHERE feedback_date BETWEEN ? AND ? AND breakfast_rating IS NOT NULL"
-            cur.execute(query, (start, end))
-            result = cur.fetchone()
-            if result and result['avg_rating'] is not None:
-                ratings['breakfast_rating'] = result['avg_rating']
-                ratings['breakfast_feedback_count'] = result['feedback_count']
-        elif meal == 'lunch':
-            query = "SELECT ROUND(AVG(lunch_rating), 2) AS avg_rating, COUNT(lunch_rating) AS feedback_count FROM student_feedback WHERE feedback_date BETWEEN ? AND ? AND lunch_rating IS NOT NULL"
-            cur.execute(query, (start, end))
-            result = cur.fetchone()
+        if meal in MEALS:
+            result = totals.get(meal)
             if result and result['avg_rating'] is not None:
-                ratings['lunch_rating'] = result['avg_rating']
-                ratings['lunch_feedback_count'] = result['feedback_count']
-        elif meal == 'dinner':
-            query = "SELECT ROUND(AVG(dinner_rating), 2) AS avg_rating, COUNT(dinner_rating) AS feedback_count FROM student_feedback WHERE feedback_date BETWEEN ? AND ? AND dinner_rating IS NOT NULL"
-            cur.execute(query, (start, end))
-            result = cur.fetchone()
-            if result and result['avg_rating'] is not None:
-                ratings['dinner_rating'] = result['avg_rating']
-                ratings['dinner_feedback_count'] = result['feedback_count']
+                ratings[f'{meal}_rating'] = result['avg_rating']
+                ratings[f'{meal}_feedback_count'] = result['feedback_count']
         else: # No specific meal, get all
-            query = """
-                SELECT
-                    ROUND(AVG(breakfast_rating), 2) AS avg_breakfast_rating,
-                    COUNT(breakfast_rating) AS breakfast_feedback_count,
-                    ROUND(AVG(lunch_rating), 2) AS avg_lunch_rating,
-                    COUNT(lunch_rating) AS lunch_feedback_count,
-                    ROUND(AVG(dinner_rating), 2) AS avg_dinner_rating,
-                    COUNT(dinner_rating) AS dinner_feedback_count
-                FROM student_feedback
-                WHERE feedback_date BETWEEN ? AND ?
-            """
-            cur.execute(query, (start, end))
-            result = cur.fetchone()
-            if result:
-                for key, value in result.items():
-                    if value is not None:
-                        ratings[key] = value
-
-        conn.close()
+            for name in MEALS:
+                result = totals.get(name)
+                ratings[f'{name}_feedback_count'] = result['feedback_count'] if result else 0
+                if result and result['avg_rating'] is not None:
+                    ratings[f'avg_{name}_rating'] = result['avg_rating']
         return ratings
     except Exception as e:
-        print(f"Error getting average food quality: {e}")
+        LOG.exception("Error getting average food quality: %s", e)
         return {}
 
 
 @APP.route('/api/food-quality')
+@conditional_get('student_feedback')
+@cached_json('student_feedback')
 def api_food_quality():
     """
     Get average food quality ratings for a period.
@@ -382,55 +2664,293 @@ def api_food_quality():
     return jsonify(quality)
 
 # ============================================================================
-# FINES ENDPOINTS (NEW)
+# FEEDBACK ANALYTICS
 # ============================================================================
 
-def query_fines(start: str, end: str, response_status_filter: str = 'all'):
+# granularity -> (period key over feedback_daily_agg, moving-average window frame).
+# Frames are calendar based: 7 days, 4 weeks (weeks start on Monday), 3 months.
+ANALYTICS_GRANULARITIES = {
+    'daily': (
+        "feedback_date",
+        "ORDER BY julianday(period) RANGE BETWEEN 6 PRECEDING AND CURRENT ROW",
+    ),
+    'weekly': (
+        "date(feedback_date, 'weekday 0', '-6 days')",
+        "ORDER BY julianday(period) RANGE BETWEEN 27 PRECEDING AND CURRENT ROW",
+    ),
+    'monthly': (
+        "substr(feedback_date, 1, 7)",
+        "ORDER BY CAST(substr(period, 1, 4) AS INTEGER) * 12 + CAST(substr(period, 6, 2) AS INTEGER)"
+        " RANGE BETWEEN 2 PRECEDING AND CURRENT ROW",
+    ),
+}
+
+
+def feedback_analytics_sql(start: str, end: str, granularities, meal: str | None = None):
     """
-    Query fines within a date range, optionally filtered by vendor response status.
-    Returns fines with their associated vendor response.
+    One statement over the feedback_daily_agg rollup returning, for every requested
+    granularity, one row per (period, meal) with its count, mean, 1-5 star distribution
+    and rating-weighted moving average.
+    """
+    meal_filter = " AND meal = ?" if meal else ""
+    parts, params = [], []
+    for granularity in granularities:
+        period, frame = ANALYTICS_GRANULARITIES[granularity]
+        parts.append(f"""
+        SELECT '{granularity}' AS granularity, period, meal, rating_count,
+               ROUND(CAST(rating_sum AS REAL) / rating_count, 2) AS mean,
+               r1, r2, r3, r4, r5,
+               ROUND(CAST(SUM(rating_sum) OVER w AS REAL) / SUM(rating_count) OVER w, 2) AS moving_avg
+        FROM (
+            SELECT {period} AS period, meal,
+                   SUM(rating_sum) AS rating_sum, SUM(rating_count) AS rating_count,
+                   SUM(r1) AS r1, SUM(r2) AS r2, SUM(r3) AS r3, SUM(r4) AS r4, SUM(r5) AS r5
+            FROM feedback_daily_agg
+            WHERE feedback_date BETWEEN ? AND ?{meal_filter}
+            GROUP BY 1, meal
+            HAVING SUM(rating_count) > 0
+        )
+        WINDOW w AS (PARTITION BY meal {frame})""")
+        params += [start, end] + ([meal] if meal else [])
+    sql = " UNION ALL ".join(parts) + " ORDER BY granularity, meal, period"
+    return sql, params
+
+
+def query_feedback_analytics(start: str, end: str, granularities, meal: str | None = None):
+    """
+    Feedback rating series for the dashboards:
+    {granularity: {meal: [{period, count, mean, distribution, movingAvg}]}, 'summary': {meal: {...}}}.
+    `distribution` is the number of 1..5 star ratings.
+    """
+    with DB_POOL.connection() as conn:
+        rows = conn.execute(*feedback_analytics_sql(start, end, granularities, meal)).fetchall()
+
+    result = {granularity: {} for granularity in granularities}
+    summary = {}
+    for row in rows:
+        distribution = [row['r1'], row['r2'], row['r3'], row['r4'], row['r5']]
+        result[row['granularity']].setdefault(row['meal'], []).append({
+            'period': row['period'],
+            'count': row['rating_count'],
+            'mean': row['mean'],
+            'distribution': distribution,
+            'movingAvg': row['moving_avg'],
+        })
+        # Every granularity covers the same ratings, so totals come from the first one
+        if row['granularity'] == granularities[0]:
+            total = summary.setdefault(row['meal'], {'count': 0, 'sum': 0, 'distribution': [0] * 5})
+            total['count'] += row['rating_count']
+            total['sum'] += sum(star * n for star, n in enumerate(distribution, 1))
+            total['distribution'] = [a + b for a, b in zip(total['distribution'], distribution)]
+
+    result['summary'] = {
+        name: {'count': total['count'], 'mean': round(total['sum'] / total['count'], 2),
+               'distribution': total['distribution']}
+        for name, total in summary.items()
+    }
+    return result
+
+
+@APP.route('/api/analytics/feedback')
+@conditional_get('student_feedback')
+@cached_json('student_feedback')
+def api_feedback_analytics():
+    """
+    Pre-aggregated feedback ratings per meal. Optional 'granularity' (comma separated
+    daily, weekly, monthly; default all) and 'meal' params.
     """
+    start = request.args.get('start')
+    end = request.args.get('end')
+    meal = request.args.get('meal') or None
+    if not start or not end:
+        return jsonify({'error': 'start and end query params required (YYYY-MM-DD)'}), 400
+    if meal and meal not in MEALS:
+        return jsonify({'error': f"meal must be one of: {', '.join(MEALS)}"}), 400
+    requested = request.args.get('granularity')
+    granularities = [g.strip() for g in requested.split(',') if g.strip()] if requested else list(ANALYTICS_GRANULARITIES)
+    unknown = [g for g in granularities if g not in ANALYTICS_GRANULARITIES]
+    if unknown or not granularities:
+        return jsonify({'error': f"granularity must be from: {', '.join(ANALYTICS_GRANULARITIES)}"}), 400
+
     try:
-        conn = get_db_connection()
-        cur = conn.cursor()
-        sql = """
-        SELECT f.id, f.fine_date AS date, f.meal, f.reason, f.amount, f.imposed_by AS imposedBy,
-               vr.vendor_response AS vendorResponse,
-               vr.status AS responseStatus
-        FROM fines f
-        LEFT JOIN vendor_responses vr ON f.id = vr.fine_id
-        WHERE f.fine_date BETWEEN ? AND ?
-        """
-        params = [start, end]
+        analytics = query_feedback_analytics(start, end, list(dict.fromkeys(granularities)), meal)
+    except Exception as e:
+        LOG.exception("Error computing feedback analytics: %s", e)
+        return jsonify({'error': str(e)}), 500
+    analytics.update({'start': start, 'end': end})
+    return jsonify(analytics)
+
+
+DISH_RANKING_LIMIT_DEFAULT = 5
+DISH_RANKING_LIMIT_MAX = 50
+
+
+def query_dish_scores(start: str, end: str, meal: str | None = None, min_ratings: int = 1):
+    """
+    Per-dish scores over a date range from the dish_daily_agg rollup, best first.
+    `score` averages the taste and cleanliness ratings together, like the meal rating.
+    """
+    meal_filter = " AND a.meal = ?" if meal else ""
+    with DB_POOL.connection() as conn:
+        rows = conn.execute(f"""
+            SELECT d.name, SUM(a.item_count) AS ratings,
+                   ROUND(CAST(SUM(a.taste_sum) + SUM(a.cleanliness_sum) AS REAL)
+                         / NULLIF(SUM(a.taste_count) + SUM(a.cleanliness_count), 0), 2) AS score,
+                   ROUND(CAST(SUM(a.taste_sum) AS REAL) / NULLIF(SUM(a.taste_count), 0), 2) AS taste,
+                   ROUND(CAST(SUM(a.cleanliness_sum) AS REAL) / NULLIF(SUM(a.cleanliness_count), 0), 2) AS cleanliness
+            FROM dish_daily_agg a
+            JOIN dishes d ON d.id = a.dish_id
+            WHERE a.feedback_date BETWEEN ? AND ?{meal_filter}
+            GROUP BY a.dish_id
+            HAVING SUM(a.item_count) >= ?
+            ORDER BY score DESC, ratings DESC, d.name
+        """, [start, end] + ([meal] if meal else []) + [max(min_ratings, 1)]).fetchall()
+    return [{'dish': row['name'], 'ratings': row['ratings'], 'score': row['score'],
+             'taste': row['taste'], 'cleanliness': row['cleanliness']} for row in rows]
+
+
+@APP.route('/api/analytics/items')
+@conditional_get('student_feedback')
+@cached_json('student_feedback')
+def api_item_analytics():
+    """
+    Top and bottom rated dishes over a date range, from the per-dish daily rollup.
+    Optional 'meal', 'limit' (dishes per list, default 5) and 'min_ratings' params.
+    """
+    start = request.args.get('start')
+    end = request.args.get('end')
+    meal = request.args.get('meal') or None
+    if not start or not end:
+        return jsonify({'error': 'start and end query params required (YYYY-MM-DD)'}), 400
+    if meal and meal not in MEALS:
+        return jsonify({'error': f"meal must be one of: {', '.join(MEALS)}"}), 400
+    try:
+        limit = int(request.args.get('limit', DISH_RANKING_LIMIT_DEFAULT))
+        min_ratings = int(request.args.get('min_ratings', 1))
+    except ValueError:
+        return jsonify({'error': 'limit and min_ratings must be integers'}), 400
+    if not 1 <= limit <= DISH_RANKING_LIMIT_MAX:
+        return jsonify({'error': f'limit must be between 1 and {DISH_RANKING_LIMIT_MAX}'}), 400
+
+    try:
+        dishes = query_dish_scores(start, end, meal, min_ratings)
+    except Exception as e:
+        LOG.exception("Error computing dish rankings: %s", e)
+        return jsonify({'error': str(e)}), 500
+    bottom = sorted(dishes, key=lambda dish: (dish['score'], -dish['ratings'], dish['dish']))
+    return jsonify({
+        'start': start,
+        'end': end,
+        'meal': meal,
+        'dishes': len(dishes),
+        'top': dishes[:limit],
+        'bottom': bottom[:limit],
+    })
+
+# ============================================================================
+# FINES ENDPOINTS (NEW)
+# ============================================================================
+
+# Output name -> SQL expression for the fines listing (also the `fields=` whitelist)
+FINES_COLUMNS = {
+    'id': 'f.id',
+    'date': 'f.fine_date',
+    'meal': 'f.meal',
+    'reason': 'f.reason',
+    'amount': 'f.amount',
+    'imposedBy': 'f.imposed_by',
+    'vendorResponse': 'vr.vendor_response',
+    'responseStatus': 'vr.status',
+}
+FINES_KEYS = ('f.fine_date', 'f.id')
+FINES_KEY_TYPES = (str, int)
+
+
+def fines_sql(start: str, end: str, response_status_filter: str = 'all',
+              fields=None, after=None, limit=None):
+    """
+    SQL and parameters for fines (with their vendor response) within a date range.
+    With `limit`, returns one page of limit+1 rows after the `after` sort key; the
+    (fine_date, id) order matches idx_fines_date, so the row-value bound is an index seek.
+    """
+    sql = f"""
+    SELECT {select_list(FINES_COLUMNS, fields, FINES_KEYS if limit else ())}
+    FROM fines f
+    LEFT JOIN vendor_responses vr ON f.id = vr.fine_id
+    WHERE f.fine_date BETWEEN ? AND ?
+    """
+    params = [start, end]
+    if after:
+        sql += " AND (f.fine_date, f.id) < (?, ?)"
+        params += after
+
+    if response_status_filter == 'submitted':
+        sql += " AND vr.vendor_response IS NOT NULL"
+    elif response_status_filter == 'not_submitted':
+        sql += " AND vr.vendor_response IS NULL"
+    # 'all' needs no additional WHERE clause
 
-        if response_status_filter == 'submitted':
-            sql += " AND vr.vendor_response IS NOT NULL"
-        elif response_status_filter == 'not_submitted':
-            sql += " AND vr.vendor_response IS NULL"
-        # 'all' needs no additional WHERE clause
+    sql += " ORDER BY f.fine_date DESC, f.id DESC"
+    if limit:
+        sql += " LIMIT ?"
+        params.append(limit + 1)
+    return sql, params
 
-        sql += " ORDER BY f.fine_date DESC"
-        cur.execute(sql, params)
-        rows = [dict(r) for r in cur.fetchall()]
-        conn.close()
+
+def query_fines(start: str, end: str, response_status_filter: str = 'all',
+                fields=None, after=None, limit=None):
+    """
+    Query fines within a date range, optionally filtered by vendor response status.
+    Returns fines with their associated vendor response.
+    """
+    try:
+        if SNAPSHOT is not None and not limit:
+            keep = None
+            if response_status_filter == 'submitted':
+                keep = ('vendorResponse', lambda v: v is not None)
+            elif response_status_filter == 'not_submitted':
+                keep = ('vendorResponse', lambda v: v is None)
+            rows = SNAPSHOT.query('fines', start, end, fields, keep)
+            if rows is not None:
+                return rows
+        with DB_POOL.connection() as conn:
+            cur = conn.cursor()
+            cur.execute(*fines_sql(start, end, response_status_filter, fields, after, limit))
+            rows = [dict(r) for r in cur.fetchall()]
         return rows
     except Exception as e:
-        print(f"Error querying fines: {e}")
+        LOG.exception("Error querying fines: %s", e)
         return []
 
 @APP.route('/api/fines')
+@conditional_get('fines', 'vendor_responses')
+@cached_json('fines', 'vendor_responses')
 def api_fines():
-    """Get fines by date range, with optional response status filter."""
+    """
+    Get fines by date range, with optional response status filter. Supports the same
+    limit/after/fields paging as /api/feedback.
+    """
     start = request.args.get('start')
     end = request.args.get('end')
     response_status_filter = request.args.get('response_status', 'all') # 'all', 'submitted', 'not_submitted'
 
     if not start or not end:
         return jsonify({'error': 'start and end query params required (YYYY-MM-DD)'}), 400
-    rows = query_fines(start, end, response_status_filter)
-    return jsonify(rows)
+    try:
+        limit, after, fields = parse_page_args(FINES_COLUMNS, FINES_KEY_TYPES)
+    except ValueError as e:
+        return jsonify({'error': str(e)}), 400
+    rows = query_fines(start, end, response_status_filter, fields, after, limit)
+    if limit:
+        items, next_cursor = paginate(rows, limit)
+        return listing_json(items, nextCursor=next_cursor)
+    return listing_json(rows)
+
+FINES_CSV_COLUMNS = ['date', 'meal', 'reason', 'amount', 'imposedBy', 'vendorResponse', 'responseStatus']
+
 
 @APP.route('/api/fines/csv')
+@conditional_get('fines', 'vendor_responses')
 def api_fines_csv():
     """Download fines as CSV."""
     start = request.args.get('start')
@@ -439,21 +2959,17 @@ def api_fines_csv():
 
     if not start or not end:
         return jsonify({'error': 'start and end query params required (YYYY-MM-DD)'}), 400
-    rows = query_fines(start, end, response_status_filter)
-
-    si = io.StringIO()
-    writer = csv.writer(si)
-    writer.writerow(['date', 'meal', 'reason', 'amount', 'imposedBy', 'vendorResponse', 'responseStatus']) # Added vendorResponse and responseStatus
-    for r in rows:
-        writer.writerow([
-            r.get('date', ''), r.get('meal', ''), r.get('reason', ''),
-            r.get('amount', ''), r.get('imposedBy', ''),
-            r.get('vendorResponse', ''), r.get('responseStatus', '')
-        ])
-    output = make_response(si.getvalue())
-    output.headers['Content-Type'] = 'text/csv; charset=utf-8'
-    output.headers['Content-Disposition'] = f'attachment; filename=fines_{start}_to_{end}.csv'
-    return output
+    sql, params = fines_sql(start, end, response_status_filter)
+    return csv_response(sql, params, FINES_CSV_COLUMNS, f'fines_{start}_to_{end}.csv')
+
+def _write_fine(cur, fine_date, meal, reason, amount, imposed_by):
+    """Writer operation: insert a fine and return its id."""
+    cur.execute("""
+        INSERT INTO fines (fine_date, meal, reason, amount, imposed_by)
+        VALUES (?, ?, ?, ?, ?)
+    """, [fine_date, meal, reason, amount, imposed_by])
+    return cur.lastrowid
+
 
 @APP.route('/api/fines', methods=['POST'])
 def save_fine():
@@ -469,43 +2985,55 @@ def save_fine():
         if not all([fine_date, meal, reason, amount, imposed_by]):
             return jsonify({'error': 'Missing required fields'}), 400
         
-        conn = get_db_connection()
-        cur = conn.cursor()
-        cur.execute("""
-            INSERT INTO fines (fine_date, meal, reason, amount, imposed_by)
-            VALUES (?, ?, ?, ?, ?)
-        """, [fine_date, meal, reason, int(amount), imposed_by])
-        conn.commit()
-        conn.close()
+        def committed(fine_id):
+            RESPONSE_CACHE.invalidate('fines', fine_date)
+            EVENT_BROKER.publish('fine_imposed', {
+                'id': fine_id, 'date': fine_date, 'meal': meal, 'reason': reason,
+                'amount': int(amount), 'imposedBy': imposed_by,
+            })
+
+        write_through(('fines',), [fine_date], _write_fine,
+                      fine_date, meal, reason, int(amount), imposed_by, on_commit=committed)
         
         return jsonify({'success': True, 'message': 'Fine imposed successfully'}), 201
+    except WriteTimeout as e:
+        return write_timeout_response(e)
     except Exception as e:
-        print(f"Error saving fine: {e}")
+        LOG.exception("Error saving fine: %s", e)
         return jsonify({'error': str(e)}), 500
 
+def _delete_fine(cur, fine_id):
+    """Writer operation: delete a fine and its vendor responses. Returns the deleted fine's date, or None."""
+    cur.execute("SELECT fine_date FROM fines WHERE id = ?", [fine_id])
+    fine = cur.fetchone()
+
+    # First delete any associated vendor responses
+    cur.execute("DELETE FROM vendor_responses WHERE fine_id = ?", [fine_id])
+
+    # Then delete the fine
+    cur.execute("DELETE FROM fines WHERE id = ?", [fine_id])
+    return fine['fine_date'] if fine else None
+
+
 @APP.route('/api/fines/<int:fine_id>', methods=['DELETE'])
 def delete_fine(fine_id):
     """Delete a fine from the database."""
     try:
-        conn = get_db_connection()
-        cur = conn.cursor()
-        
-        # First delete any associated vendor responses
-        cur.execute("DELETE FROM vendor_responses WHERE fine_id = ?", [fine_id])
-        
-        # Then delete the fine
-        cur.execute("DELETE FROM fines WHERE id = ?", [fine_id])
-        conn.commit()
-        
-        rows_deleted = cur.rowcount
-        conn.close()
+        def committed(fine_date):
+            if fine_date is not None:
+                RESPONSE_CACHE.invalidate('fines', fine_date)
+                EVENT_BROKER.publish('fine_deleted', {'id': fine_id, 'date': fine_date})
+
+        fine_date = write_through(('fines',), None, _delete_fine, fine_id, on_commit=committed)
         
-        if rows_deleted == 0:
+        if fine_date is None:
             return jsonify({'error': 'Fine not found'}), 404
         
         return jsonify({'success': True, 'message': 'Fine deleted successfully'}), 200
+    except WriteTimeout as e:
+        return write_timeout_response(e)
     except Exception as e:
-        print(f"Error deleting fine: {e}")
+        LOG.exception("Error deleting fine: %s", e)
         return jsonify({'error': str(e)}), 500
 
 # ============================================================================
@@ -515,31 +3043,45 @@ def delete_fine(fine_id):
 def query_vendor_responses(fine_id: int | None = None):
     """Query vendor responses, optionally filtered by fine_id."""
     try:
-        conn = get_db_connection()
-        cur = conn.cursor()
-        sql = """
-        SELECT id, fine_id, vendor_response, submitted_at AS submittedAt, status
-        FROM vendor_responses
-        """
-        params = []
-        if fine_id:
-            sql += " WHERE fine_id = ?"
-            params.append(fine_id)
-        sql += " ORDER BY submitted_at DESC"
-        cur.execute(sql, params)
-        rows = [dict(r) for r in cur.fetchall()]
-        conn.close()
+        with DB_POOL.connection() as conn:
+            cur = conn.cursor()
+            sql = """
+            SELECT id, fine_id, vendor_response, submitted_at AS submittedAt, status
+            FROM vendor_responses
+            """
+            params = []
+            if fine_id:
+                sql += " WHERE fine_id = ?"
+                params.append(fine_id)
+            sql += " ORDER BY submitted_at DESC"
+            cur.execute(sql, params)
+            rows = [dict(r) for r in cur.fetchall()]
         return rows
     except Exception as e:
-        print(f"Error querying vendor responses: {e}")
+        LOG.exception("Error querying vendor responses: %s", e)
         return []
 
 @APP.route('/api/vendor-responses')
+@conditional_get('vendor_responses', 'fines')
 def api_vendor_responses():
     """Get vendor responses, optionally filtered by fine_id."""
     fine_id = request.args.get('fine_id', type=int)
     rows = query_vendor_responses(fine_id)
-    return jsonify(rows)
+    return listing_json(rows)
+
+def _write_vendor_response(cur, fine_id, vendor_response_text, status):
+    """Writer operation: insert or replace the vendor response for a fine. Returns the fine's date."""
+    cur.execute("""
+        INSERT INTO vendor_responses (fine_id, vendor_response, status)
+        VALUES (?, ?, ?)
+        ON CONFLICT(fine_id) DO UPDATE
+        SET vendor_response = excluded.vendor_response, submitted_at = CURRENT_TIMESTAMP,
+            status = excluded.status
+    """, [fine_id, vendor_response_text, status])
+    cur.execute("SELECT fine_date FROM fines WHERE id = ?", [fine_id])
+    fine = cur.fetchone()
+    return fine['fine_date'] if fine else None
+
 
 @APP.route('/api/vendor-responses', methods=['POST'])
 def save_vendor_response():
@@ -553,102 +3095,1010 @@ def save_vendor_response():
         if not all([fine_id, vendor_response_text]):
             return jsonify({'error': 'Missing required fields: fine_id, vendor_response'}), 400
         
-        conn = get_db_connection()
-        cur = conn.cursor()
-        
-        # Check if a response already exists for this fine_id
-        cur.execute("SELECT id FROM vendor_responses WHERE fine_id = ?", [fine_id])
-        existing_response = cur.fetchone()
-        
-        if existing_response:
-            # Update existing response
-            cur.execute("""
-                UPDATE vendor_responses
-                SET vendor_response = ?, submitted_at = CURRENT_TIMESTAMP, status = ?
-                WHERE id = ?
-            """, [vendor_response_text, status, existing_response['id']])
-        else:
-            # Insert new response
-            cur.execute("""
-                INSERT INTO vendor_responses (fine_id, vendor_response, status)
-                VALUES (?, ?, ?)
-            """, [fine_id, vendor_response_text, status])
-        
-        conn.commit()
-        conn.close()
+        def committed(fine_date):
+            RESPONSE_CACHE.invalidate('vendor_responses', fine_date)
+            EVENT_BROKER.publish('vendor_response', {'fineId': fine_id, 'date': fine_date, 'status': status})
+
+        write_through(('fines',), None, _write_vendor_response,
+                      fine_id, vendor_response_text, status, on_commit=committed)
         
         return jsonify({'success': True, 'message': 'Vendor response saved successfully'}), 201
+    except WriteTimeout as e:
+        return write_timeout_response(e)
+    except Exception as e:
+        LOG.exception("Error saving vendor response: %s", e)
+        return jsonify({'error': str(e)}), 500
+
+# ============================================================================
+# FULL-TEXT SEARCH
+# ============================================================================
+
+SEARCH_LIMIT_DEFAULT = 20
+SEARCH_LIMIT_MAX = 100
+SEARCH_QUERY_MAX = 200      # characters
+SEARCH_SNIPPET_TOKENS = 12
+SEARCH_SOURCES = ('feedback', 'vendor_responses')
+
+# Highlight markers SQLite puts around matches; swapped for <mark> after HTML escaping
+_MARK_OPEN, _MARK_CLOSE = '\x02', '\x03'
+
+
+def search_sql(source, start=None, end=None, meal=None):
+    """
+    MATCH query for one source, best BM25 rank first. Dates filter on the feedback date
+    or the date of the fine a vendor response answers; `meal` keeps feedback that rated
+    that meal and responses to fines for that meal.
+    """
+    filters, params = [], []
+    if source == 'feedback':
+        if start and end:
+            filters.append("sf.feedback_date BETWEEN ? AND ?")
+            params += [start, end]
+        if meal:
+            filters.append(f"sf.{meal}_rating > 0")
+        sql = """
+            SELECT 'feedback' AS type, sf.id AS id, s.name AS studentName, s.roll_no AS rollNumber,
+                   sf.feedback_date AS date, sf.breakfast_rating AS breakfastRating,
+                   sf.lunch_rating AS lunchRating, sf.dinner_rating AS dinnerRating, sf.comments AS comments,
+                   snippet(feedback_fts, 0, char(2), char(3), '…', ?) AS snippet,
+                   -bm25(feedback_fts) AS score
+            FROM feedback_fts
+            JOIN student_feedback sf ON sf.id = feedback_fts.rowid
+            LEFT JOIN students s ON s.id = sf.student_id
+            WHERE feedback_fts MATCH ?
+        """
+    else:
+        if start and end:
+            filters.append("f.fine_date BETWEEN ? AND ?")
+            params += [start, end]
+        if meal:
+            filters.append("f.meal = ?")
+            params.append(meal)
+        sql = """
+            SELECT 'vendor_response' AS type, vr.id AS id, vr.fine_id AS fineId, f.fine_date AS date,
+                   f.meal AS meal, f.reason AS reason, vr.status AS status, vr.submitted_at AS submittedAt,
+                   vr.vendor_response AS vendorResponse,
+                   snippet(vendor_responses_fts, 0, char(2), char(3), '…', ?) AS snippet,
+                   -bm25(vendor_responses_fts) AS score
+            FROM vendor_responses_fts
+            JOIN vendor_responses vr ON vr.id = vendor_responses_fts.rowid
+            LEFT JOIN fines f ON f.id = vr.fine_id
+            WHERE vendor_responses_fts MATCH ?
+        """
+    sql += ''.join(f" AND {condition}" for condition in filters) + " ORDER BY rank LIMIT ?"
+    return sql, params
+
+
+def highlight(snippet):
+    """HTML-escape a snippet and wrap the matched terms in <mark>."""
+    return html.escape(snippet or '').replace(_MARK_OPEN, '<mark>').replace(_MARK_CLOSE, '</mark>')
+
+
+def search(query, sources=SEARCH_SOURCES, start=None, end=None, meal=None, limit=SEARCH_LIMIT_DEFAULT, offset=0):
+    """
+    Run an FTS5 query (words, "phrases", prefix*, AND/OR/NOT) against `sources` and
+    return the best `limit` hits after `offset`, merged across sources by score.
+    Raises sqlite3.OperationalError for malformed queries.
+    """
+    hits = []
+    with DB_POOL.connection() as conn:
+        for source in sources:
+            sql, params = search_sql(source, start, end, meal)
+            rows = conn.execute(sql, [SEARCH_SNIPPET_TOKENS, query, *params, offset + limit]).fetchall()
+            hits.extend(dict(row) for row in rows)
+    if len(sources) > 1:
+        hits.sort(key=lambda hit: hit['score'], reverse=True)
+    hits = hits[offset:offset + limit]
+    for hit in hits:
+        hit['snippet'] = highlight(hit['snippet'])
+        hit['score'] = round(hit['score'], 4)
+    return hits
+
+
+@APP.route('/api/search')
+@conditional_get('student_feedback', 'students', 'vendor_responses', 'fines')
+@cached_json('student_feedback', 'students', 'vendor_responses', 'fines')
+def api_search():
+    """
+    Full-text search over feedback comments and vendor responses.
+    Returns {items, query, nextOffset}; nextOffset is null on the last page.
+    """
+    query = (request.args.get('q') or '').strip()
+    source = request.args.get('source', 'all')
+    start = request.args.get('start')
+    end = request.args.get('end')
+    meal = (request.args.get('meal') or '').lower() or None
+    if not query:
+        return jsonify({'error': 'q query param required'}), 400
+    if len(query) > SEARCH_QUERY_MAX:
+        return jsonify({'error': f'q must be at most {SEARCH_QUERY_MAX} characters'}), 400
+    if source != 'all' and source not in SEARCH_SOURCES:
+        return jsonify({'error': f"source must be all or one of {', '.join(SEARCH_SOURCES)}"}), 400
+    if meal and meal not in MEALS:
+        return jsonify({'error': f"meal must be one of {', '.join(MEALS)}"}), 400
+    if bool(start) != bool(end):
+        return jsonify({'error': 'start and end must be given together (YYYY-MM-DD)'}), 400
+    try:
+        limit = request.args.get('limit', SEARCH_LIMIT_DEFAULT, type=int)
+        offset = request.args.get('offset', 0, type=int)
+        if not 1 <= limit <= SEARCH_LIMIT_MAX or offset < 0:
+            raise ValueError
+    except (TypeError, ValueError):
+        return jsonify({'error': f'limit must be 1-{SEARCH_LIMIT_MAX} and offset >= 0'}), 400
+
+    sources = SEARCH_SOURCES if source == 'all' else (source,)
+    try:
+        hits = search(query, sources, start, end, meal, limit + 1, offset)
+    except sqlite3.OperationalError as e:
+        if 'no such table' in str(e):
+            return jsonify({'error': 'full-text search is not available on this server'}), 501
+        return jsonify({'error': f'invalid search query: {e}'}), 400
     except Exception as e:
-        print(f"Error saving vendor response: {e}")
+        LOG.exception("Error searching: %s", e)
         return jsonify({'error': str(e)}), 500
+    next_offset = offset + limit if len(hits) > limit else None
+    # Hits from the two sources have different fields, so there is no compact format here
+    return jsonify({'items': hits[:limit], 'query': query, 'nextOffset': next_offset})
 
 # ============================================================================
 # BILLING ENDPOINTS (NEW)
 # ============================================================================
 
+def billing_sql(start: str, end: str):
+    """SQL and parameters for billing records within a date range."""
+    sql = """
+    SELECT id, billing_date AS date,
+           breakfast_count AS breakfastCount,
+           lunch_count AS lunchCount,
+           dinner_count AS dinnerCount,
+           max_people_fed AS maxPeopleFed,
+           amount_per_person AS amountPerPerson,
+           gross_amount AS grossAmount,
+           fine_amount AS fineAmount,
+           net_amount AS netAmount
+    FROM billing
+    WHERE billing_date BETWEEN ? AND ?
+    ORDER BY billing_date ASC
+    """
+    return sql, [start, end]
+
+
+BILLING_RATE_PER_PERSON = 150.0  # rate for newly billed days; existing rows keep theirs
+
+
+def refresh_billing(cur, start=None, end=None):
+    """
+    Writer operation: recompute billing for the dirty days (optionally only those in
+    [start, end]) in one set-based statement, then clear them. Billing is based on the
+    busiest meal of the day minus that day's fines; days without food counts are unbilled.
+    Returns the number of days refreshed.
+    """
+    dirty_filter, params = "", []
+    if start and end:
+        dirty_filter, params = " WHERE billing_date BETWEEN ? AND ?", [start, end]
+    cur.execute("CREATE TEMP TABLE IF NOT EXISTS billing_refresh (billing_date TEXT PRIMARY KEY)")
+    cur.execute("DELETE FROM temp.billing_refresh")
+    cur.execute(f"INSERT INTO temp.billing_refresh SELECT billing_date FROM billing_dirty{dirty_filter}", params)
+    days = cur.execute("SELECT COUNT(*) FROM temp.billing_refresh").fetchone()[0]
+    if not days:
+        return 0
+
+    cur.execute("""
+        WITH counts AS (
+            SELECT count_date AS billing_date,
+                   SUM(CASE WHEN meal = 'breakfast' THEN total_count ELSE 0 END) AS breakfast_count,
+                   SUM(CASE WHEN meal = 'lunch' THEN total_count ELSE 0 END) AS lunch_count,
+                   SUM(CASE WHEN meal = 'dinner' THEN total_count ELSE 0 END) AS dinner_count,
+                   MAX(total_count) AS max_people_fed
+            FROM food_counts
+            WHERE count_date IN (SELECT billing_date FROM temp.billing_refresh)
+            GROUP BY count_date
+        ),
+        fine_totals AS (
+            SELECT fine_date AS billing_date, SUM(amount) AS fine_amount
+            FROM fines
+            WHERE fine_date IN (SELECT billing_date FROM temp.billing_refresh)
+            GROUP BY fine_date
+        )
+        INSERT INTO billing (billing_date, breakfast_count, lunch_count, dinner_count, max_people_fed,
+                             amount_per_person, gross_amount, fine_amount, net_amount)
+        SELECT c.billing_date, c.breakfast_count, c.lunch_count, c.dinner_count, c.max_people_fed,
+               ?, c.max_people_fed * ?, COALESCE(ft.fine_amount, 0),
+               c.max_people_fed * ? - COALESCE(ft.fine_amount, 0)
+        FROM counts c
+        LEFT JOIN fine_totals ft ON ft.billing_date = c.billing_date
+        WHERE true
+        ON CONFLICT(billing_date) DO UPDATE SET
+            breakfast_count = excluded.breakfast_count,
+            lunch_count = excluded.lunch_count,
+            dinner_count = excluded.dinner_count,
+            max_people_fed = excluded.max_people_fed,
+            gross_amount = excluded.max_people_fed * billing.amount_per_person,
+            fine_amount = excluded.fine_amount,
+            net_amount = excluded.max_people_fed * billing.amount_per_person - excluded.fine_amount
+    """, [BILLING_RATE_PER_PERSON] * 3)
+
+    # Days whose food counts are all gone are no longer billed
+    cur.execute("""
+        DELETE FROM billing
+        WHERE billing_date IN (SELECT billing_date FROM temp.billing_refresh)
+          AND billing_date NOT IN (SELECT count_date FROM food_counts
+                                   WHERE count_date IN (SELECT billing_date FROM temp.billing_refresh))
+    """)
+    cur.execute("DELETE FROM billing_dirty WHERE billing_date IN (SELECT billing_date FROM temp.billing_refresh)")
+    return days
+
+
+def ensure_billing_current(start: str, end: str):
+    """Recompute any dirty billing days in [start, end] before they are read."""
+    with DB_POOL.connection() as conn:
+        dirty = conn.execute(
+            "SELECT EXISTS(SELECT 1 FROM billing_dirty WHERE billing_date BETWEEN ? AND ?)", [start, end]
+        ).fetchone()[0]
+    if dirty:
+        DB_WRITER.submit(refresh_billing, start, end)
+
+
 def query_billing(start: str, end: str):
-    """Query billing records within a date range."""
-    try:
-        conn = get_db_connection()
+    """
+    Query billing records within a date range, recomputing dirty days first.
+    Errors propagate: an empty list here would be cached as the real billing.
+    """
+    ensure_billing_current(start, end)
+    with DB_POOL.connection() as conn:
         cur = conn.cursor()
-        sql = """
-        SELECT id, billing_date AS date,
-               breakfast_count AS breakfastCount,
-               lunch_count AS lunchCount,
-               dinner_count AS dinnerCount,
-               max_people_fed AS maxPeopleFed,
-               amount_per_person AS amountPerPerson,
-               gross_amount AS grossAmount,
-               fine_amount AS fineAmount,
-               net_amount AS netAmount
-        FROM billing
-        WHERE billing_date BETWEEN ? AND ?
-        ORDER BY billing_date ASC
-        """
-        cur.execute(sql, [start, end])
+        cur.execute(*billing_sql(start, end))
         rows = [dict(r) for r in cur.fetchall()]
-        conn.close()
-        return rows
-    except Exception as e:
-        print(f"Error querying billing: {e}")
-        return []
+    return rows
+
+
+def billing_busy_response(e):
+    """503 for a billing read whose dirty days could not be recomputed within the writer timeout."""
+    LOG.warning("Billing refresh did not finish: %s", e)
+    return jsonify({'error': 'Billing is being recalculated, retry shortly'}), 503, {'Retry-After': '1'}
 
 @APP.route('/api/billing')
+@conditional_get('food_counts', 'fines')
+@cached_json('food_counts', 'fines')
 def api_billing():
     """Get billing records by date range."""
     start = request.args.get('start')
     end = request.args.get('end')
     if not start or not end:
         return jsonify({'error': 'start and end query params required (YYYY-MM-DD)'}), 400
-    rows = query_billing(start, end)
-    return jsonify(rows)
+    try:
+        rows = query_billing(start, end)
+    except WriteTimeout as e:
+        return billing_busy_response(e)
+    except Exception as e:
+        LOG.exception("Error querying billing: %s", e)
+        return jsonify({'error': str(e)}), 500
+    return listing_json(rows)
+
+BILLING_CSV_COLUMNS = ['date', 'breakfastCount', 'lunchCount', 'dinnerCount',
+                       'maxPeopleFed', 'amountPerPerson', 'grossAmount', 'fineAmount', 'netAmount']
+
 
 @APP.route('/api/billing/csv')
+@conditional_get('food_counts', 'fines')
 def api_billing_csv():
     """Download billing records as CSV."""
     start = request.args.get('start')
     end = request.args.get('end')
     if not start or not end:
         return jsonify({'error': 'start and end query params required (YYYY-MM-DD)'}), 400
-    rows = query_billing(start, end)
-
-    si = io.StringIO()
-    writer = csv.writer(si)
-    writer.writerow([
-        'date', 'breakfastCount', 'lunchCount', 'dinnerCount',
-        'maxPeopleFed', 'amountPerPerson', 'grossAmount', 'fineAmount', 'netAmount'
-    ])
-    for r in rows:
-        writer.writerow([
-            r.get('date', ''), r.get('breakfastCount', ''), r.get('lunchCount', ''),
-            r.get('dinnerCount', ''), r.get('maxPeopleFed', ''), r.get('amountPerPerson', ''),
-            r.get('grossAmount', ''), r.get('fineAmount', ''), r.get('netAmount', '')
-        ])
-    output = make_response(si.getvalue())
+    try:
+        ensure_billing_current(start, end)
+    except WriteTimeout as e:
+        return billing_busy_response(e)
+    sql, params = billing_sql(start, end)
+    return csv_response(sql, params, BILLING_CSV_COLUMNS, f'billing_{start}_to_{end}.csv')
+
+# ============================================================================
+# BACKGROUND EXPORTS
+# ============================================================================
+
+# type -> what the job exports; the same SQL, columns and file names as the /csv endpoints
+EXPORT_TYPES = {
+    'feedback': {
+        'tables': ('student_feedback', 'students'),
+        'options': (),
+        'sql': lambda p: feedback_sql(p['start'], p['end']),
+        'columns': FEEDBACK_CSV_COLUMNS,
+        'filename': 'feedback_{start}_to_{end}.csv',
+    },
+    'food-counts': {
+        'tables': ('food_counts',),
+        'options': ('meal',),
+        'sql': lambda p: food_counts_sql(p['start'], p['end'], p.get('meal')),
+        'columns': FOOD_COUNTS_CSV_COLUMNS,
+        'filename': 'food_counts_{start}_to_{end}.csv',
+    },
+    'fines': {
+        'tables': ('fines', 'vendor_responses'),
+        'options': ('response_status',),
+        'sql': lambda p: fines_sql(p['start'], p['end'], p.get('response_status', 'all')),
+        'columns': FINES_CSV_COLUMNS,
+        'filename': 'fines_{start}_to_{end}.csv',
+    },
+    'billing': {
+        'tables': ('food_counts', 'fines'),
+        'options': (),
+        'prepare': lambda p: ensure_billing_current(p['start'], p['end']),
+        'sql': lambda p: billing_sql(p['start'], p['end']),
+        'columns': BILLING_CSV_COLUMNS,
+        'filename': 'billing_{start}_to_{end}.csv',
+    },
+}
+EXPORT_ID = re.compile(r'[0-9a-f]{20}')
+
+
+class ExportQueue:
+    """
+    Runs CSV exports on a small thread pool, spooling each one to EXPORT_DIR as
+    <id>.csv.gz with its state in <id>.json, so any worker process can report progress
+    and serve the file. The id hashes the export's parameters and the change versions of
+    its tables: identical requests share one job while the data is unchanged, and a
+    request after a write gets a fresh export. Finished files expire after `ttl` seconds.
+    A heartbeat thread refreshes updatedAt of this process's unfinished jobs; one left
+    without updates for EXPORT_STALE_AFTER seconds (its process died) can be claimed again.
+    """
+
+    def __init__(self, spool_dir=EXPORT_DIR, workers=EXPORT_WORKERS, ttl=EXPORT_TTL):
+        self.spool_dir = Path(spool_dir)
+        self.workers = workers
+        self.ttl = ttl
+        self._executor = None
+        self._heartbeat = None
+        self._stopping = threading.Event()
+        self._active = {}  # id -> job, for jobs queued or running in this process
+        self._lock = threading.RLock()
+        self._last_sweep = 0.0
+        self._stats = {'submitted': 0, 'deduplicated': 0, 'completed': 0, 'failed': 0, 'expired': 0}
+
+    def _status_path(self, job_id):
+        return self.spool_dir / f'{job_id}.json'
+
+    def file_path(self, job_id):
+        return self.spool_dir / f'{job_id}.csv.gz'
+
+    def status(self, job_id):
+        """The job's state as last written, or None if there is no such job."""
+        try:
+            return json.loads(self._status_path(job_id).read_text())
+        except (FileNotFoundError, ValueError):
+            return None
+
+    def _write_status(self, job):
+        # Written aside and renamed into place, so readers never see a partial file; the
+        # lock keeps the heartbeat and the job's own thread from interleaving
+        with self._lock:
+            tmp = self.spool_dir / f"{job['id']}.json.{os.getpid()}.{threading.get_ident()}"
+            job['updatedAt'] = time.time()
+            tmp.write_text(json.dumps(job))
+            os.replace(tmp, self._status_path(job['id']))
+
+    def _beat(self):
+        while not self._stopping.wait(EXPORT_HEARTBEAT):
+            with self._lock:
+                jobs = list(self._active.values())
+            for job in jobs:
+                try:
+                    self._write_status(job)
+                except OSError as e:
+                    LOG.warning("Export %s heartbeat failed: %s", job['id'], e)
+
+    def _claim(self, job):
+        """Create the job's state file unless another process already has (link() fails if it exists)."""
+        tmp = self.spool_dir / f"{job['id']}.json.{os.getpid()}.{threading.get_ident()}"
+        tmp.write_text(json.dumps(job))
+        try:
+            os.link(tmp, self._status_path(job['id']))
+            return True
+        except FileExistsError:
+            return False
+        finally:
+            tmp.unlink()
+
+    def _remove(self, job_id):
+        for path in (self._status_path(job_id), self.file_path(job_id),
+                     *self.spool_dir.glob(f'{job_id}.csv.gz.*.part')):
+            try:
+                path.unlink()
+            except FileNotFoundError:
+                pass
+
+    def _abandoned(self, job):
+        """Whether a queued/running job has stopped getting heartbeats."""
+        with self._lock:
+            if job['id'] in self._active:
+                return False
+        return time.time() - job['updatedAt'] > EXPORT_STALE_AFTER
+
+    def _reusable(self, job):
+        if job['status'] == 'done':
+            return job['expiresAt'] > time.time() and self.file_path(job['id']).exists()
+        return job['status'] in ('queued', 'running') and not self._abandoned(job)
+
+    def submit(self, kind, params, versions):
+        """
+        Queue an export of `kind` with `params`, or return the job already covering it.
+        Returns (job, created).
+        """
+        self.spool_dir.mkdir(parents=True, exist_ok=True)
+        self.sweep()
+        key = json.dumps([kind, params, versions], sort_keys=True)
+        job_id = hashlib.sha256(key.encode('utf-8')).hexdigest()[:20]
+        with self._lock:
+            existing = self.status(job_id)
+            if existing is not None and self._reusable(existing):
+                self._stats['deduplicated'] += 1
+                return existing, False
+            if existing is not None:
+                self._remove(job_id)  # failed, expired or orphaned: run it again
+            now = time.time()
+            job = {
+                'id': job_id, 'type': kind, 'params': params,
+                'filename': EXPORT_TYPES[kind]['filename'].format(**params),
+                'status': 'queued', 'rows': 0, 'bytes': None, 'error': None,
+                'createdAt': now, 'updatedAt': now, 'finishedAt': None, 'expiresAt': None,
+            }
+            if not self._claim(job):
+                # Another worker process queued the same export first
+                self._stats['deduplicated'] += 1
+                return self.status(job_id) or job, False
+            self._active[job_id] = job
+            self._stats['submitted'] += 1
+            if self._executor is None:
+                self._executor = ThreadPoolExecutor(max_workers=self.workers, thread_name_prefix='export')
+                self._stopping.clear()
+                self._heartbeat = threading.Thread(target=self._beat, name='export-heartbeat', daemon=True)
+                self._heartbeat.start()
+            self._executor.submit(self._run, job)
+        return job, True
+
+    def _run(self, job):
+        spec = EXPORT_TYPES[job['type']]
+        path = self.file_path(job['id'])
+        # Per-run name: a reclaimed job's stalled first run can't write into the new one's file
+        part = path.with_name(f'{path.name}.{os.getpid()}.{threading.get_ident()}.part')
+        try:
+            if 'prepare' in spec:
+                spec['prepare'](job['params'])
+            sql, params = spec['sql'](job['params'])
+            job['status'] = 'running'
+            self._write_status(job)
+            reported = time.monotonic()
+            with gzip.open(part, 'wb', compresslevel=CSV_GZIP_LEVEL) as out:
+                for data, rows in csv_chunks(sql, params, spec['columns']):
+                    out.write(data)
+                    job['rows'] += rows
+                    if time.monotonic() - reported >= EXPORT_PROGRESS_INTERVAL:
+                        self._write_status(job)
+                        reported = time.monotonic()
+            os.replace(part, path)
+            job.update(status='done', bytes=path.stat().st_size)
+            outcome = 'completed'
+        except Exception as e:
+            LOG.exception("Export %s (%s) failed: %s", job['id'], job['type'], e)
+            try:
+                part.unlink()
+            except FileNotFoundError:
+                pass
+            job.update(status='failed', error=str(e))
+            outcome = 'failed'
+        job['finishedAt'] = time.time()
+        job['expiresAt'] = job['finishedAt'] + self.ttl
+        self._write_status(job)
+        with self._lock:
+            self._active.pop(job['id'], None)
+            self._stats[outcome] += 1
+        LOG.info("Export %s %s", job['id'], job['status'],
+                 extra={'fields': {'type': job['type'], 'rows': job['rows'], 'bytes': job['bytes'],
+                                   'duration_ms': round((job['finishedAt'] - job['createdAt']) * 1000, 1)}})
+
+    def sweep(self, force=False):
+        """Delete expired exports and those left queued or running by a process that has died."""
+        with self._lock:
+            if not force and time.monotonic() - self._last_sweep < EXPORT_SWEEP_INTERVAL:
+                return 0
+            self._last_sweep = time.monotonic()
+        removed = 0
+        now = time.time()
+        for status_path in self.spool_dir.glob('*.json'):
+            job = self.status(status_path.stem)
+            if job is None:
+                continue
+            finished = job['status'] in ('done', 'failed')
+            if (finished and job['expiresAt'] <= now) or (not finished and self._abandoned(job)):
+                self._remove(job['id'])
+                removed += 1
+        with self._lock:
+            self._stats['expired'] += removed
+        return removed
+
+    def describe(self, job):
+        """
+        The public view of a job: its state plus progress and URL. The total row count isn't
+        known up front (counting would scan the range twice), so a running job reports the
+        rows written so far and progress stays null until it is done.
+        """
+        view = dict(job)
+        for key in ('createdAt', 'updatedAt', 'finishedAt', 'expiresAt'):
+            if view[key] is not None:
+                view[key] = datetime.fromtimestamp(view[key], timezone.utc).isoformat(timespec='seconds')
+        view['progress'] = 1.0 if job['status'] == 'done' else None
+        view['url'] = f"/api/exports/{job['id']}"
+        return view
+
+    def stop(self):
+        """Stop taking jobs; queued ones are dropped and reclaimable once their heartbeat goes stale."""
+        with self._lock:
+            executor, self._executor = self._executor, None
+            self._active.clear()
+        self._stopping.set()
+        if executor is not None:
+            executor.shutdown(wait=False, cancel_futures=True)
+
+    def stats(self):
+        """Counters plus the spooled jobs by status."""
+        with self._lock:
+            stats = dict(self._stats)
+            stats['active'] = len(self._active)
+        jobs, spooled = {}, 0
+        for status_path in self.spool_dir.glob('*.json'):
+            job = self.status(status_path.stem)
+            if job is not None:
+                jobs[job['status']] = jobs.get(job['status'], 0) + 1
+                spooled += job['bytes'] or 0
+        stats.update({'spool_dir': str(self.spool_dir), 'ttl': self.ttl, 'jobs': jobs, 'spooled_bytes': spooled})
+        return stats
+
+
+EXPORTS = ExportQueue()
+
+
+@APP.route('/api/exports', methods=['POST'])
+def create_export():
+    """
+    Queue a CSV export for a large range instead of streaming it on the request thread:
+    {"type": "feedback|food-counts|fines|billing", "start": ..., "end": ...}, plus "meal"
+    for food-counts and "response_status" for fines. Returns the job (202 while pending,
+    200 if an identical export is already finished); poll its url for progress and the file.
+    """
+    data = request.get_json(silent=True)
+    if not isinstance(data, dict):
+        return jsonify({'error': 'expected a JSON object'}), 400
+    kind = data.get('type')
+    spec = EXPORT_TYPES.get(kind) if isinstance(kind, str) else None
+    if spec is None:
+        return jsonify({'error': f"type must be one of: {', '.join(EXPORT_TYPES)}"}), 400
+    start, end = data.get('start'), data.get('end')
+    if not isinstance(start, str) or not isinstance(end, str) or not start or not end:
+        return jsonify({'error': 'start and end required (YYYY-MM-DD)'}), 400
+    params = {'start': start, 'end': end}
+    for option in spec['options']:
+        if data.get(option):
+            params[option] = data[option]
+    if params.get('meal') not in (None,) + MEALS:
+        return jsonify({'error': f"meal must be one of: {', '.join(MEALS)}"}), 400
+    if params.get('response_status') not in (None, 'all', 'submitted', 'not_submitted'):
+        return jsonify({'error': 'response_status must be one of: all, submitted, not_submitted'}), 400
+
+    try:
+        job, _ = EXPORTS.submit(kind, params, current_versions(spec['tables']))
+    except Exception as e:
+        LOG.exception("Error queueing export: %s", e)
+        return jsonify({'error': str(e)}), 500
+    view = EXPORTS.describe(job)
+    response = jsonify(view)
+    response.status_code = 200 if job['status'] == 'done' else 202
+    response.headers['Location'] = view['url']
+    return response
+
+
+@APP.route('/api/exports/<job_id>')
+def get_export(job_id):
+    """
+    Export progress as JSON (202 while queued or running), or the finished CSV.
+    ?status=1 returns the JSON for a finished export too.
+    """
+    EXPORTS.sweep()
+    job = EXPORTS.status(job_id) if EXPORT_ID.fullmatch(job_id) else None
+    if job is None or (job['expiresAt'] is not None and job['expiresAt'] <= time.time()):
+        return jsonify({'error': 'export not found or expired'}), 404
+    view = EXPORTS.describe(job)
+    if job['status'] in ('queued', 'running'):
+        return jsonify(view), 202
+    if job['status'] == 'failed':
+        return jsonify(view), 500
+    if request.args.get('status'):
+        return jsonify(view)
+
+    try:
+        spooled = open(EXPORTS.file_path(job_id), 'rb')
+    except FileNotFoundError:
+        return jsonify({'error': 'export not found or expired'}), 404
+    if request.accept_encodings['gzip'] > 0:
+        # The spooled file is already gzip: send it as it is
+        output = send_file(spooled, mimetype='text/csv', etag=job_id, conditional=True,
+                           last_modified=job['finishedAt'])
+        output.headers['Content-Encoding'] = 'gzip'
+    else:
+        def generate():
+            with spooled, gzip.open(spooled, 'rb') as data:
+                while True:
+                    chunk = data.read(CSV_FETCH_SIZE * 128)
+                    if not chunk:
+                        break
+                    yield chunk
+        output = APP.response_class(generate(), mimetype='text/csv')
     output.headers['Content-Type'] = 'text/csv; charset=utf-8'
-    output.headers['Content-Disposition'] = f'attachment; filename=billing_{start}_to_{end}.csv'
+    output.headers['Content-Disposition'] = f"attachment; filename={job['filename']}"
+    output.headers['Vary'] = 'Accept-Encoding'
     return output
 
+# ============================================================================
+# COLUMNAR SNAPSHOT (OPTIONAL)
+# ============================================================================
+
+NULL_INT = -(2 ** 63)                       # NULL marker in 'int' columns
+RATING_NULL = 255                           # NULL marker in 'rating' columns
+RATING_DECODE = tuple(range(RATING_NULL)) + (None,)
+
+# Listings the snapshot can serve. `columns` maps output name -> (SQL expression, kind):
+#   day    - ISO date held as a day number (date.toordinal), the sorted range key
+#   int    - signed 64-bit integer
+#   rating - 0..254 in one byte
+#   str    - dictionary-encoded value
+# Rows are kept sorted by day, then `day_order`; `newest_first` listings return days
+# in descending order, as the SQL endpoints do.
+SNAPSHOT_LISTINGS = {
+    'feedback': {
+        'tables': ('student_feedback', 'students'),
+        'from': "student_feedback sf LEFT JOIN students s ON s.id = sf.student_id",
+        'day_column': 'sf.feedback_date',
+        'day_order': "COALESCE(s.roll_no, ''), sf.id",
+        'newest_first': True,
+        'columns': {name: (FEEDBACK_COLUMNS[name], kind) for name, kind in (
+            ('id', 'int'), ('studentName', 'str'), ('rollNumber', 'str'), ('date', 'day'),
+            ('breakfastRating', 'rating'), ('lunchRating', 'rating'), ('dinnerRating', 'rating'),
+            ('comments', 'str'),
+        )},
+    },
+    'food_counts': {
+        'tables': ('food_counts',),
+        'from': "food_counts",
+        'day_column': 'count_date',
+        'day_order': 'meal',
+        'newest_first': False,
+        'columns': {
+            'id': ('id', 'int'),
+            'date': ('count_date', 'day'),
+            'mealType': ('meal', 'str'),
+            'studentCount': ('student_count', 'int'),
+            'facultyCount': ('faculty_count', 'int'),
+            'guestCount': ('guest_count', 'int'),
+            'totalCount': ('total_count', 'int'),
+        },
+    },
+    'fines': {
+        'tables': ('fines', 'vendor_responses'),
+        'from': "fines f LEFT JOIN vendor_responses vr ON f.id = vr.fine_id",
+        'day_column': 'f.fine_date',
+        'day_order': 'f.id DESC',
+        'newest_first': True,
+        'columns': {name: (FINES_COLUMNS[name], kind) for name, kind in (
+            ('id', 'int'), ('date', 'day'), ('meal', 'str'), ('reason', 'str'), ('amount', 'int'),
+            ('imposedBy', 'str'), ('vendorResponse', 'str'), ('responseStatus', 'str'),
+        )},
+    },
+}
+
+
+ISO_DATE = re.compile(r'\d{4}-\d{2}-\d{2}', re.ASCII)
+
+
+def day_number(value):
+    """
+    Day number of a YYYY-MM-DD string. Raises ValueError/TypeError for anything else,
+    including the other forms date.fromisoformat() accepts (20260105, 2026-W02-1), which
+    the SQL path would compare as different strings.
+    """
+    if not ISO_DATE.fullmatch(value):
+        raise ValueError(f'not a YYYY-MM-DD date: {value!r}')
+    return date.fromisoformat(value).toordinal()
+
+
+def read_versions(conn, tables):
+    """Tuple of table_versions counters for `tables`, read on `conn` (a connection or cursor)."""
+    placeholders = ','.join('?' * len(tables))
+    rows = conn.execute(
+        f"SELECT table_name, version FROM table_versions WHERE table_name IN ({placeholders})",
+        list(tables)).fetchall()
+    found = {row[0]: row[1] for row in rows}
+    return tuple(found.get(table, 0) for table in tables)
+
+
+class ColumnarListing:
+    """One listing held as typed arrays, one per column, sorted by day."""
+
+    TYPECODES = {'day': 'i', 'int': 'q', 'rating': 'B', 'str': 'I'}
+
+    def __init__(self, spec):
+        self.spec = spec
+        self.names = list(spec['columns'])
+        self.kinds = [kind for _, kind in spec['columns'].values()]
+        self.day_index = self.kinds.index('day')
+        self.versions = None
+        self.columns = [array(self.TYPECODES[kind]) for kind in self.kinds]
+        self.values = [None]        # dictionary for 'str' columns; code 0 is NULL
+        self.codes = {None: 0}
+        self.day_strings = {}       # day number -> the ISO string it came from
+        self.nullable = set()       # 'int' columns that hold NULL_INT
+
+    def select_sql(self, where=''):
+        columns = ', '.join(f"{expr} AS {name}" for name, (expr, _) in self.spec['columns'].items())
+        return (f"SELECT {columns} FROM {self.spec['from']} {where} "
+                f"ORDER BY {self.spec['day_column']}, {self.spec['day_order']}")
+
+    def encode(self, rows):
+        """
+        Column arrays for `rows` (in select_sql order). Raises ValueError/TypeError/
+        OverflowError on values the column kinds cannot hold.
+        """
+        columns = [array(self.TYPECODES[kind]) for kind in self.kinds]
+        for row in rows:
+            for i, kind in enumerate(self.kinds):
+                value = row[i]
+                if kind == 'str':
+                    code = self.codes.get(value)
+                    if code is None:
+                        code = self.codes[value] = len(self.values)
+                        self.values.append(value)
+                    columns[i].append(code)
+                elif kind == 'day':
+                    day = day_number(value)
+                    self.day_strings[day] = value
+                    columns[i].append(day)
+                elif kind == 'rating':
+                    if value is not None and not 0 <= value < RATING_NULL:
+                        raise ValueError(f"rating out of range: {value!r}")
+                    columns[i].append(RATING_NULL if value is None else value)
+                elif value is None:
+                    self.nullable.add(i)
+                    columns[i].append(NULL_INT)
+                else:
+                    columns[i].append(value)
+        return columns
+
+    def load(self, rows, versions):
+        self.columns = self.encode(rows)
+        self.versions = versions
+
+    def replace_days(self, days, rows, versions):
+        """Swap in the current rows of `days` (fetched in select_sql order)."""
+        fresh = self.encode(rows)
+        current_days, fresh_days = self.columns[self.day_index], fresh[self.day_index]
+        for day in sorted(set(days)):
+            lo, hi = bisect_left(current_days, day), bisect_right(current_days, day)
+            new_lo, new_hi = bisect_left(fresh_days, day), bisect_right(fresh_days, day)
+            for column, new in zip(self.columns, fresh):
+                column[lo:hi] = new[new_lo:new_hi]
+        self.versions = versions
+
+    def decoder(self, index):
+        kind = self.kinds[index]
+        if kind == 'str':
+            return self.values.__getitem__
+        if kind == 'day':
+            return self.day_strings.__getitem__
+        if kind == 'rating':
+            return RATING_DECODE.__getitem__
+        if index in self.nullable:
+            return lambda value: None if value == NULL_INT else value
+        return None
+
+    def column(self, name, spans):
+        """Decoded values of column `name` over the (lo, hi) position spans, in order."""
+        index = self.names.index(name)
+        column, decoder = self.columns[index], self.decoder(index)
+        if len(spans) == 1:
+            raw = column[spans[0][0]:spans[0][1]]
+        else:
+            raw = []
+            for lo, hi in spans:
+                raw += column[lo:hi]
+        return list(map(decoder, raw) if decoder else raw)
+
+    def select(self, start_day, end_day, fields=None, keep=None):
+        """
+        Rows between two day numbers as dicts of `fields`. The range is two binary
+        searches over the day column; `keep` is an optional (column, predicate) filter.
+        """
+        days = self.columns[self.day_index]
+        lo, hi = bisect_left(days, start_day), bisect_right(days, end_day)
+        spans = [(lo, hi)]
+        if self.spec['newest_first']:
+            # Whole days in reverse, each keeping its own row order
+            spans = []
+            while hi > lo:
+                block_start = bisect_left(days, days[hi - 1], lo, hi)
+                spans.append((block_start, hi))
+                hi = block_start
+
+        fields = fields or self.names
+        columns = [self.column(name, spans) for name in fields]
+        if keep:
+            mask = list(map(keep[1], self.column(keep[0], spans)))
+            columns = [list(compress(values, mask)) for values in columns]
+        return [dict(zip(fields, row)) for row in zip(*columns)]
+
+    def footprint(self):
+        """Approximate bytes held: column buffers plus the string dictionary."""
+        size = sum(column.itemsize * len(column) for column in self.columns)
+        size += sys.getsizeof(self.values) + sum(sys.getsizeof(v) for v in self.values)
+        size += sys.getsizeof(self.codes) + sys.getsizeof(self.day_strings)
+        return size
+
+
+class SnapshotEngine:
+    """
+    Serves the listing queries from ColumnarListing snapshots instead of SQLite.
+    A listing is loaded on first use. Writes made through write_through() are applied
+    as per-day deltas. Any other change to its tables (another process, a script)
+    shows up in table_versions and triggers a full reload on the next read.
+    """
+
+    def __init__(self):
+        self._listings = {}
+        self._unsupported = set()
+        self._db = None
+        self._lock = threading.RLock()
+        self._stats = {'reads': 0, 'loads': 0, 'deltas': 0, 'stale': 0, 'fallbacks': 0}
+
+    def _current_versions(self, tables):
+        if has_request_context():
+            versions = current_versions(tables)
+            return tuple(versions[table][0] for table in tables)
+        with DB_POOL.connection() as conn:
+            return read_versions(conn, tables)
+
+    def _listing(self, name):
+        """The up-to-date listing, loading it if needed; None if it cannot be snapshotted. Call with the lock held."""
+        if self._db != str(DB_PATH):
+            self._listings.clear()
+            self._unsupported.clear()
+            self._db = str(DB_PATH)
+        if name in self._unsupported:
+            return None
+        listing = self._listings.get(name)
+        if listing is not None and listing.versions is not None:
+            current = self._current_versions(listing.spec['tables'])
+            if all(c <= v for c, v in zip(current, listing.versions)):
+                return listing
+
+        listing = ColumnarListing(SNAPSHOT_LISTINGS[name])
+        with DB_POOL.connection() as conn:
+            # One read transaction so the rows match the versions recorded with them
+            conn.execute("BEGIN")
+            try:
+                versions = read_versions(conn, listing.spec['tables'])
+                rows = conn.execute(listing.select_sql()).fetchall()
+            finally:
+                conn.commit()
+        try:
+            listing.load(rows, versions)
+        except (ValueError, TypeError, OverflowError) as e:
+            LOG.warning("Snapshot: %s cannot be held in columns (%s); serving it from SQLite", name, e)
+            self._unsupported.add(name)
+            return None
+        self._listings[name] = listing
+        self._stats['loads'] += 1
+        return listing
+
+    def query(self, name, start, end, fields=None, keep=None):
+        """Rows of listing `name` between two ISO dates, or None to fall back to SQLite."""
+        try:
+            start_day, end_day = day_number(start), day_number(end)
+        except (ValueError, TypeError):
+            start_day = None
+        with self._lock:
+            listing = self._listing(name) if start_day is not None else None
+            if listing is None:
+                self._stats['fallbacks'] += 1
+                return None
+            self._stats['reads'] += 1
+            return listing.select(start_day, end_day, fields, keep)
+
+    def capture(self, op, listings, dates):
+        """
+        Wrap writer operation `op` so that, inside its transaction, it also fetches the
+        rows of the affected days for `listings`. `dates` is a list of ISO dates, or None
+        when the operation returns the date it changed.
+        """
+        def run(cur, *args):
+            before = {name: read_versions(cur, SNAPSHOT_LISTINGS[name]['tables']) for name in listings}
+            result = op(cur, *args)
+            days = sorted({d for d in (dates if dates is not None else [result]) if d is not None})
+            deltas = []
+            for name in listings:
+                listing = ColumnarListing(SNAPSHOT_LISTINGS[name])
+                rows = []
+                for chunk in chunked(days):
+                    placeholders = ','.join('?' * len(chunk))
+                    where = f"WHERE {listing.spec['day_column']} IN ({placeholders})"
+                    rows += cur.execute(listing.select_sql(where), chunk).fetchall()
+                after = read_versions(cur, listing.spec['tables'])
+                deltas.append((name, before[name], after, days, rows))
+            return result, deltas
+        return run
+
+    def apply(self, deltas):
+        """Apply captured deltas; a listing that missed an intermediate change is reloaded later."""
+        with self._lock:
+            for name, before, after, days, rows in deltas:
+                listing = self._listings.get(name)
+                if listing is None or self._db != str(DB_PATH):
+                    continue
+                if listing.versions != before:
+                    listing.versions = None
+                    self._stats['stale'] += 1
+                    continue
+                try:
+                    listing.replace_days([day_number(d) for d in days], rows, after)
+                    self._stats['deltas'] += 1
+                except (ValueError, TypeError, OverflowError):
+                    listing.versions = None
+                    self._stats['stale'] += 1
+
+    def loaded(self, listings):
+        with self._lock:
+            return [name for name in listings if name in self._listings]
+
+    def stats(self):
+        with self._lock:
+            stats = dict(self._stats)
+            stats['listings'] = {
+                name: {'rows': len(listing.columns[0]), 'bytes': listing.footprint(),
+                       'strings': len(listing.values) - 1}
+                for name, listing in self._listings.items()
+            }
+            stats['unsupported'] = sorted(self._unsupported)
+        return stats
+
+
+SNAPSHOT = SnapshotEngine() if SNAPSHOT_ENABLED else None
+
+
+def write_through(listings, dates, op, *args, on_commit=None):
+    """
+    DB_WRITER.submit(op, *args, on_commit=on_commit), also bringing the snapshot's `listings`
+    up to date for `dates` (None: the date `op` returns). Identical to a plain submit when the
+    snapshot is off.
+    """
+    loaded = SNAPSHOT.loaded(listings) if SNAPSHOT is not None else []
+    if not loaded:
+        return DB_WRITER.submit(op, *args, on_commit=on_commit)
+
+    def committed(captured):
+        result, deltas = captured
+        SNAPSHOT.apply(deltas)
+        if on_commit is not None:
+            on_commit(result)
+
+    return DB_WRITER.submit(SNAPSHOT.capture(op, loaded, dates), *args, on_commit=committed)[0]
+
+
+def write_timeout_response(e):
+    """
+    Response for a WriteTimeout: 503 (retry later) when the write was withdrawn unsaved,
+    202 when it is still being applied and a retry would save it twice.
+    """
+    if e.pending:
+        return jsonify({'status': 'pending', 'message': 'Accepted; still being saved. Do not resubmit.'}), 202
+    return jsonify({'error': str(e)}), 503, {'Retry-After': '1'}
+
 # ============================================================================
 # DEBUG ENDPOINTS
 # ============================================================================
@@ -657,19 +4107,55 @@ def api_billing_csv():
 def debug_food_counts():
     """Debug endpoint - get all food counts in database."""
     try:
-        conn = get_db_connection()
-        cur = conn.cursor()
-        cur.execute("SELECT * FROM food_counts ORDER BY count_date DESC LIMIT 20")
-        rows = [dict(r) for r in cur.fetchall()]
-        conn.close()
+        with DB_POOL.connection() as conn:
+            cur = conn.cursor()
+            cur.execute("SELECT * FROM food_counts ORDER BY count_date DESC LIMIT 20")
+            rows = [dict(r) for r in cur.fetchall()]
         
         total = len(rows)
-        print(f"Debug: Found {total} food count records")
+        LOG.debug("Debug: Found %d food count records", total)
         return jsonify({'total_records': total, 'data': rows})
     except Exception as e:
-        print(f"Debug error: {e}")
+        LOG.exception("Debug error: %s", e)
         return jsonify({'error': str(e)}), 500
 
+@APP.route('/api/debug/cache')
+def debug_cache():
+    """Debug endpoint - response cache counters."""
+    return jsonify(RESPONSE_CACHE.stats())
+
+@APP.route('/api/debug/student-ids')
+def debug_student_ids():
+    """Debug endpoint - roll number -> student id cache counters."""
+    return jsonify(STUDENT_IDS.stats())
+
+@APP.route('/api/debug/snapshot')
+def debug_snapshot():
+    """Debug endpoint - columnar snapshot sizes and counters."""
+    if SNAPSHOT is None:
+        return jsonify({'enabled': False})
+    return jsonify({'enabled': True, **SNAPSHOT.stats()})
+
+@APP.route('/api/debug/pool')
+def debug_pool():
+    """Debug endpoint - connection pool and write queue counters."""
+    return jsonify({'pool': DB_POOL.stats(), 'writer': DB_WRITER.stats()})
+
+@APP.route('/api/debug/static')
+def debug_static():
+    """Debug endpoint - in-memory static file cache counters."""
+    return jsonify({'brotli': brotli is not None, **STATIC_ASSETS.stats()})
+
+@APP.route('/api/debug/exports')
+def debug_exports():
+    """Debug endpoint - background export counters and spooled jobs."""
+    return jsonify(EXPORTS.stats())
+
+@APP.route('/api/debug/slow-queries')
+def debug_slow_queries():
+    """Debug endpoint - recent statements over MESS_SLOW_QUERY_MS, with their query plans."""
+    return jsonify({'threshold_ms': SLOW_QUERY_MS, 'queries': list(METRICS.slow_queries)[::-1]})
+
 # ============================================================================
 # HEALTH CHECK
 # ============================================================================
@@ -678,31 +4164,212 @@ def debug_food_counts():
 def health():
     """Health check endpoint."""
     try:
-        conn = get_db_connection()
-        cur = conn.cursor()
-        cur.execute("SELECT COUNT(*) FROM students")
-        count = cur.fetchone()[0]
-        conn.close()
+        with DB_POOL.connection() as conn:
+            cur = conn.cursor()
+            cur.execute("SELECT COUNT(*) FROM students")
+            count = cur.fetchone()[0]
 
         return jsonify({
             'status': 'OK',
             'database': 'Connected',
-            'students_count': count
+            'students_count': count,
+            'pool': DB_POOL.stats(),
+            'writer': DB_WRITER.stats(),
+            'cache': RESPONSE_CACHE.stats(),
+            'events': EVENT_BROKER.stats()
         })
     except Exception as e:
         return jsonify({'status': 'ERROR', 'message': str(e)}), 500
 
+@APP.route('/api/metrics')
+def api_metrics():
+    """Prometheus scrape endpoint: request latency, SQL statement timing, pool, cache and writer counters."""
+    return APP.response_class(render_metrics(), mimetype='text/plain; version=0.0.4')
+
 # ============================================================================
 # SERVE STATIC FILES
 # ============================================================================
 
+class StaticAsset:
+    """One file's bytes and its precompressed variants, identified by a content hash."""
+
+    __slots__ = ('digest', 'mimetype', 'last_modified', 'variants')
+
+    def __init__(self, data, mimetype, mtime):
+        self.digest = hashlib.sha256(data).hexdigest()[:20]
+        self.mimetype = mimetype
+        self.last_modified = datetime.fromtimestamp(int(mtime), tz=timezone.utc)
+        self.variants = {'identity': data}
+        if len(data) >= COMPRESS_MIN_SIZE and (mimetype.startswith('text/') or mimetype in STATIC_COMPRESSIBLE):
+            # deflate too, so compress_response never has to recompress a cached page
+            for encoding, compressed in (('gzip', gzip.compress(data, compresslevel=9, mtime=0)),
+                                         ('deflate', zlib.compress(data, 9))):
+                if len(compressed) < len(data):
+                    self.variants[encoding] = compressed
+            if brotli is not None:
+                compressed = brotli.compress(data, quality=11)
+                if len(compressed) < len(data):
+                    self.variants['br'] = compressed
+
+    def size(self):
+        return sum(len(body) for body in self.variants.values())
+
+
+class StaticAssetCache:
+    """
+    In-memory copies of the dashboard pages and other static files, compressed once
+    when loaded instead of on every request. Files are re-stat'ed at most every
+    STATIC_RECHECK seconds and reloaded when their mtime or size changes; paths whose
+    contents are identical share one StaticAsset, keyed by content hash.
+    """
+
+    def __init__(self, root, max_file_size=STATIC_CACHE_MAX_FILE, recheck=STATIC_RECHECK):
+        self.root = str(root)
+        self.max_file_size = max_file_size
+        self.recheck = recheck
+        self._paths = {}    # path -> (mtime_ns, size, checked_at, digest)
+        self._assets = {}   # digest -> StaticAsset
+        self._lock = threading.Lock()
+        self._stats = {'hits': 0, 'loads': 0, 'not_modified': 0, 'uncached': 0}
+
+    def get(self, path):
+        """
+        The StaticAsset for `path`, loading or reloading it if needed. None if the file
+        does not exist or is too large to hold (the caller serves it from disk).
+        """
+        now = time.monotonic()
+        with self._lock:
+            entry = self._paths.get(path)
+            if entry is not None and now - entry[2] < self.recheck:
+                self._stats['hits'] += 1
+                return self._assets[entry[3]]
+
+        filename = safe_join(self.root, path)
+        try:
+            st = os.stat(filename) if filename else None
+        except OSError:
+            st = None
+        if st is None or not stat.S_ISREG(st.st_mode) or st.st_size > self.max_file_size:
+            with self._lock:
+                self._forget(path)
+                self._stats['uncached'] += 1
+            return None
+
+        with self._lock:
+            entry = self._paths.get(path)
+            if entry is not None and entry[:2] == (st.st_mtime_ns, st.st_size):
+                self._paths[path] = (st.st_mtime_ns, st.st_size, now, entry[3])
+                self._stats['hits'] += 1
+                return self._assets[entry[3]]
+
+        # Compress outside the lock; a concurrent load of the same file is harmless
+        with open(filename, 'rb') as f:
+            data = f.read()
+        mimetype = mimetypes.guess_type(path)[0] or 'application/octet-stream'
+        asset = StaticAsset(data, mimetype, st.st_mtime)
+        with self._lock:
+            self._forget(path)
+            asset = self._assets.setdefault(asset.digest, asset)
+            self._paths[path] = (st.st_mtime_ns, st.st_size, now, asset.digest)
+            self._stats['loads'] += 1
+        return asset
+
+    def count_not_modified(self):
+        with self._lock:
+            self._stats['not_modified'] += 1
+
+    def _forget(self, path):
+        entry = self._paths.pop(path, None)
+        if entry is not None and all(other[3] != entry[3] for other in self._paths.values()):
+            self._assets.pop(entry[3], None)
+
+    def warm(self, patterns=STATIC_PRELOAD):
+        """Load (and compress) the files matching `patterns` up front, e.g. at startup."""
+        for pattern in patterns:
+            for filename in sorted(Path(self.root).glob(pattern)):
+                self.get(filename.relative_to(self.root).as_posix())
+
+    def stats(self):
+        with self._lock:
+            stats = dict(self._stats)
+            stats['files'] = len(self._paths)
+            stats['assets'] = len(self._assets)
+            stats['bytes'] = sum(asset.size() for asset in self._assets.values())
+        return stats
+
+
+STATIC_ASSETS = StaticAssetCache(APP.root_path)
+
+
 @APP.route('/', defaults={'path': 'index.html'})
 @APP.route('/<path:path>')
 def static_proxy(path):
-    return send_from_directory('.', path)
+    asset = STATIC_ASSETS.get(path)
+    if asset is None:
+        return send_from_directory('.', path)
+
+    offered = [e for e in ('br', 'gzip', 'deflate') if e in asset.variants]
+    encoding = request.accept_encodings.best_match(offered) or 'identity'
+    # A strong tag per representation, since the encodings differ byte for byte
+    etag = asset.digest if encoding == 'identity' else f"{asset.digest}-{encoding}"
+    cache_control = 'no-cache' if asset.mimetype == 'text/html' else f'public, max-age={STATIC_MAX_AGE}'
+
+    if request.if_none_match:
+        not_modified = request.if_none_match.contains_weak(etag)
+    elif request.if_modified_since:
+        not_modified = asset.last_modified <= request.if_modified_since
+    else:
+        not_modified = False
+    if not_modified:
+        STATIC_ASSETS.count_not_modified()
+        response = APP.response_class(status=304)
+    else:
+        response = APP.response_class(asset.variants[encoding], mimetype=asset.mimetype)
+        if encoding != 'identity':
+            response.headers['Content-Encoding'] = encoding
+    response.set_etag(etag)
+    response.last_modified = asset.last_modified
+    response.headers['Cache-Control'] = cache_control
+    response.vary.add('Accept-Encoding')
+    # Already in its final encoding (images and small files are deliberately left
+    # uncompressed): compress_response must not touch it or the ETag would lie
+    response.direct_passthrough = True
+    return response
+
+
+def rebuild_aggregates():
+    """Regenerate the rollup tables from raw data and verify them (python server.py --rebuild-aggregates)."""
+    with DB_POOL.connection() as conn:
+        conn.execute("BEGIN IMMEDIATE")
+        rebuild_feedback_daily_agg(conn)
+        rebuild_dish_daily_agg(conn)
+        conn.commit()
+        mismatches = verify_feedback_daily_agg(conn)
+        dish_mismatches = verify_dish_daily_agg(conn)
+    print(f"feedback_daily_agg rebuilt: {mismatches} mismatching rows")
+    print(f"dish_daily_agg rebuilt: {dish_mismatches} mismatching rows")
+    return mismatches == 0 and dish_mismatches == 0
 
 
 if __name__ == '__main__':
+    import argparse
+
+    parser = argparse.ArgumentParser(description='CMC Mess Management API Server')
+    parser.add_argument('--rebuild-aggregates', action='store_true',
+                        help='rebuild and verify the rollup tables, then exit')
+    parser.add_argument('--snapshot', action='store_true',
+                        help='serve listing reads from the columnar in-memory snapshot')
+    args = parser.parse_args()
+
+    if args.snapshot:
+        os.environ['MESS_SNAPSHOT'] = '1'  # inherited by the debug reloader's child process
+        SNAPSHOT = SNAPSHOT or SnapshotEngine()
+
+    if args.rebuild_aggregates:
+        ok = rebuild_aggregates()
+        DB_POOL.close_all()
+        raise SystemExit(0 if ok else 1)
+
     print("\n" + "="*60)
     print("🚀 Starting CMC Mess Management API Server")
     print("="*60)
@@ -710,9 +4377,13 @@ if __name__ == '__main__':
     print("\n✅ API Endpoints Available:")
     print("   - /api/feedback?start=YYYY-MM-DD&end=YYYY-MM-DD")
     print("   - /api/feedback/csv?start=YYYY-MM-DD&end=YYYY-MM-DD")
+    print("   - POST /api/feedback/batch (save many feedback submissions at once)")
+    print("   - POST /api/students/import (roster CSV: name, roll_no[, email])")
     print("   - /api/food-counts?start=YYYY-MM-DD&end=YYYY-MM-DD[&meal=breakfast|lunch|dinner]")
     print("   - /api/food-counts/csv?start=YYYY-MM-DD&end=YYYY-MM-DD[&meal=breakfast|lunch|dinner]")
     print("   - /api/food-quality?start=YYYY-MM-DD&end=YYYY-MM-DD[&meal=breakfast|lunch|dinner]")
+    print("   - /api/analytics/feedback?start=YYYY-MM-DD&end=YYYY-MM-DD[&granularity=daily,weekly,monthly][&meal=...]")
+    print("   - /api/analytics/items?start=YYYY-MM-DD&end=YYYY-MM-DD[&meal=...][&limit=N][&min_ratings=N] (top/bottom dishes)")
     print("   - /api/fines?start=YYYY-MM-DD&end=YYYY-MM-DD[&response_status=all|submitted|not_submitted]")
     print("   - /api/fines/csv?start=YYYY-MM-DD&end=YYYY-MM-DD[&response_status=all|submitted|not_submitted]")
     print("   - POST /api/fines (create fine)")
@@ -721,8 +4392,31 @@ if __name__ == '__main__':
     print("   - POST /api/vendor-responses (create/update vendor response)")
     print("   - /api/billing?start=YYYY-MM-DD&end=YYYY-MM-DD")
     print("   - /api/billing/csv?start=YYYY-MM-DD&end=YYYY-MM-DD")
+    print("   - POST /api/exports {type: feedback|food-counts|fines|billing, start, end} (background CSV export)")
+    print("   - /api/exports/<id> (export progress, then the CSV file)")
+    print("   - /api/search?q=TEXT[&source=all|feedback|vendor_responses][&start=...&end=...][&meal=...][&limit=N&offset=N]")
+    print("   - /api/stream[?topics=food_count,fine_imposed,fine_deleted,vendor_response] (live events)")
     print("   - /api/health")
+    print("   - /api/metrics (Prometheus text format)")
+    print("   (list endpoints accept ?format=compact for a columns + rows arrays response)")
+    print("   - /api/debug/pool (connection pool and write queue stats)")
+    print("   - /api/debug/cache (response cache stats)")
+    print("   - /api/debug/student-ids (roll number -> id cache stats)")
+    print(f"   - /api/debug/snapshot (columnar snapshot: {'on' if SNAPSHOT else 'off'})")
+    print("   - /api/debug/static (in-memory dashboard pages)")
+    print("   - /api/debug/exports (background export queue)")
+    print(f"   - /api/debug/slow-queries (MESS_SLOW_QUERY_MS: {SLOW_QUERY_MS or 'off'})")
     print("\n💾 Database: database/mess_management.db")
+    print(f"📝 Logs: JSON lines at {LOG_LEVEL} to {LOG_FILE or 'stderr'} (MESS_LOG_LEVEL, MESS_LOG_FILE)")
+    print("\n⚙️  Development server (debugger on). For production: python scripts/serve.py --workers 4")
     print("="*60 + "\n")
 
-    APP.run(host='0.0.0.0', port=8000, debug=True)
\ No newline at end of file
+    STATIC_ASSETS.warm()
+    STUDENT_IDS.warm()
+    try:
+        APP.run(host='0.0.0.0', port=8000, debug=True)
+    finally:
+        EVENT_BROKER.close()
+        EXPORTS.stop()
+        DB_WRITER.stop()
+        DB_POOL.close_all()
\ No newline at end of file
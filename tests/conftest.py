@@ -0,0 +1,28 @@
+"""Shared fixtures: every test runs the app against a throw-away copy of the sample database."""
+import shutil
+import sys
+from pathlib import Path
+
+import pytest
+
+ROOT = Path(__file__).resolve().parent.parent
+sys.path.insert(0, str(ROOT))
+
+import server  # noqa: E402
+
+
+def reset_state():
+    server.DB_WRITER.stop()
+    server.DB_POOL.close_all()
+    server.STUDENT_IDS.clear()
+    server.RESPONSE_CACHE.clear()
+
+
+@pytest.fixture
+def client(tmp_path):
+    db_path = tmp_path / 'mess.db'
+    shutil.copy(ROOT / 'scripts' / 'database' / 'mess_management.db', db_path)
+    reset_state()
+    server.DB_PATH = db_path
+    yield server.APP.test_client()
+    reset_state()
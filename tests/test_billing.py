@@ -0,0 +1,115 @@
+"""Billing kept current by dirty-day recomputation."""
+import threading
+
+import pytest
+
+import server
+
+RANGE = '?start=2026-01-01&end=2026-03-31'
+
+
+def food_count(date, meal, students, faculty=0, guests=0):
+    return {'date': date, 'meal': meal, 'student_count': students,
+            'faculty_count': faculty, 'guest_count': guests}
+
+
+def expected_billing():
+    """Billing as scripts/create_feedback_db.py:populate_billing computes it from scratch."""
+    with server.DB_POOL.connection() as conn:
+        counts = conn.execute("""
+            SELECT count_date,
+                   SUM(CASE WHEN meal = 'breakfast' THEN total_count ELSE 0 END),
+                   SUM(CASE WHEN meal = 'lunch' THEN total_count ELSE 0 END),
+                   SUM(CASE WHEN meal = 'dinner' THEN total_count ELSE 0 END)
+            FROM food_counts WHERE count_date BETWEEN '2026-01-01' AND '2026-03-31'
+            GROUP BY count_date ORDER BY count_date
+        """).fetchall()
+        fines = dict(conn.execute("SELECT fine_date, SUM(amount) FROM fines GROUP BY fine_date").fetchall())
+    expected = []
+    for day, breakfast, lunch, dinner in counts:
+        people = max(breakfast, lunch, dinner)
+        fine_amount = fines.get(day, 0)
+        expected.append({
+            'date': day, 'breakfastCount': breakfast, 'lunchCount': lunch, 'dinnerCount': dinner,
+            'maxPeopleFed': people, 'amountPerPerson': 150.0, 'grossAmount': people * 150.0,
+            'fineAmount': fine_amount, 'netAmount': people * 150.0 - fine_amount,
+        })
+    return expected
+
+
+def billed(client):
+    response = client.get('/api/billing' + RANGE)
+    assert response.status_code == 200
+    return [{key: value for key, value in row.items() if key != 'id'} for row in response.get_json()]
+
+
+def fine_ids(reason):
+    with server.DB_POOL.connection() as conn:
+        return [row[0] for row in conn.execute("SELECT id FROM fines WHERE reason = ?", [reason])]
+
+
+@pytest.mark.parametrize('change', [
+    'recount an existing day', 'fine a billed day', 'delete a fine', 'count a new day', 'fine an unbilled day',
+])
+def test_billing_matches_a_full_recompute_after_writes(client, change):
+    assert billed(client) == expected_billing()
+    if change == 'recount an existing day':
+        response = client.post('/api/food-counts', json=food_count('2026-01-15', 'dinner', 900, 20, 5))
+    elif change == 'fine a billed day':
+        response = client.post('/api/fines', json={'date': '2026-01-15', 'meal': 'lunch', 'reason': 'test-fine',
+                                                    'amount': 750, 'imposedBy': 'Warden'})
+    elif change == 'delete a fine':
+        with server.DB_POOL.connection() as conn:
+            fine_id = conn.execute("SELECT id FROM fines WHERE fine_date = '2026-01-19' LIMIT 1").fetchone()[0]
+        response = client.delete(f'/api/fines/{fine_id}')
+    elif change == 'count a new day':
+        response = client.post('/api/food-counts', json=food_count('2026-03-02', 'breakfast', 77, 3))
+    else:
+        response = client.post('/api/fines', json={'date': '2026-03-20', 'meal': 'dinner', 'reason': 'test-fine',
+                                                    'amount': 400, 'imposedBy': 'Warden'})
+    assert response.status_code in (200, 201)
+    assert billed(client) == expected_billing()
+
+
+def test_billing_follows_a_sequence_of_writes(client):
+    client.post('/api/food-counts', json=food_count('2026-03-03', 'lunch', 60))
+    client.post('/api/fines', json={'date': '2026-03-03', 'meal': 'lunch', 'reason': 'test-fine',
+                                    'amount': 1000, 'imposedBy': 'Warden'})
+    client.post('/api/food-counts', json=food_count('2026-03-03', 'dinner', 90, 10))
+    assert billed(client) == expected_billing()
+    for fine_id in fine_ids('test-fine'):
+        assert client.delete(f'/api/fines/{fine_id}').status_code == 200
+    assert billed(client) == expected_billing()
+    assert [row['netAmount'] for row in billed(client) if row['date'] == '2026-03-03'] == [100 * 150.0]
+
+
+def test_busy_writer_is_a_retryable_error_not_an_empty_cached_bill(client, monkeypatch):
+    assert client.post('/api/food-counts', json=food_count('2026-02-10', 'lunch', 40)).status_code == 200
+    monkeypatch.setattr(server.DB_WRITER, 'timeout', 0.2)
+    started, release = threading.Event(), threading.Event()
+
+    def hold(cur):
+        started.set()
+        release.wait(5)
+
+    def submit_hold():
+        try:
+            server.DB_WRITER.submit(hold)
+        except server.WriteTimeout:
+            pass  # it still commits once released
+
+    holder = threading.Thread(target=submit_hold)
+    holder.start()
+    try:
+        assert started.wait(5)
+        busy = client.get('/api/billing?start=2026-02-01&end=2026-02-28')
+    finally:
+        release.set()
+        holder.join(5)
+
+    assert busy.status_code == 503
+    assert busy.headers['Retry-After'] == '1'
+    monkeypatch.setattr(server.DB_WRITER, 'timeout', 5)
+    response = client.get('/api/billing?start=2026-02-01&end=2026-02-28')
+    assert response.status_code == 200
+    assert [row['lunchCount'] for row in response.get_json() if row['date'] == '2026-02-10'] == [40]
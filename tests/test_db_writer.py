@@ -0,0 +1,108 @@
+"""DatabaseWriter timeouts: withdrawn writes never run, started ones finish and are reported as pending."""
+import sqlite3
+import threading
+from concurrent.futures import Future
+
+import pytest
+
+import server
+
+
+@pytest.fixture(autouse=True)
+def short_timeout(client, monkeypatch):
+    monkeypatch.setattr(server.DB_WRITER, 'timeout', 0.2)
+
+
+def fine(reason):
+    return {'date': '2026-03-01', 'meal': 'lunch', 'reason': reason, 'amount': 100, 'imposedBy': 'Warden'}
+
+
+def count_fines(reason):
+    with server.DB_POOL.connection() as conn:
+        return conn.execute("SELECT COUNT(*) FROM fines WHERE reason = ?", [reason]).fetchone()[0]
+
+
+def test_write_queued_past_the_timeout_is_withdrawn(client):
+    started, release = threading.Event(), threading.Event()
+    committed, errors = [], []
+    cancelled = server.DB_WRITER.stats()['cancelled']
+
+    def hold(cur):
+        started.set()
+        release.wait(5)
+        return 'held'
+
+    def submit_hold():
+        try:
+            server.DB_WRITER.submit(hold, on_commit=committed.append)
+        except server.WriteTimeout as e:
+            errors.append(e)
+
+    holder = threading.Thread(target=submit_hold)
+    holder.start()
+    assert started.wait(5)
+
+    response = client.post('/api/fines', json=fine('withdrawn'))
+    release.set()
+    holder.join(5)
+    server.DB_WRITER.stop()
+
+    assert response.status_code == 503
+    assert response.headers['Retry-After'] == '1'
+    assert count_fines('withdrawn') == 0
+    assert [e.pending for e in errors] == [True]
+    assert committed == ['held']  # the started write still committed, after its caller gave up
+    assert server.DB_WRITER.stats()['cancelled'] == cancelled + 1
+
+
+def test_write_running_past_the_timeout_is_accepted_as_pending(client, monkeypatch):
+    release = threading.Event()
+    write_fine = server._write_fine
+
+    def slow_write_fine(cur, *args):
+        release.wait(5)
+        return write_fine(cur, *args)
+
+    monkeypatch.setattr(server, '_write_fine', slow_write_fine)
+    subscription = server.EVENT_BROKER.subscribe(['fine_imposed'])
+    try:
+        response = client.post('/api/fines', json=fine('pending'))
+        release.set()
+        server.DB_WRITER.timeout = 5  # stop() waits this long for the write to finish
+        server.DB_WRITER.stop()
+
+        assert response.status_code == 202
+        assert response.get_json()['status'] == 'pending'
+        assert count_fines('pending') == 1
+        assert subscription.next(1)[1] == 'fine_imposed'
+    finally:
+        server.EVENT_BROKER.unsubscribe(subscription)
+
+
+class WithdrawnWhileFailing(Future):
+    def set_exception(self, exception):
+        self.cancel()  # its caller times out just as the writer fails the batch
+        super().set_exception(exception)
+
+
+def test_failed_batch_with_a_withdrawn_write_keeps_the_writer_running(client):
+    writer = server.DatabaseWriter(timeout=5)
+    apply = writer._apply
+    calls = []
+
+    def fail_first_batch(conn, batch):
+        calls.append(len(batch))
+        if len(calls) == 1:
+            raise sqlite3.OperationalError('database is locked')
+        return apply(conn, batch)
+
+    writer._apply = fail_first_batch
+    withdrawn, waiting = WithdrawnWhileFailing(), Future()
+    writer._queue.put((lambda cur: None, (), withdrawn))
+    writer._queue.put((lambda cur: None, (), waiting))
+    writer.start()
+
+    with pytest.raises(sqlite3.OperationalError):
+        waiting.result(5)
+    assert writer.submit(lambda cur: 'written') == 'written'
+    writer.stop()
@@ -0,0 +1,127 @@
+"""Background exports: spooled jobs shared between identical requests and cleaned up when expired or abandoned."""
+import gzip
+import json
+import time
+
+import pytest
+
+import server
+
+FINES = {'type': 'fines', 'start': '2026-01-01', 'end': '2026-02-28'}
+
+
+@pytest.fixture
+def exports(client, tmp_path, monkeypatch):
+    queue = server.ExportQueue(spool_dir=tmp_path / 'spool', ttl=60)
+    monkeypatch.setattr(server, 'EXPORTS', queue)
+    yield queue
+    queue.stop()
+
+
+def wait_until_finished(queue, job_id, timeout=5):
+    deadline = time.monotonic() + timeout
+    while time.monotonic() < deadline:
+        job = queue.status(job_id)
+        if job['status'] in ('done', 'failed'):
+            return job
+        time.sleep(0.02)
+    raise AssertionError(f'export {job_id} did not finish')
+
+
+def test_export_is_queued_then_served_as_the_streamed_csv(client, exports):
+    created = client.post('/api/exports', json=FINES)
+    assert created.status_code in (200, 202)
+    job = created.get_json()
+    assert created.headers['Location'] == job['url']
+
+    wait_until_finished(exports, job['id'])
+    view = client.get(job['url'] + '?status=1').get_json()
+    assert (view['status'], view['progress']) == ('done', 1.0)
+    assert view['rows'] > 0
+
+    streamed = client.get('/api/fines/csv?start=2026-01-01&end=2026-02-28').get_data()
+    plain = client.get(job['url'])
+    assert plain.status_code == 200 and plain.get_data() == streamed
+    compressed = client.get(job['url'], headers={'Accept-Encoding': 'gzip'})
+    assert compressed.headers['Content-Encoding'] == 'gzip'
+    assert gzip.decompress(compressed.get_data()) == streamed
+
+
+def test_identical_requests_share_a_job_until_the_data_changes(client, exports):
+    first = client.post('/api/exports', json=FINES).get_json()
+    second = client.post('/api/exports', json=FINES).get_json()
+    assert first['id'] == second['id']
+    assert (exports.stats()['submitted'], exports.stats()['deduplicated']) == (1, 1)
+
+    client.post('/api/fines', json={'date': '2026-01-09', 'meal': 'lunch', 'reason': 'export-test',
+                                    'amount': 100, 'imposedBy': 'Warden'})
+    third = client.post('/api/exports', json=FINES).get_json()
+    assert third['id'] != first['id']
+
+
+def test_only_one_process_claims_a_job(exports, tmp_path):
+    other = server.ExportQueue(spool_dir=exports.spool_dir)
+    job, created = exports.submit('fines', {'start': '2026-01-01', 'end': '2026-01-31'}, {'fines': 1})
+    shared, created_again = other.submit('fines', {'start': '2026-01-01', 'end': '2026-01-31'}, {'fines': 1})
+    assert (created, created_again) == (True, False)
+    assert shared['id'] == job['id']
+    assert other.stats()['submitted'] == 0
+    assert not other._claim(dict(job))  # the state file exists, so link() refuses a second claim
+    wait_until_finished(exports, job['id'])
+
+
+def test_expired_exports_are_removed(client, exports):
+    exports.ttl = 0.05
+    job, _ = exports.submit('fines', {'start': '2026-01-01', 'end': '2026-01-31'}, {'fines': 1})
+    wait_until_finished(exports, job['id'])
+    time.sleep(0.1)
+
+    assert exports.sweep(force=True) == 1
+    assert list(exports.spool_dir.iterdir()) == []
+    assert client.get(f"/api/exports/{job['id']}").status_code == 404
+
+
+def pretend_running(queue, job_id, age):
+    """Rewrite a job's state as if another process were still running it, last updated `age` seconds ago."""
+    path = queue._status_path(job_id)
+    job = json.loads(path.read_text())
+    job.update(status='running', finishedAt=None, expiresAt=None, updatedAt=time.time() - age)
+    path.write_text(json.dumps(job))
+
+
+def test_abandoned_export_is_reclaimed_once_its_heartbeat_is_stale(exports, monkeypatch):
+    monkeypatch.setattr(server, 'EXPORT_STALE_AFTER', 0.5)
+    params = {'start': '2026-01-01', 'end': '2026-01-31'}
+    job, _ = exports.submit('fines', params, {'fines': 1})
+    wait_until_finished(exports, job['id'])
+    other = server.ExportQueue(spool_dir=exports.spool_dir)
+
+    pretend_running(exports, job['id'], age=0.1)
+    assert other.sweep(force=True) == 0
+    assert other.submit('fines', params, {'fines': 1})[1] is False
+
+    pretend_running(exports, job['id'], age=1)
+    assert other.sweep(force=True) == 1
+    rerun, created = other.submit('fines', params, {'fines': 1})
+    assert created and rerun['id'] == job['id']
+    assert wait_until_finished(other, job['id'])['status'] == 'done'
+    other.stop()
+
+
+def test_heartbeat_keeps_a_slow_export_claimed(exports, monkeypatch):
+    monkeypatch.setattr(server, 'EXPORT_HEARTBEAT', 0.05)
+    monkeypatch.setattr(server, 'EXPORT_STALE_AFTER', 0.2)
+    fines_sql = server.EXPORT_TYPES['fines']['sql']
+
+    def slow_sql(params):
+        time.sleep(0.6)
+        return fines_sql(params)
+
+    monkeypatch.setitem(server.EXPORT_TYPES['fines'], 'sql', slow_sql)
+    job, _ = exports.submit('fines', {'start': '2026-01-01', 'end': '2026-01-31'}, {'fines': 1})
+    time.sleep(0.4)
+
+    other = server.ExportQueue(spool_dir=exports.spool_dir)
+    assert not other._abandoned(other.status(job['id']))
+    assert other.sweep(force=True) == 0
+    assert wait_until_finished(exports, job['id'])['status'] == 'done'
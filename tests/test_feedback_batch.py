@@ -0,0 +1,42 @@
+"""POST /api/feedback/batch against a throw-away copy of the sample database."""
+import server
+
+
+def submission(roll, taste, cleanliness=4):
+    return {
+        'student_name': f'Student {roll}',
+        'student_roll': roll,
+        'feedback_date': '2026-03-01',
+        'meal_type': 'Lunch',
+        'items': [{'item_name': 'Dal', 'taste': taste, 'cleanliness': cleanliness}],
+    }
+
+
+def test_batch_reports_invalid_items_by_index_and_saves_the_rest(client):
+    response = client.post('/api/feedback/batch', json=[
+        submission('TB001', 5),
+        submission('TB002', '5'),
+        submission('TB003', 3, cleanliness=9),
+        submission('TB004', 0),
+    ])
+
+    assert response.status_code == 200
+    body = response.get_json()
+    assert (body['saved'], body['failed']) == (2, 2)
+    assert [result['status'] for result in body['results']] == ['success', 'error', 'error', 'success']
+    assert 'items[0].taste' in body['results'][1]['error']
+    assert 'items[0].cleanliness' in body['results'][2]['error']
+
+    with server.DB_POOL.connection() as conn:
+        saved = conn.execute("""
+            SELECT s.roll_no, sf.lunch_rating FROM student_feedback sf
+            JOIN students s ON s.id = sf.student_id
+            WHERE s.roll_no LIKE 'TB%' ORDER BY s.roll_no
+        """).fetchall()
+    assert [tuple(row) for row in saved] == [('TB001', 4), ('TB004', 4)]
+
+
+def test_single_feedback_rejects_a_non_numeric_score(client):
+    response = client.post('/api/feedback', json=submission('TB005', 'great'))
+    assert response.status_code == 400
+    assert 'items[0].taste' in response.get_json()['error']
@@ -0,0 +1,57 @@
+"""Keyset pagination of /api/feedback and /api/fines."""
+import base64
+import json
+
+import pytest
+
+import server
+
+
+def cursor(values):
+    return base64.urlsafe_b64encode(json.dumps(values).encode()).decode().rstrip('=')
+
+
+def walk(client, path):
+    items, after = [], None
+    while True:
+        url = f'{path}&limit=7' + (f'&after={after}' if after else '')
+        body = client.get(url).get_json()
+        items += body['items']
+        after = body['nextCursor']
+        if after is None:
+            return items
+
+
+@pytest.mark.parametrize('path', [
+    '/api/feedback?start=2025-01-01&end=2026-12-31',
+    '/api/fines?start=2025-01-01&end=2026-12-31',
+])
+def test_pages_cover_the_listing_once(client, path):
+    pages = walk(client, path)
+    listing = client.get(path).get_json()
+    assert len(listing) > 7
+    assert sorted(row['id'] for row in pages) == sorted(row['id'] for row in listing)
+
+
+def test_feedback_pages_are_read_in_index_order(client):
+    client.get('/api/health')  # runs the migrations that create the index
+    sql, params = server.feedback_sql('2025-01-01', '2026-12-31', after=['2026-01-05', 3, 40], limit=50)
+    with server.DB_POOL.connection() as conn:
+        plan = ' '.join(row[3] for row in conn.execute(f"EXPLAIN QUERY PLAN {sql}", params))
+    assert 'idx_student_feedback_date_student' in plan
+    assert 'TEMP B-TREE' not in plan
+
+
+@pytest.mark.parametrize('path, values', [
+    ('/api/feedback', ['2026-01-05', 'R1']),
+    ('/api/feedback', ['2026-01-05', 'R1', {'id': 1}]),
+    ('/api/feedback', ['2026-01-05', 'R1', '12']),
+    ('/api/feedback', ['2026-01-05', 'R1', 12]),
+    ('/api/fines', [20260105, 3]),
+    ('/api/fines', ['2026-01-05', True]),
+    ('/api/fines', {'date': '2026-01-05', 'id': 3}),
+])
+def test_malformed_cursors_are_rejected(client, path, values):
+    response = client.get(f'{path}?start=2025-01-01&end=2026-12-31&after={cursor(values)}')
+    assert response.status_code == 400
+    assert response.get_json() == {'error': 'invalid cursor'}
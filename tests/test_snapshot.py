@@ -0,0 +1,100 @@
+"""The columnar snapshot (MESS_SNAPSHOT=1) must serve exactly what the SQL listing reads do."""
+import pytest
+
+import server
+
+
+@pytest.fixture
+def snapshot(client, monkeypatch):
+    engine = server.SnapshotEngine()
+    monkeypatch.setattr(server, 'SNAPSHOT', engine)
+    return engine
+
+
+def listings(start, end):
+    return {
+        'feedback': server.query_feedback(start, end),
+        'feedback fields': server.query_feedback(start, end, ['rollNumber', 'date', 'lunchRating']),
+        'food counts': server.query_food_counts(start, end),
+        'lunch counts': server.query_food_counts(start, end, 'lunch'),
+        'fines': server.query_fines(start, end),
+        'answered fines': server.query_fines(start, end, 'submitted'),
+        'open fines': server.query_fines(start, end, 'not_submitted'),
+    }
+
+
+def read_both(monkeypatch, engine, start='2025-12-01', end='2026-03-31'):
+    """(snapshot rows, SQL rows) for every listing."""
+    from_snapshot = listings(start, end)
+    with monkeypatch.context() as m:
+        m.setattr(server, 'SNAPSHOT', None)
+        from_sql = listings(start, end)
+    return from_snapshot, from_sql
+
+
+@pytest.mark.parametrize('start, end', [('20260101', '20260131'), ('2026-W01-1', '2026-W05-7')])
+def test_non_iso_dates_are_compared_like_sql(snapshot, monkeypatch, start, end):
+    from_snapshot, from_sql = read_both(monkeypatch, snapshot, start, end)
+    assert from_snapshot == from_sql
+    assert snapshot.stats()['reads'] == 0  # served by the SQL fallback
+
+
+def feedback(roll, date, lunch, comments='ok'):
+    return {'student_name': f'Student {roll}', 'student_roll': roll, 'feedback_date': date, 'meal_type': 'Lunch',
+            'comments': comments, 'items': [{'item_name': 'Dal', 'taste': lunch, 'cleanliness': lunch}]}
+
+
+def fine(date, reason, amount=200):
+    return {'date': date, 'meal': 'dinner', 'reason': reason, 'amount': amount, 'imposedBy': 'Warden'}
+
+
+def fine_id(reason):
+    with server.DB_POOL.connection() as conn:
+        return conn.execute("SELECT id FROM fines WHERE reason = ?", [reason]).fetchone()[0]
+
+
+def existing_fine_id(date):
+    with server.DB_POOL.connection() as conn:
+        return conn.execute("SELECT MIN(id) FROM fines WHERE fine_date = ?", [date]).fetchone()[0]
+
+
+WRITES = {
+    'feedback from a new student': lambda c: c.post('/api/feedback', json=feedback('SN001', '2026-01-10', 5)),
+    'feedback updated': lambda c: [c.post('/api/feedback', json=feedback('SN002', '2026-01-11', 2)),
+                                   c.post('/api/feedback', json=feedback('SN002', '2026-01-11', 4, 'better'))][-1],
+    'feedback batch': lambda c: c.post('/api/feedback/batch', json=[
+        feedback('SN003', '2026-01-12', 3), feedback('SN004', '2026-03-01', 1)]),
+    'food count updated': lambda c: c.post('/api/food-counts', json={
+        'date': '2026-01-15', 'meal': 'lunch', 'student_count': 321, 'faculty_count': 4, 'guest_count': 1}),
+    'food count on a new day': lambda c: c.post('/api/food-counts', json={
+        'date': '2026-03-05', 'meal': 'breakfast', 'student_count': 12}),
+    'fine imposed': lambda c: c.post('/api/fines', json=fine('2026-01-20', 'snapshot-test')),
+    'fine answered': lambda c: [c.post('/api/fines', json=fine('2026-02-14', 'snapshot-answer')),
+                                c.post('/api/vendor-responses', json={'fine_id': fine_id('snapshot-answer'),
+                                                                      'vendor_response': 'Fixed'})][-1],
+    'fine deleted': lambda c: c.delete(f"/api/fines/{existing_fine_id('2026-01-19')}"),
+}
+
+
+@pytest.mark.parametrize('write', WRITES)
+def test_snapshot_matches_sql_after_writes(client, snapshot, monkeypatch, write):
+    before_snapshot, before_sql = read_both(monkeypatch, snapshot)
+    assert before_snapshot == before_sql
+    loads = snapshot.stats()['loads']
+
+    response = WRITES[write](client)
+    assert response.status_code in (200, 201)
+
+    after_snapshot, after_sql = read_both(monkeypatch, snapshot)
+    assert after_snapshot == after_sql
+    assert after_sql != before_sql
+    stats = snapshot.stats()
+    assert stats['deltas'] > 0 and stats['loads'] == loads  # kept current by write_through, not reloaded
+
+
+def test_snapshot_matches_sql_after_all_writes(client, snapshot, monkeypatch):
+    read_both(monkeypatch, snapshot)
+    for write in WRITES.values():
+        assert write(client).status_code in (200, 201)
+    from_snapshot, from_sql = read_both(monkeypatch, snapshot)
+    assert from_snapshot == from_sql